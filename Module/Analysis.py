@@ -1,6 +1,348 @@
 from Module.Processor_Data import DataProcessor
+from Module.Score_Store import ScoreStore, PROGRAMS, SCORE_SCALE, MAX_SCORE_CODE
+from Module.Score_Cube import ScoreCube, build_score_cube
+from Module.Score_Moments import PairwiseMoments, build_pairwise_moments
+from Module.Result_Cache import ResultCache, DEFAULT_CACHE_BYTES, memoized, method_key
+from Module.Compute_Backend import ComputeBackend, DEFAULT_BACKEND, get_backend
+from Module.Parallel_Analysis import (
+    AnalysisPool, parallel_subject_histogram, parallel_block_histogram, parallel_region_counts,
+)
+from Module.Score_Histogram import (
+    ScoreHistogram, build_subject_histogram, build_block_histogram, describe_weighted,
+    count_block_totals_by_province, best_block_totals, build_best_block_histogram,
+    build_joint_histograms,
+)
+from Module.Percentile_Table import PercentileTable
+from Module.Cutoff_Simulator import CutoffSimulator, project_block_distribution
+from Module.Subject_Combination import SubjectCombinations, build_subject_combinations
+from Module.Score_Equating import EquatingFunction, equipercentile_equate, DEFAULT_EQUATING_BANDWIDTH
 import pandas as pd
 import numpy as np
+import weakref
+
+# Độ rộng bin nhỏ nhất còn tính gộp MỌI cặp môn trong một lượt (0.1 → 101 × 101 ô mỗi cặp);
+# bin mịn hơn chỉ đếm đúng cặp được hỏi để giới hạn bộ nhớ
+JOINT_BATCH_MIN_WIDTH = 0.1
+
+# Kết quả nền được cập nhật tăng dần khi có partition mới (Analysis.update):
+# (loại, method @memoized, tham số) — mọi output của Analysis đều dẫn xuất từ chúng
+# (cube → phân phối theo chương trình / equating, tổ hợp môn → tỉ lệ đủ môn, moments → tương quan)
+INCREMENTAL_AGGREGATES = (
+    ("subject", "_get_subject_histogram", ()),
+    ("block", "_get_block_histogram", ("All",)),
+    ("region", "_get_province_histogram", ()),
+    ("cube", "_get_score_cube", ()),
+    ("block_program", "_get_block_program_histogram", ()),
+    ("combination", "_get_subject_combinations", ()),
+    ("moments", "_get_pairwise_moments", ()),
+)
+
+# Loại nhóm được ghi nhận ô bẩn (năm, môn / khối / tỉnh) sau mỗi update()
+DIRTY_CELL_KINDS = ("subject", "block", "region")
+
+# ================== MAP KHỐI THI → MÔN ==================
+# Môn không có trong dữ liệu (vd. viết sai tên) bị bỏ qua khi tính tổng điểm khối.
+BLOCK_SUBJECTS_MAP = {
+    'A00': ['toan', 'vat_li', 'hoa_hoc'],
+    'A01': ['toan', 'vat_li', 'ngoai_ngu'],
+    'A02': ['toan', 'vat_li', 'sinh_hoc'],
+    'A03': ['toan', 'vat_li', 'lich_su'],
+    'A04': ['toan', 'vat_li', 'dia_li'],
+    'A05': ['toan', 'hoa_hoc', 'lich_su'],
+    'A06': ['toan', 'hoa_hoc', 'dia_li'],
+    'A07': ['toan', 'lich_su', 'dia_li'],
+    'A08': ['toan', 'lich_su', 'gdcd'],
+    'A09': ['toan', 'dia_li', 'gdcd'],
+    'A10': ['toan', 'vat_li', 'gdcd'],
+    'A11': ['toan', 'hoa_hoc', 'gdcd'],
+    'B00': ['toan', 'hoa_hoc', 'sinh_hoc'],
+    'B01': ['toan', 'lich_su', 'sinh_hoc'],
+    'B02': ['toan', 'sinh_hoc', 'dia_li'],
+    'B03': ['toan', 'sinh_hoc', 'ngu_van'],
+    'B04': ['toan', 'sinh_hoc', 'gdcd'],
+    'B08': ['toan', 'sinh', 'ngoai_ngu'],
+    'C00': ['ngu_van', 'lich_su', 'dia_li'],
+    'C01': ['ngu_van', 'toan', 'vat_li'],
+    'C02': ['ngu_van', 'toan', 'hoa_hoc'],
+    'C03': ['ngu_van', 'toan', 'lich_su'],
+    'C04': ['ngu_van', 'toan', 'dia_li'],
+    'C05': ['ngu_van', 'vat_li', 'hoa_hoc'],
+    'C06': ['ngu_van', 'vat_li', 'sinh_hoc'],
+    'C07': ['ngu_van', 'vat_li', 'lich_su'],
+    'C08': ['ngu_van', 'hoa_hoc', 'sinh_hoc'],
+    'C09': ['ngu_van', 'dia_li', 'vat_li'],
+    'C10': ['ngu_van', 'hoa_hoc', 'lich_su'],
+    'C11': ['ngu_van', 'hoa_hoc', 'dia_li'],
+    'C12': ['ngu_van', 'lich_su', 'sinh_hoc'],
+    'C13': ['ngu_van', 'dia_li', 'sinh_hoc'],
+    'C14': ['ngu_van', 'toan', 'gdcd'],
+    'C16': ['ngu_van', 'vat_li', 'gdcd'],
+    'C17': ['ngu_van', 'hoa_hoc', 'gdcd'],
+    'C19': ['ngu_van', 'lich_su', 'gdcd'],
+    'C20': ['ngu_van', 'dia_ly', 'gdcd'],
+    'D01': ['toan', 'ngu_van', 'ngoai_ngu'],
+    'D07': ['toan', 'hoa', 'ngoai_ngu'],
+    'D08': ['toan', 'sinh_hoc', 'ngoai_ngu'],
+    'D09': ['toan', 'lich_su', 'ngoai_ngu'],
+    'D10': ['toan', 'dia_li', 'ngoai_ngu'],
+    'D11': ['ngu_van', 'vat_li', 'ngoai_ngu'],
+    'D12': ['ngu_van', 'hoa_hoc', 'ngoai_ngu'],
+    'D13': ['ngu_van', 'sinh_hoc', 'ngoai_ngu'],
+    'D14': ['ngu_van', 'lich_su', 'ngoai_ngu'],
+    'D15': ['ngu_van', 'dia_li', 'ngoai_ngu'],
+    'D66': ['ngu_van', 'gdcd', 'ngoai_ngu'],
+    'D84': ['toan', 'ngoai_ngu', 'gdcd'],
+    'X02': ['toan', 'ngu_van', 'tin_hoc'],
+    'X03': ['toan', 'ngu_van', 'cn_cong_nghiep'],
+    'X04': ['toan', 'ngu_van', 'cn_nong_nghiep'],
+    'X06': ['toan', 'vat_li', 'tin_hoc'],
+    'X07': ['toan', 'vat_li', 'cn_cong_nghiep'],
+    'X08': ['toan', 'vat_li', 'cn_nong_nghiep'],
+    'X10': ['toan', 'hoa_hoc', 'tin_hoc'],
+    'X11': ['toan', 'hoa_hoc', 'cn_cong_nghiep'],
+    'X12': ['toan', 'hoa_hoc', 'cn_nong_nghiep'],
+    'X14': ['toan', 'sinh_hoc', 'tin_hoc'],
+    'X15': ['toan', 'sinh_hoc', 'cn_cong_nghiep'],
+    'X16': ['toan', 'sinh_hoc', 'cn_nong_nghiep'],
+    'X18': ['toan', 'lich_su', 'tin_hoc'],
+    'X26': ['toan', 'tin_hoc', 'ngoai_ngu'],
+    'X27': ['toan', 'cn_cong_nghiep', 'ngoai_ngu'],
+    'X28': ['toan', 'cn_nong_nghiep', 'ngoai_ngu'],
+    'X53': ['toan', 'gdcd', 'tin_hoc'],
+    'X54': ['toan', 'gdcd', 'cn_nong_nghiep'],
+    'X55': ['toan', 'gdcd', 'cn_cong_nghiep'],
+    'X56': ['toan', 'tin_hoc', 'cn_nong_nghiep'],
+    'X57': ['toan', 'tin_hoc', 'cn_cong_nghiep'],
+    'X59': ['ngu_van', 'vat_li', 'tin_hoc'],
+    'X60': ['ngu_van', 'vat_li', 'cn_cong_nghiep'],
+    'X61': ['ngu_van', 'vat_li', 'cn_nong_nghiep'],
+    'X63': ['ngu_van', 'hoa_hoc', 'tin_hoc'],
+    'X64': ['ngu_van', 'hoa_hoc', 'cn_cong_nghiep'],
+    'X66': ['ngu_van', 'hoa_hoc', 'tin_hoc'],
+    'X67': ['ngu_van', 'sinh_hoc', 'tin_hoc'],
+    'X68': ['ngu_van', 'sinh_hoc', 'cn_cong_nghiep'],
+    'X69': ['ngu_van', 'sinh_hoc', 'cn_nong_nghiep'],
+    'X71': ['ngu_van', 'lich_su', 'tin_hoc'],
+    'X72': ['ngu_van', 'lich_su', 'cn_cong_nghiep'],
+    'X73': ['ngu_van', 'lich_su', 'cn_nong_nghiep'],
+    'X75': ['ngu_van', 'dia_li', 'tin_hoc'],
+    'X76': ['ngu_van', 'dia_li', 'cn_cong_nghiep'],
+    'X77': ['ngu_van', 'dia_li', 'tin_hoc'],
+    'X79': ['ngu_van', 'ngoai_ngu', 'tin_hoc'],
+    'X80': ['ngu_van', 'ngoai_ngu', 'cn_cong_nghiep'],
+    'X81': ['ngu_van', 'ngoai_ngu', 'cn_nong_nghiep'],
+    'Y07': ['ngu_van', 'gdcd', 'tin_hoc'],
+    'Y08': ['ngu_van', 'gdcd', 'cn_cong_nghiep'],
+    'Y09': ['ngu_van', 'gdcd', 'cn_nong_nghiep'],
+    'Y10': ['ngu_van', 'tin_hoc', 'cn_cong_nghiep'],
+    'Y11': ['ngu_van', 'tin_hoc', 'cn_nong_nghiep'],
+}
+
+# ================== MAP TỈNH ==================
+# Map tỉnh trước chuyển đổi: 01..64, mỗi mã (2 ký tự đầu SBD) ↔ 1 tỉnh cũ
+PRE_REGION_MAP = {
+    "Hà Nội": ["01"],
+    "Thành phố Hồ Chí Minh": ["02"],
+    "Hải Phòng": ["03"],
+    "Đà Nẵng" : ["04"],
+    "Hà Giang": ["05"],
+    "Cao Bằng": ["06"],
+    "Lai Châu": ["07"],
+    "Lào Cai": ["08"],
+    "Tuyên Quang": ["09"],
+    "Lạng Sơn": ["10"],
+    "Bắc Kạn": ["11"],
+    "Thái Nguyên": ["12"],
+    "Yên Bái": ["13"],
+    "Sơn La": ["14"],
+    "Phú Thọ": ["15"],
+    "Vĩnh Phúc": ["16"],
+    "Quảng Ninh": ["17"],
+    "Bắc Giang": ["18"],
+    "Bắc Ninh": ["19"],
+    "Hải Dương": ["21"],
+    "Hưng Yên": ["22"],
+    "Hoà Bình": ["23"],
+    "Hà Nam": ["24"],
+    "Nam Định": ["25"],
+    "Thái Bình": ["26"],
+    "Ninh Bình": ["27"],
+    "Thanh Hoá": ["28"],
+    "Nghệ An": ["29"],
+    "Hà Tĩnh": ["30"],
+    "Quảng Bình": ["31"],
+    "Quảng Trị": ["32"],
+    "Huế": ["33"],
+    "Quảng Nam": ["34"],
+    "Quảng Ngãi": ["35"],
+    "Kon Tum": ["36"],
+    "Bình Định": ["37"],
+    "Gia Lai": ["38"],
+    "Phú Yên": ["39"],
+    "Đắk Lắk": ["40"],
+    "Khánh Hoà": ["41"],
+    "Lâm Đồng": ["42"],
+    "Bình Phước": ["43"],
+    "Bình Dương": ["44"],
+    "Ninh Thuận": ["45"],
+    "Tây Ninh": ["46"],
+    "Bình Thuận": ["47"],
+    "Đồng Nai": ["48"],
+    "Long An": ["49"],
+    "Đồng Tháp": ["50"],
+    "An Giang": ["51"],
+    "Vũng Tàu": ["52"],
+    "Tiền Giang": ["53"],
+    "Kiên Giang": ["54"],
+    "Cần Thơ": ["55"],
+    "Bến Tre": ["56"],
+    "Vĩnh Long": ["57"],
+    "Trà Vinh": ["58"],
+    "Sóc Trăng": ["59"],
+    "Bạc Liêu": ["60"],
+    "Cà Mau": ["61"],
+    "Điện Biên": ["62"],
+    "Đăk Nông": ["63"],
+    "Hậu Giang": ["64"]
+}
+
+# Map tỉnh sau đợt chuyển đổi (gộp tỉnh): mỗi tỉnh mới gồm nhiều mã tỉnh cũ
+REGION_MAP_RAW = {
+    "Hà Nội": ["01"],
+    "Thành phố Hồ Chí Minh": ["02", "44", "52"],
+    "Hải Phòng": ["03", "21"],
+    "Đà Nẵng": ["04", "34"],
+    "Huế": ["33"],
+    "Cần Thơ": ["55", "59", "64"],
+    "Tuyên Quang": ["05", "09"],
+    "Cao Bằng": ["06"],
+    "Lai Châu": ["07"],
+    "Lào Cai": ["08", "13"],
+    "Lạng Sơn": ["10"],
+    "Thái Nguyên": ["11", "12"],
+    "Sơn La": ["14"],
+    "Phú Thọ": ["15", "16", "23"],
+    "Bắc Ninh": ["18", "19"],
+    "Quảng Ninh": ["17"],
+    "Hưng Yên": ["22", "26"],
+    "Ninh Bình": ["24", "25", "27"],
+    "Điện Biên": ["62"],
+    "Thanh Hóa": ["28"],
+    "Nghệ An": ["29"],
+    "Hà Tĩnh": ["30"],
+    "Quảng Trị": ["31", "32"],
+    "Quảng Ngãi": ["35", "36"],
+    "Gia Lai": ["37", "38"],
+    "Đắk Lắk": ["39", "40"],
+    "Khánh Hòa": ["41", "45"],
+    "Lâm Đồng": ["42", "47", "63"],
+    "Đồng Nai": ["43", "48"],
+    "Tây Ninh": ["46", "49"],
+    "Đồng Tháp": ["50"],
+    "Tiền Giang": ["53"],
+    "An Giang": ["51", "54"],
+    "Vĩnh Long": ["56", "57", "58"],
+    "Cà Mau": ["60", "61"]
+}
+
+# Loại nhóm → tên trục nhóm trong histogram tương ứng (dùng cho quantile / pass rate / boxplot)
+_GROUP_AXES = {
+    "subject": "mon_hoc",
+    "block": "khoi",
+    "region": "tinh",
+    "merged_region": "tinh",
+}
+
+# Mã tỉnh → tên tỉnh cũ
+_CODE_TO_OLD_REGION = {
+    code: name
+    for name, codes in PRE_REGION_MAP.items()
+    for code in codes
+}
+
+
+
+def _region_lookup(region_names: list[str]) -> np.ndarray:
+    """Bảng tra mã tỉnh (int) → vị trí trong region_names; -1 cho mã không được chọn."""
+    lookup = np.full(128, -1, dtype=np.int64)
+    for code, name in _CODE_TO_OLD_REGION.items():
+        if name in region_names:
+            lookup[int(code)] = region_names.index(name)
+    return lookup
+
+
+def _sum_codes_by_region(counts: np.ndarray, codes: np.ndarray, axis: int) -> tuple[np.ndarray, list[str]]:
+    """Cộng trục mã tỉnh (int) của một mảng đếm về tỉnh cũ (bỏ mã không thuộc PRE_REGION_MAP).
+
+    Returns:
+        tuple: (mảng đếm với trục `axis` = tỉnh cũ, tên tỉnh cũ theo thứ tự trục).
+    """
+    region_names = sorted(PRE_REGION_MAP)
+    codes = np.asarray(codes, dtype=np.int64)
+    region_of_code = np.where(codes >= 0, _region_lookup(region_names)[np.maximum(codes, 0)], -1)
+    keep = np.flatnonzero(region_of_code >= 0)
+
+    moved = np.moveaxis(counts, axis, 0)
+    out = np.zeros((len(region_names), *moved.shape[1:]), dtype=np.int64)
+    np.add.at(out, region_of_code[keep], moved[keep])
+    return np.moveaxis(out, 0, axis), region_names
+
+
+def _province_names(codes: np.ndarray) -> np.ndarray:
+    """Mã tỉnh (int) → tên tỉnh cũ (object); None cho mã không thuộc PRE_REGION_MAP."""
+    names = np.full(128, None, dtype=object)
+    for code, name in _CODE_TO_OLD_REGION.items():
+        names[int(code)] = name
+    codes = np.asarray(codes, dtype=np.int64)
+    return np.where((codes >= 0) & (codes < len(names)), names[np.clip(codes, 0, len(names) - 1)], None)
+
+
+def _row_totals(store: ScoreStore, score_cols: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    """Tổng mã điểm (int64) và số môn có điểm của từng dòng, trên các môn score_cols."""
+    rows = np.concatenate([store.column(c)[0] for c in score_cols])
+    codes = np.concatenate([store.column(c)[1] for c in score_cols])
+    n_scores = np.bincount(rows, minlength=store.n_rows)
+    total = np.bincount(rows, weights=codes, minlength=store.n_rows).astype(np.int64)
+    return total, n_scores
+
+
+def _build_province_histogram(store: ScoreStore, total: np.ndarray, n_scores: np.ndarray,
+                              n_subjects: int, count_keys=np.bincount) -> ScoreHistogram:
+    """Histogram (nam_hoc × tỉnh cũ × bin tổng điểm) từ tổng điểm theo dòng (bỏ dòng không có điểm)."""
+    region_names = sorted(PRE_REGION_MAP)
+    region_lookup = _region_lookup(region_names)
+
+    order, offsets = store.province_index()
+    rows = order[offsets[1]:]
+    row_region = region_lookup[store.province_codes[rows]]
+    keep = (n_scores[rows] > 0) & (row_region >= 0)
+    rows, row_region = rows[keep], row_region[keep]
+
+    years, year_idx = np.unique(store.years[rows], return_inverse=True)
+    n_bins = n_subjects * MAX_SCORE_CODE + 1
+    keys = (year_idx * len(region_names) + row_region) * n_bins + total[rows]
+    counts = count_keys(keys, minlength=len(years) * len(region_names) * n_bins)
+
+    return ScoreHistogram(
+        counts.reshape(len(years), len(region_names), n_bins),
+        [("nam_hoc", years.astype(np.int64)), ("tinh", np.asarray(region_names, dtype=object))],
+    )
+
+
+def _normalize_region_groups(groups: dict[str, list[str]]) -> tuple[tuple[str, tuple[str, ...]], ...]:
+    """Chuẩn hoá nhóm tỉnh {tên nhóm: [mã tỉnh cũ]} thành tuple hashable (sắp theo tên nhóm).
+
+    Raises:
+        ValueError: Khi nhóm rỗng hoặc có mã tỉnh không thuộc PRE_REGION_MAP.
+    """
+    normalized = []
+    for name, codes in groups.items():
+        codes = tuple(sorted({f"{int(c):02d}" for c in codes}))
+        unknown = [c for c in codes if c not in _CODE_TO_OLD_REGION]
+        if not codes or unknown:
+            raise ValueError(f"Nhóm tỉnh '{name}' rỗng hoặc có mã không hợp lệ: {unknown}")
+        normalized.append((name, codes))
+    return tuple(sorted(normalized))
 
 class Analysis:
     # =================== INTERNAL PRIVATE METHODS: PHÂN TÍCH DỮ LIỆU ===================
@@ -27,6 +369,13 @@ class Analysis:
         "_subject",            # Môn học cần phân tích (tự chọn)
         "_block",              # Khối thi cần phân tích (tự chọn)
         "_region",             # Tỉnh thành cần phân tích (tự chọn)
+        "_cache",              # ResultCache: kết quả đã tính theo (method, tham số, phiên bản dữ liệu)
+        "_backend",            # ComputeBackend: engine đếm khoá / sắp xếp (mặc định pandas)
+        "_workers",            # Số tiến trình cho các phép 'All' (1 → chạy tuần tự)
+        "_pool",               # AnalysisPool đang mở (tạo khi cần, gắn với descriptor shared memory)
+        "_dirty",              # {loại nhóm: {(nam_hoc, nhóm)}} các ô bị partition mới làm thay đổi
+        "_pool_finalizer",     # weakref.finalize: dừng pool khi Analysis bị thu gom mà chưa close_pool
+        "__weakref__",         # cho phép weakref.finalize trỏ tới instance
     )
     
     # ------------------------ Setter và Getter -------------------------
@@ -39,6 +388,24 @@ class Analysis:
     def processor(self, value: DataProcessor) -> None:
         self._processor = value
     
+    @property
+    def backend(self) -> ComputeBackend:
+        """Backend tính toán (cố định khi khởi tạo → cache không lẫn kết quả giữa các backend)."""
+        return self._backend
+
+    @property
+    def workers(self) -> int:
+        """Số tiến trình cho các phép 'All' (môn / khối / tỉnh); 1 → tuần tự."""
+        return self._workers
+
+    @workers.setter
+    def workers(self, value: int) -> None:
+        if not isinstance(value, int) or value < 1:
+            raise ValueError("workers phải là số nguyên >= 1.")
+        if value != getattr(self, "_workers", None):
+            self.close_pool()
+        self._workers = value
+
     @property
     def subject(self) -> str:
         return self._subject
@@ -84,22 +451,143 @@ class Analysis:
         self._region = value
        
     # -------- Khởi tạo và thiết lập thuộc tính --------
-    def __init__(self, processor: DataProcessor):
+    def __init__(self, processor: DataProcessor, cache_bytes: int = DEFAULT_CACHE_BYTES,
+                 backend: str | ComputeBackend = DEFAULT_BACKEND, workers: int = 1):
+        """
+        Args:
+            processor (DataProcessor): Nguồn dữ liệu đã xử lý.
+            cache_bytes (int): Giới hạn bộ nhớ cho cache kết quả (0 → tắt cache).
+            backend (str | ComputeBackend): 'pandas' (mặc định), 'polars' hoặc 'arrow'.
+            workers (int): Số tiến trình cho các phép 'All'; worker gắn vào dữ liệu qua
+                shared memory (DataProcessor.publish_shared), kết quả giống hệt chạy tuần tự.
+        """
         self.processor = processor
         self._subject = None
         self._block = None
         self._region = None
+        self._cache = ResultCache(cache_bytes)
+        self._backend = get_backend(backend)
+        self._pool = None
+        self._pool_finalizer = None
+        self.workers = workers
+        self._dirty = {}
         
+    # ----------------------------- Cache kết quả -----------------------------
+    def _data_version(self) -> tuple[int, int]:
+        """Phiên bản dữ liệu nguồn: đổi processor hoặc processor đổi dữ liệu → cache tự vô hiệu."""
+        return id(self._processor), self._processor.data_version
+
+    def clear_cache(self) -> None:
+        """Xoá toàn bộ kết quả phân tích đã cache."""
+        self._cache.clear()
+
+    def cache_info(self) -> dict[str, int]:
+        """Thống kê cache: số entry, byte đang dùng, giới hạn, hit/miss."""
+        return self._cache.info()
+
+    # ------------------------ Pool tiến trình (workers > 1) ------------------------
+    def _get_pool(self) -> AnalysisPool:
+        """Pool gắn với dữ liệu hiện tại; dữ liệu đổi (descriptor mới) → dựng lại pool."""
+        descriptor = self.processor.publish_shared()
+        if self._pool is None or self._pool.descriptor is not descriptor:
+            self.close_pool()
+            self._pool = AnalysisPool(descriptor, self._workers)
+            # Quên close_pool → pool vẫn dừng khi Analysis bị thu gom / lúc thoát chương trình
+            self._pool_finalizer = weakref.finalize(self, self._pool.close)
+        return self._pool
+
+    def close_pool(self) -> None:
+        """Dừng pool tiến trình (nếu có). Shared memory do DataProcessor.release_shared giải phóng."""
+        finalizer = getattr(self, "_pool_finalizer", None)
+        if finalizer is not None:
+            finalizer()             # gọi pool.close đúng một lần rồi tự huỷ đăng ký
+        self._pool = None
+        self._pool_finalizer = None
+
+    def __enter__(self) -> "Analysis":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close_pool()
+
+    # ------------------------ Cập nhật tăng dần (partition mới) ------------------------
+    def _partition_aggregates(self, store: ScoreStore) -> dict:
+        """Kết quả nền (INCREMENTAL_AGGREGATES) của riêng một partition vừa nối."""
+        count_keys = self._backend.count_keys
+        score_cols = self._region_score_cols()
+        total, n_scores = _row_totals(store, score_cols)
+        # Partition nằm ở cuối dữ liệu → mã chương trình là đoạn cuối
+        programs = self.processor.get_program_codes()[-store.n_rows:]
+        return {
+            "subject": build_subject_histogram(store, sorted(store.subjects), count_keys),
+            "block": build_block_histogram(store, BLOCK_SUBJECTS_MAP, count_keys=count_keys),
+            "region": _build_province_histogram(store, total, n_scores, len(score_cols), count_keys),
+            "cube": build_score_cube(store, programs),
+            "block_program": build_block_histogram(store, BLOCK_SUBJECTS_MAP, program_codes=programs,
+                                                   count_keys=count_keys),
+            "combination": build_subject_combinations(store),
+            "moments": build_pairwise_moments(store),
+        }
+
+    def _update(self, new_partition: pd.DataFrame, program: str | None = None) -> pd.DataFrame:
+        """
+        Nối partition vào processor; kết quả nền đã tính (INCREMENTAL_AGGREGATES) được cộng
+        thêm phần chênh (không quét lại các năm cũ) rồi ghi sẵn vào cache cho phiên bản dữ liệu mới.
+        Các kết quả dẫn xuất (frame, thống kê, phân vị...) tự tính lại từ kết quả nền đã cập nhật.
+        Output: các ô bẩn tích luỹ ['loai', 'nam_hoc', 'nhom'].
+        """
+        old_version = self._data_version()
+        bases = {
+            kind: self._cache.peek(method_key(name, *args), old_version)
+            for kind, name, args in INCREMENTAL_AGGREGATES
+        }
+
+        new_store = self.processor.append_partition(new_partition, program)
+        deltas = self._partition_aggregates(new_store)
+
+        version = self._data_version()
+        for kind, name, args in INCREMENTAL_AGGREGATES:
+            if bases[kind] is not None:
+                self._cache.put(method_key(name, *args), version, bases[kind].merge(deltas[kind]))
+
+        for kind in DIRTY_CELL_KINDS:
+            # Ô (năm, nhóm) có thí sinh trong partition mới; histogram khối có trục (khoi, nam_hoc)
+            groups = deltas[kind].nonzero_groups()
+            if kind == "block":
+                groups = [(year, block) for block, year in groups]
+            self._dirty.setdefault(kind, set()).update(groups)
+        return self._get_dirty_cells()
+
+    def _get_dirty_cells(self) -> pd.DataFrame:
+        """Output: ['loai', 'nam_hoc', 'nhom'] — loai ∈ subject / block / region."""
+        rows = [
+            {"loai": kind, "nam_hoc": int(year), "nhom": group}
+            for kind, cells in self._dirty.items()
+            for year, group in cells
+        ]
+        out = pd.DataFrame(rows, columns=["loai", "nam_hoc", "nhom"])
+        return out.sort_values(["loai", "nam_hoc", "nhom"]).reset_index(drop=True)
+
     # ----------------------------- Internal Methods -----------------------------
     # Phân tích phân phối điểm của một môn học cụ thể
+    @memoized
     def _analyze_score_distribution(self, subject: str) -> pd.Series:
-        df = self.processor.get_processed_data()
-        if subject not in df.columns:
+        store = self.processor.get_score_store()
+        if subject not in store.subjects:
             return pd.Series()
-        return df[subject].value_counts().sort_index()
+        # Đếm trực tiếp trên mã điểm đã nén (không cần cột float dày)
+        _, codes = store.column(subject)
+        counts = np.bincount(codes, minlength=MAX_SCORE_CODE + 1)
+        bins = np.flatnonzero(counts)
+        return pd.Series(
+            counts[bins],
+            index=pd.Index(bins / SCORE_SCALE, name=subject),
+            name="count",
+        )
     
     # ===== CÁC HÀM NHÓM PHÂN TÍCH DỮ LIỆU 
     # Phân tích thống kê điểm theo môn học.
+    @memoized
     def _aggregate_by_exam_subsections(self, subject: str) -> pd.DataFrame:
         """
         Trả về DataFrame phân phối điểm theo môn học và theo từng năm.
@@ -109,54 +597,99 @@ class Analysis:
         
         Output: ['nam_hoc', 'mon_hoc', 'diem', 'so_hoc_sinh']
         """
-        df = self.processor.get_processed_data()
-
-        # Các cột điểm (trừ sbd, nam_hoc)
-        score_columns = df.select_dtypes(include='number').columns.difference(['sbd', 'nam_hoc'])
-        
-        target_cols = [subject] if subject != "All" else score_columns
-        if subject != "All" and subject not in df.columns:
-             return pd.DataFrame()
-
-        records = []
+        store = self.processor.get_score_store()
 
-        # Khi chỉ phân tích một môn
-        if subject != "All":
-            if subject not in score_columns:
+        if subject != "All" and subject not in store.subjects:
+            # Cột có tồn tại nhưng không phải cột điểm (vd: 'sbd') → báo lỗi như trước
+            if subject in self.processor.processed_columns:
                 raise ValueError(f"Môn '{subject}' không tồn tại trong dữ liệu!")
+            return pd.DataFrame()
 
-            for year, df_year in df.groupby("nam_hoc"):
-                counts = df_year[subject].value_counts().sort_index()
-                for score, count in counts.items():
-                    records.append({
-                        "nam_hoc": year,
-                        "mon_hoc": subject,
-                        "diem": score,
-                        "so_hoc_sinh": count
-                    })
+        # View của histogram mọi môn (trục môn theo thứ tự tên) → đã sắp sẵn theo (năm, môn, điểm)
+        hist = self._get_subject_histogram()
+        if subject != "All":
+            hist = hist.select(mon_hoc=[subject])
 
-            return pd.DataFrame(records).sort_values(["nam_hoc", "mon_hoc", "diem"])
+        # Môn không thi trong năm → không có ô nào khác 0 → tự bị bỏ qua
+        return hist.to_frame(score_col="diem", count_col="so_hoc_sinh")
 
-        # Nếu phân tích tất cả các môn
-        for year, df_year in df.groupby("nam_hoc"):
-            for col in score_columns:
-                # Chỉ phân tích môn có thật trong năm đó
-                if df_year[col].notna().sum() == 0:
-                    continue
-
-                counts = df_year[col].value_counts().sort_index()
-                for score, count in counts.items():
-                    records.append({
-                        "nam_hoc": year,
-                        "mon_hoc": col,
-                        "diem": score,
-                        "so_hoc_sinh": count
-                    })
-
-        result = pd.DataFrame(records)
-        return result.sort_values(["nam_hoc", "mon_hoc", "diem"]).reset_index(drop=True)
+    # Histogram dày (năm × môn × bin điểm) của toàn bộ môn
+    @memoized
+    def _get_subject_histogram(self) -> ScoreHistogram:
+        """Đếm phân phối mọi (năm, môn) trong một lần bincount trên ScoreStore (workers > 1 → chia môn cho pool)."""
+        store = self.processor.get_score_store()
+        if self._workers > 1:
+            return parallel_subject_histogram(self._get_pool(), store, sorted(store.subjects), self._backend)
+        return build_subject_histogram(store, sorted(store.subjects), self._backend.count_keys)
     
+    # Cube (năm × chương trình × mã tỉnh × môn × bin) dùng chung cho các truy vấn chồng lấn
+    @memoized
+    def _get_score_cube(self) -> ScoreCube:
+        """Vật chất hoá cube điểm một lần cho mỗi phiên bản dữ liệu."""
+        return build_score_cube(self.processor.get_score_store(), self.processor.get_program_codes())
+
+    # Thống kê cặp môn (pairwise-complete) theo (năm, mã tỉnh) — một lượt qua dữ liệu
+    @memoized
+    def _get_pairwise_moments(self) -> PairwiseMoments:
+        return build_pairwise_moments(self.processor.get_score_store())
+
+    def _region_moments(self, moments: PairwiseMoments, region: str | None) -> PairwiseMoments:
+        """Cộng trục mã tỉnh: None → toàn quốc, tên tỉnh cũ → các mã của tỉnh đó."""
+        if region is None:
+            return moments.rollup("ma_tinh")
+        if region not in PRE_REGION_MAP:
+            raise ValueError(f"Tỉnh '{region}' không hợp lệ (không có trong PRE_REGION_MAP).")
+        codes = [int(c) for c in PRE_REGION_MAP[region] if int(c) in moments.labels("ma_tinh")]
+        if not codes:
+            raise ValueError(f"Không có dữ liệu cho tỉnh '{region}'.")
+        return moments.select(ma_tinh=codes).rollup("ma_tinh")
+
+    def _get_correlation_matrices(self, kind: str = "corr", by_region: bool = False,
+                                  min_periods: int = 1) -> dict:
+        """
+        Ma trận tương quan ('corr') / hiệp phương sai ('cov') giữa các môn,
+        pairwise-complete, cho mọi năm (và mọi tỉnh cũ nếu by_region=True).
+
+        Output: {nam_hoc: DataFrame} hoặc {(nam_hoc, tinh): DataFrame}, index/cột = môn.
+        """
+        if kind not in ("corr", "cov"):
+            raise ValueError("kind phải là 'corr' hoặc 'cov'.")
+        moments = self._get_pairwise_moments()
+        regions = [None]
+        if by_region:
+            present = set(moments.labels("ma_tinh").tolist())
+            regions = sorted(r for r, codes in PRE_REGION_MAP.items() if any(int(c) in present for c in codes))
+
+        result = {}
+        for region in regions:
+            grouped = self._region_moments(moments, region)
+            # Một phép tính vector hoá cho mọi năm của nhóm
+            matrices = grouped.correlation(min_periods) if kind == "corr" else grouped.covariance(min_periods)
+            for year, matrix in zip(grouped.labels("nam_hoc").tolist(), matrices):
+                result[year if region is None else (year, region)] = grouped.to_frame(matrix)
+        return result
+
+    def _get_correlation_matrix(self, year: int, region: str | None = None,
+                                kind: str = "corr", min_periods: int = 1) -> pd.DataFrame:
+        """Ma trận tương quan / hiệp phương sai giữa các môn cho một năm (toàn quốc hoặc một tỉnh cũ)."""
+        if kind not in ("corr", "cov"):
+            raise ValueError("kind phải là 'corr' hoặc 'cov'.")
+        moments = self._region_moments(self._get_pairwise_moments().select(nam_hoc=year), region)
+        matrix = moments.correlation(min_periods) if kind == "corr" else moments.covariance(min_periods)
+        return moments.to_frame(matrix)
+
     # Phân tích điểm theo khối thi cụ thể
+    @memoized
+    def _get_block_histogram(self, block: str) -> ScoreHistogram:
+        """Histogram tổng điểm (khoi × nam_hoc × bin) của một khối hoặc 'All'."""
+        if block == "All" and self._workers > 1:
+            return parallel_block_histogram(self._get_pool(), self.processor.get_score_store(),
+                                            BLOCK_SUBJECTS_MAP, self._backend)
+        blocks = BLOCK_SUBJECTS_MAP if block == "All" else {block: BLOCK_SUBJECTS_MAP[block]}
+        return build_block_histogram(self.processor.get_score_store(), blocks,
+                                     count_keys=self._backend.count_keys)
+
+    @memoized
     def _analyze_scores_by_exam_block(self, block: str) -> pd.DataFrame:
         """
         Trả về phân phối tổng điểm theo khối thi và từng năm.
@@ -164,147 +697,159 @@ class Analysis:
         'All' -> phân tích tất cả các khối.
         Output: ['khoi', 'nam_hoc', 'tong_diem', 'so_hoc_sinh']
         """
+        # Histogram mọi khối đã có (vd sau update) → cắt lát thay vì quét lại dữ liệu
+        all_blocks = self._cache.peek(method_key("_get_block_histogram", "All"), self._data_version())
+        if block != "All" and all_blocks is not None and block in all_blocks.labels("khoi"):
+            hist = all_blocks.select(khoi=[block])
+        else:
+            hist = self._get_block_histogram(block)
 
-        df = self.processor.get_processed_data()
-
-        block_subjects_map = {
-            'A00': ['toan', 'vat_li', 'hoa_hoc'],
-            'A01': ['toan', 'vat_li', 'ngoai_ngu'],
-            'A02': ['toan', 'vat_li', 'sinh_hoc'],
-            'A03': ['toan', 'vat_li', 'lich_su'],
-            'A04': ['toan', 'vat_li', 'dia_li'],
-            'A05': ['toan', 'hoa_hoc', 'lich_su'],
-            'A06': ['toan', 'hoa_hoc', 'dia_li'],
-            'A07': ['toan', 'lich_su', 'dia_li'],
-            'A08': ['toan', 'lich_su', 'gdcd'],
-            'A09': ['toan', 'dia_li', 'gdcd'],
-            'A10': ['toan', 'vat_li', 'gdcd'],
-            'A11': ['toan', 'hoa_hoc', 'gdcd'],                                                                                        
-            'B00': ['toan', 'hoa_hoc', 'sinh_hoc'],
-            'B01': ['toan', 'lich_su', 'sinh_hoc'],
-            'B02': ['toan', 'sinh_hoc', 'dia_li'],
-            'B03': ['toan', 'sinh_hoc', 'ngu_van'],
-            'B04': ['toan', 'sinh_hoc', 'gdcd'],
-            'B08': ['toan', 'sinh', 'ngoai_ngu'],          
-            'C00': ['ngu_van', 'lich_su', 'dia_li'],
-            'C01': ['ngu_van', 'toan', 'vat_li'],
-            'C02': ['ngu_van', 'toan', 'hoa_hoc'],
-            'C03': ['ngu_van', 'toan', 'lich_su'],
-            'C04': ['ngu_van', 'toan', 'dia_li'],
-            'C05': ['ngu_van', 'vat_li', 'hoa_hoc'],
-            'C06': ['ngu_van', 'vat_li', 'sinh_hoc'],
-            'C07': ['ngu_van', 'vat_li', 'lich_su'],            
-            'C08': ['ngu_van', 'hoa_hoc', 'sinh_hoc'],
-            'C09': ['ngu_van', 'dia_li', 'vat_li'],
-            'C10': ['ngu_van', 'hoa_hoc', 'lich_su'],
-            'C11': ['ngu_van', 'hoa_hoc', 'dia_li'],            
-            'C12': ['ngu_van', 'lich_su', 'sinh_hoc'],
-            'C13': ['ngu_van', 'dia_li', 'sinh_hoc'],
-            'C14': ['ngu_van', 'toan', 'gdcd'],
-            'C16': ['ngu_van', 'vat_li', 'gdcd'],
-            'C17': ['ngu_van', 'hoa_hoc', 'gdcd'],
-            'C19': ['ngu_van', 'lich_su', 'gdcd'],
-            'C20': ['ngu_van', 'dia_ly', 'gdcd'],                                                                                         
-            'D01': ['toan', 'ngu_van', 'ngoai_ngu'],
-            'D07': ['toan', 'hoa', 'ngoai_ngu'],
-            'D08': ['toan', 'sinh_hoc', 'ngoai_ngu'],
-            'D09': ['toan', 'lich_su', 'ngoai_ngu'],
-            'D10': ['toan', 'dia_li', 'ngoai_ngu'],
-            'D11': ['ngu_van', 'vat_li', 'ngoai_ngu'],
-            'D12': ['ngu_van', 'hoa_hoc', 'ngoai_ngu'],
-            'D13': ['ngu_van', 'sinh_hoc', 'ngoai_ngu'],
-            'D14': ['ngu_van', 'lich_su', 'ngoai_ngu'],
-            'D15': ['ngu_van', 'dia_li', 'ngoai_ngu'],
-            'D66': ['ngu_van', 'gdcd', 'ngoai_ngu'],
-            'D84': ['toan', 'ngoai_ngu', 'gdcd'],                                             
-            'X02': ['toan', 'ngu_van', 'tin_hoc'],
-            'X03': ['toan', 'ngu_van', 'cn_cong_nghiep'],
-            'X04': ['toan', 'ngu_van', 'cn_nong_nghiep'],
-            'X06': ['toan', 'vat_li', 'tin_hoc'],
-            'X07': ['toan', 'vat_li', 'cn_cong_nghiep'],
-            'X08': ['toan', 'vat_li', 'cn_nong_nghiep'],
-            'X10': ['toan', 'hoa_hoc', 'tin_hoc'],
-            'X11': ['toan', 'hoa_hoc', 'cn_cong_nghiep'],
-            'X12': ['toan', 'hoa_hoc', 'cn_nong_nghiep'],
-            'X14': ['toan', 'sinh_hoc', 'tin_hoc'],
-            'X15': ['toan', 'sinh_hoc', 'cn_cong_nghiep'],
-            'X16': ['toan', 'sinh_hoc', 'cn_nong_nghiep'],
-            'X18': ['toan', 'lich_su', 'tin_hoc'],
-            'X26': ['toan', 'tin_hoc', 'ngoai_ngu'],
-            'X27': ['toan', 'cn_cong_nghiep', 'ngoai_ngu'],
-            'X28': ['toan', 'cn_nong_nghiep', 'ngoai_ngu'],
-            'X53': ['toan', 'gdcd', 'tin_hoc'],
-            'X54': ['toan', 'gdcd', 'cn_nong_nghiep'],
-            'X55': ['toan', 'gdcd', 'cn_cong_nghiep'],
-            'X56': ['toan', 'tin_hoc', 'cn_nong_nghiep'],
-            'X57': ['toan', 'tin_hoc', 'cn_cong_nghiep'],
-            'X59': ['ngu_van', 'vat_li', 'tin_hoc'],
-            'X60': ['ngu_van', 'vat_li', 'cn_cong_nghiep'],
-            'X61': ['ngu_van', 'vat_li', 'cn_nong_nghiep'],
-            'X63': ['ngu_van', 'hoa_hoc', 'tin_hoc'],
-            'X64': ['ngu_van', 'hoa_hoc', 'cn_cong_nghiep'],
-            'X66': ['ngu_van', 'hoa_hoc', 'tin_hoc'],
-            'X67': ['ngu_van', 'sinh_hoc', 'tin_hoc'],
-            'X68': ['ngu_van', 'sinh_hoc', 'cn_cong_nghiep'],
-            'X69': ['ngu_van', 'sinh_hoc', 'cn_nong_nghiep'],
-            'X71': ['ngu_van', 'lich_su', 'tin_hoc'],
-            'X72': ['ngu_van', 'lich_su', 'cn_cong_nghiep'],
-            'X73': ['ngu_van', 'lich_su', 'cn_nong_nghiep'],
-            'X75': ['ngu_van', 'dia_li', 'tin_hoc'],
-            'X76': ['ngu_van', 'dia_li', 'cn_cong_nghiep'],
-            'X77': ['ngu_van', 'dia_li', 'tin_hoc'],
-            'X79': ['ngu_van', 'ngoai_ngu', 'tin_hoc'],
-            'X80': ['ngu_van', 'ngoai_ngu', 'cn_cong_nghiep'],
-            'X81': ['ngu_van', 'ngoai_ngu', 'cn_nong_nghiep'],
-            'Y07': ['ngu_van', 'gdcd', 'tin_hoc'],
-            'Y08': ['ngu_van', 'gdcd', 'cn_cong_nghiep'],
-            'Y09': ['ngu_van', 'gdcd', 'cn_nong_nghiep'],
-            'Y10': ['ngu_van', 'tin_hoc', 'cn_cong_nghiep'],
-            'Y11': ['ngu_van', 'tin_hoc', 'cn_nong_nghiep'],   
-        }
+        out = hist.to_frame(score_col="tong_diem")
+        return self._backend.sort_frame(out[['khoi', 'nam_hoc', 'tong_diem', 'so_hoc_sinh']],
+                                        ['khoi', 'nam_hoc', 'tong_diem'])
+    
+    # Khối có tổng điểm cao nhất của từng thí sinh (dữ liệu mô phỏng xét tuyển)
+    @memoized
+    def _get_best_block(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(mã tổng điểm cao nhất int16, chỉ số khối int16, tên khối) theo dòng của ScoreStore; -1 = không đủ khối nào."""
+        return best_block_totals(self.processor.get_score_store(), BLOCK_SUBJECTS_MAP)
 
-        blocks_to_run = (
-            block_subjects_map.keys() if block == "All" else [block]
-        )
+    @memoized
+    def _get_best_block_histogram(self) -> ScoreHistogram:
+        """Phân phối toàn quốc của tổng điểm khối cao nhất (nam_hoc × bin)."""
+        best_total, _, _ = self._get_best_block()
+        return build_best_block_histogram(self.processor.get_score_store(), best_total)
 
-        results = []
+    def _get_best_block_frame(self) -> pd.DataFrame:
+        """
+        Bảng theo thí sinh (chỉ người đủ môn ít nhất một khối).
+        Output: ['sbd', 'nam_hoc', 'khoi', 'tong_diem'] (không có 'sbd' nếu dữ liệu thiếu cột này)
+        """
+        store = self.processor.get_score_store()
+        best_total, best_block, names = self._get_best_block()
+        rows = np.flatnonzero(best_total >= 0)
 
-        for b in blocks_to_run:
-            subjects = block_subjects_map[b]
-            valid_subjects = [s for s in subjects if s in df.columns]
+        data = {}
+        if "sbd" in self.processor.processed_columns:
+            data["sbd"] = self.processor.get_processed_data(columns=["sbd"])["sbd"].to_numpy()[rows]
+        data["nam_hoc"] = store.years[rows].astype(np.int64)
+        data["khoi"] = names[best_block[rows]]
+        data["tong_diem"] = best_total[rows] / SCORE_SCALE
+        return pd.DataFrame(data)
 
-            # Không có môn nào trong năm → bỏ qua
-            if len(valid_subjects) == 0:
-                continue
+    # Môn được cộng vào tổng điểm khi so sánh tỉnh
+    def _region_score_cols(self) -> list[str]:
+        store = self.processor.get_score_store()
 
-            df_b = df[['nam_hoc'] + valid_subjects].copy()
-            df_b['so_mon_co_diem'] = df_b[valid_subjects].notna().sum(axis=1)
+        # Danh sách môn học
+        mon_hoc = [
+            'toan', 'ngu_van', 'ngoai_ngu', 
+            'vat_li', 'hoa_hoc', 'sinh_hoc',
+            'lich_su', 'dia_li', 'gdcd',
+            'cn_cong_nghiep', 'cn_nong_nghiep'
+        ]
+        score_cols = [c for c in mon_hoc if c in store.subjects]
+
+        if not score_cols:
+            raise ValueError("Không tìm thấy cột điểm nào trong DataFrame.")
+        return score_cols
 
-            # Chỉ nhận học sinh thi đủ môn
-            df_b = df_b[df_b['so_mon_co_diem'] == len(valid_subjects)]
+    # Tổng điểm theo dòng dùng cho so sánh tỉnh (tính một lần mỗi phiên bản dữ liệu)
+    @memoized
+    def _get_region_row_totals(self) -> tuple[np.ndarray, np.ndarray, int]:
+        """Tổng điểm (mã nguyên) và số môn có điểm của từng dòng, trên các môn so sánh tỉnh.
 
-            if df_b.empty:
-                continue
+        Returns:
+            tuple: (tổng mã điểm int64, số môn có điểm, số môn được cộng).
+        """
+        score_cols = self._region_score_cols()
 
-            df_b['tong_diem'] = df_b[valid_subjects].sum(axis=1)
+        # Tổng điểm theo dòng (mã nguyên) + số môn có điểm, cộng dồn trên dạng nén
+        total, n_scores = _row_totals(self.processor.get_score_store(), score_cols)
+        return total, n_scores, len(score_cols)
 
-            dist = (
-                df_b.groupby(['nam_hoc', 'tong_diem'])
-                    .size()
-                    .reset_index(name='so_hoc_sinh')
-                    .assign(khoi=b)
+    # Histogram tổng điểm theo tỉnh cũ — nền cho mọi phép gộp tỉnh (không quét lại dòng)
+    @memoized
+    def _get_province_histogram(self) -> ScoreHistogram:
+        """Histogram (nam_hoc × tỉnh cũ × bin tổng điểm) — nguồn của compare_by_region("ALL")."""
+        if self._workers > 1:
+            # Chia tỉnh cho các worker (mỗi worker chỉ chạm dòng của tỉnh được giao)
+            # dùng chung tổng điểm theo dòng đã memo (worker chỉ cắt lát dòng theo tỉnh)
+            region_names = sorted(PRE_REGION_MAP)
+            total, n_scores, n_subjects = self._get_region_row_totals()
+            pool = self._get_pool()
+            order, offsets = self.processor.get_score_store().province_index()
+            totals = pool.share("region_totals", {
+                "total": total, "n_scores": n_scores, "order": order, "offsets": offsets,
+            })
+            year, r, score, cnt = parallel_region_counts(
+                pool,
+                [[int(c) for c in PRE_REGION_MAP[name]] for name in region_names],
+                totals,
+                n_subjects,
+                self._backend,
+            )
+            years, y = np.unique(year, return_inverse=True)
+            counts = np.zeros((len(years), len(region_names), n_subjects * MAX_SCORE_CODE + 1), dtype=np.int64)
+            counts[y, r, score] = cnt
+            return ScoreHistogram(
+                counts,
+                [("nam_hoc", years.astype(np.int64)), ("tinh", np.asarray(region_names, dtype=object))],
             )
 
-            results.append(dist)
+        total, n_scores, n_subjects = self._get_region_row_totals()
+        return _build_province_histogram(self.processor.get_score_store(), total, n_scores,
+                                         n_subjects, self._backend.count_keys)
 
-        if not results:
-            return pd.DataFrame(columns=['khoi', 'nam_hoc', 'tong_diem', 'so_hoc_sinh'])
+    # Gộp histogram tỉnh cũ theo nhóm tỉnh (tỉnh mới sau sáp nhập hoặc nhóm tuỳ chọn)
+    @memoized
+    def _aggregate_region_groups(self, groups: tuple[tuple[str, tuple[str, ...]], ...]) -> ScoreHistogram:
+        """Cộng các lát tỉnh cũ của histogram nền theo từng nhóm mã tỉnh.
+
+        Args:
+            groups (tuple): Kết quả của _normalize_region_groups.
+
+        Returns:
+            ScoreHistogram: Trục ('nam_hoc', 'tinh' = tên nhóm) × bin tổng điểm.
+        """
+        base = self._get_province_histogram()
+        old_names = base.labels("tinh").tolist()
+        counts = base.counts
+
+        merged = np.zeros((counts.shape[0], len(groups), counts.shape[2]), dtype=counts.dtype)
+        for g, (_, codes) in enumerate(groups):
+            members = sorted({old_names.index(_CODE_TO_OLD_REGION[c]) for c in codes})
+            merged[:, g, :] = counts[:, members, :].sum(axis=1)
+
+        return ScoreHistogram(
+            merged,
+            [("nam_hoc", base.labels("nam_hoc")),
+             ("tinh", np.asarray([name for name, _ in groups], dtype=object))],
+        )
+
+    def _get_merged_region_histogram(self, groups: dict[str, list[str]] | None = None) -> ScoreHistogram:
+        """Histogram theo tỉnh mới (REGION_MAP_RAW) hoặc theo nhóm tỉnh tuỳ chọn."""
+        return self._aggregate_region_groups(
+            _normalize_region_groups(REGION_MAP_RAW if groups is None else groups)
+        )
+
+    def _compare_by_merged_region(self, region: str, groups: dict[str, list[str]] | None = None) -> pd.DataFrame:
+        """
+        Phân phối tổng điểm theo tỉnh gộp và theo từng năm (cùng định dạng compare_by_region).
+
+        region: tên tỉnh mới / tên nhóm, 'ALL' → tất cả nhóm.
+        groups: None → REGION_MAP_RAW; hoặc {tên nhóm: [mã tỉnh cũ, ...]}.
+        Output: ['nam_hoc', 'tinh', 'tong_diem', 'so_hoc_sinh']
+        """
+        hist = self._get_merged_region_histogram(groups)
+        if region != "ALL":
+            if region not in hist.labels("tinh"):
+                raise ValueError(f"Tỉnh/nhóm '{region}' không có trong nhóm tỉnh đã cho.")
+            hist = hist.select(tinh=[region])
+        return hist.to_frame(score_col="tong_diem")
 
-        out = pd.concat(results, ignore_index=True)
-        return out[['khoi', 'nam_hoc', 'tong_diem', 'so_hoc_sinh']] \
-                .sort_values(['khoi', 'nam_hoc', 'tong_diem'])
-    
     # Phân tích so sánh điểm theo tỉnh thành.
+    @memoized
     def _compare_by_region(self, region: str) -> pd.DataFrame:
         """
         Phân phối tổng điểm theo tỉnh và theo từng năm.
@@ -322,172 +867,357 @@ class Analysis:
 
         Ghi chú
         -------
-        - Ở đây sử dụng map tỉnh trước khi thay đổi mã (pre_region_map),
+        - Ở đây sử dụng map tỉnh trước khi thay đổi mã (PRE_REGION_MAP),
           tức mỗi mã 01..64 tương ứng 1 tỉnh duy nhất.
-        - region_map_raw (sau đợt chuyển đổi, gộp tỉnh) có thể dùng riêng
-          cho bài dự báo 2026 nhưng KHÔNG dùng trong hàm này để đảm bảo
-          export đúng “tỉnh trước khi có sự thay đổi”.
+        - REGION_MAP_RAW (sau đợt chuyển đổi, gộp tỉnh) dùng trong
+          compare_by_merged_region (cộng histogram tỉnh cũ), KHÔNG dùng trong
+          hàm này để đảm bảo export đúng “tỉnh trước khi có sự thay đổi”.
         """
-        df = self.processor.get_processed_data()
-        
-        # Map tỉnh trước chuyển đổi: 01..64, mỗi mã 1 tỉnh
-        pre_region_map = {
-            "Hà Nội": ["01"],
-            "Thành phố Hồ Chí Minh": ["02"],
-            "Hải Phòng": ["03"],
-            "Đà Nẵng" : ["04"],
-            "Hà Giang": ["05"],
-            "Cao Bằng": ["06"],
-            "Lai Châu": ["07"],
-            "Lào Cai": ["08"],
-            "Tuyên Quang": ["09"],
-            "Lạng Sơn": ["10"],
-            "Bắc Kạn": ["11"],
-            "Thái Nguyên": ["12"],
-            "Yên Bái": ["13"],
-            "Sơn La": ["14"],
-            "Phú Thọ": ["15"],
-            "Vĩnh Phúc": ["16"],
-            "Quảng Ninh": ["17"],
-            "Bắc Giang": ["18"],
-            "Bắc Ninh": ["19"],
-            "Hải Dương": ["21"],
-            "Hưng Yên": ["22"],
-            "Hoà Bình": ["23"],
-            "Hà Nam": ["24"],
-            "Nam Định": ["25"],
-            "Thái Bình": ["26"],
-            "Ninh Bình": ["27"],
-            "Thanh Hoá": ["28"],
-            "Nghệ An": ["29"],
-            "Hà Tĩnh": ["30"],
-            "Quảng Bình": ["31"],
-            "Quảng Trị": ["32"],
-            "Huế": ["33"],
-            "Quảng Nam": ["34"],
-            "Quảng Ngãi": ["35"],
-            "Kon Tum": ["36"],
-            "Bình Định": ["37"],
-            "Gia Lai": ["38"],
-            "Phú Yên": ["39"],
-            "Đắk Lắk": ["40"],
-            "Khánh Hoà": ["41"],
-            "Lâm Đồng": ["42"],
-            "Bình Phước": ["43"],
-            "Bình Dương": ["44"],
-            "Ninh Thuận": ["45"],
-            "Tây Ninh": ["46"],
-            "Bình Thuận": ["47"],
-            "Đồng Nai": ["48"],
-            "Long An": ["49"],
-            "Đồng Tháp": ["50"],
-            "An Giang": ["51"],
-            "Vũng Tàu": ["52"],
-            "Tiền Giang": ["53"],
-            "Kiên Giang": ["54"],
-            "Cần Thơ": ["55"],
-            "Bến Tre": ["56"],
-            "Vĩnh Long": ["57"],
-            "Trà Vinh": ["58"],
-            "Sóc Trăng": ["59"],
-            "Bạc Liêu": ["60"],
-            "Cà Mau": ["61"],
-            "Điện Biên": ["62"],
-            "Đăk Nông": ["63"],
-            "Hậu Giang": ["64"]
-        }
-        
-        # Map tỉnh theo nhiều mã sau đợt chuyển đổi (để dành cho bài toán khác)
-        region_map_raw = {
-            "Hà Nội": ["01"],
-            "Thành phố Hồ Chí Minh": ["02", "44", "52"],
-            "Hải Phòng": ["03", "21"],
-            "Đà Nẵng": ["04", "34"],
-            "Huế": ["33"],
-            "Cần Thơ": ["55", "59", "64"],
-            "Tuyên Quang": ["05", "09"],
-            "Cao Bằng": ["06"],
-            "Lai Châu": ["07"],
-            "Lào Cai": ["08", "13"],
-            "Lạng Sơn": ["10"],
-            "Thái Nguyên": ["11", "12"],
-            "Sơn La": ["14"],
-            "Phú Thọ": ["15", "16", "23"],
-            "Bắc Ninh": ["18", "19"],
-            "Quảng Ninh": ["17"],
-            "Hưng Yên": ["22", "26"],
-            "Ninh Bình": ["24", "25", "27"],
-            "Điện Biên": ["62"],
-            "Thanh Hóa": ["28"],
-            "Nghệ An": ["29"],
-            "Hà Tĩnh": ["30"],
-            "Quảng Trị": ["31", "32"],
-            "Quảng Ngãi": ["35", "36"],
-            "Gia Lai": ["37", "38"],
-            "Đắk Lắk": ["39", "40"],
-            "Khánh Hòa": ["41", "45"],
-            "Lâm Đồng": ["42", "47", "63"],
-            "Đồng Nai": ["43", "48"],
-            "Tây Ninh": ["46", "49"],
-            "Đồng Tháp": ["50"],
-            "Tiền Giang": ["53"],
-            "An Giang": ["51", "54"],
-            "Vĩnh Long": ["56", "57", "58"],
-            "Cà Mau": ["60", "61"]
-        }
-
-        # Chuyển mã → tỉnh theo hệ cũ (pre_region_map)
-        code_to_region = {
-            code: region_name
-            for region_name, codes in pre_region_map.items()
-            for code in codes
-        }
+        # Lọc theo tỉnh nếu user chỉ định
+        if region != "ALL" and region not in PRE_REGION_MAP:
+            raise ValueError(f"Tỉnh '{region}' không hợp lệ (không có trong PRE_REGION_MAP).")
 
-        # Chuẩn hóa SBD
-        if 'sbd' not in df.columns:
-            raise ValueError("Thiếu cột 'sbd'.")
-        df = df.copy()
-        df['sbd'] = df['sbd'].astype(str).str.zfill(8)
-        df['ma_tinh'] = df['sbd'].str[:2]       
-        df['tinh'] = df['ma_tinh'].map(code_to_region)
-        df = df.dropna(subset=['tinh'])
+        # Toàn bộ tỉnh: view của histogram tỉnh (dùng chung với tỉnh gộp, cập nhật tăng dần được)
+        if region == "ALL":
+            return self._get_province_histogram().to_frame(score_col="tong_diem")
 
-        # Lọc theo tỉnh nếu user chỉ định
-        if region != "ALL":
-            if region not in pre_region_map:
-                raise ValueError(f"Tỉnh '{region}' không hợp lệ (không có trong pre_region_map).")
-            df = df[df['tinh'] == region]
+        store = self.processor.get_score_store()
 
-        # Danh sách môn học
-        mon_hoc = [
-            'toan', 'ngu_van', 'ngoai_ngu', 
-            'vat_li', 'hoa_hoc', 'sinh_hoc',
-            'lich_su', 'dia_li', 'gdcd',
-            'cn_cong_nghiep', 'cn_nong_nghiep'
-        ]
-        score_cols = [c for c in mon_hoc if c in df.columns]
+        # Bảng tra mã tỉnh (int) → chỉ số tỉnh; -1 cho mã không thuộc PRE_REGION_MAP
+        region_names = [region]
+        region_lookup = _region_lookup(region_names)
 
-        if not score_cols:
-            raise ValueError("Không tìm thấy cột điểm nào trong DataFrame.")
+        # Chỉ mục tỉnh → dòng (xây một lần mỗi phiên bản dữ liệu): chỉ chạm dòng của tỉnh cần hỏi
+        rows = store.province_rows([int(c) for c in PRE_REGION_MAP[region]])
 
-        # Xác định ai có ít nhất 1 môn có điểm
-        df = df[df[score_cols].notna().any(axis=1)]
+        total, n_scores, n_subjects = self._get_region_row_totals()
+        row_region = region_lookup[store.province_codes[rows]]
 
-        # Tính tổng điểm
-        df['tong_diem'] = df[score_cols].sum(axis=1, skipna=True)
+        # Xác định ai có ít nhất 1 môn có điểm và thuộc tỉnh cần phân tích
+        keep = (n_scores[rows] > 0) & (row_region >= 0)
+        rows, row_region = rows[keep], row_region[keep]
 
         # === Phân phối điểm theo năm và tỉnh ===
-        counts = (
-            df.groupby(['nam_hoc', 'tinh', 'tong_diem'])
-            .size()
-            .reset_index(name='so_hoc_sinh')
-            .sort_values(['nam_hoc', 'tinh', 'tong_diem'])
-            .reset_index(drop=True)
-        )
+        years, year_idx = np.unique(store.years[rows], return_inverse=True)
+        n_bins = n_subjects * MAX_SCORE_CODE + 1
+        keys = (year_idx * len(region_names) + row_region) * n_bins + total[rows]
+        uniq, cnt = self._backend.unique_counts(keys)
+        group, score = np.divmod(uniq, n_bins)
+        y, r = np.divmod(group, len(region_names))
+
+        counts = pd.DataFrame({
+            'nam_hoc': years[y].astype(np.int64),
+            'tinh': np.asarray(region_names, dtype=object)[r],
+            'tong_diem': score / SCORE_SCALE,
+            'so_hoc_sinh': cnt,
+        })
+        counts = self._backend.sort_frame(counts, ['nam_hoc', 'tinh', 'tong_diem']).reset_index(drop=True)
 
         return counts
     
-    # ===== CÁC HÀM THỐNG KÊ DỮ LIỆU    
+    # Bảng tra điểm → hạng phần trăm theo (năm, môn/khối, [tỉnh cũ])
+    @memoized
+    def _get_percentile_table(self, kind: str = "block", by_region: bool = False) -> PercentileTable:
+        """
+        kind: 'subject' (điểm từng môn) | 'block' (tổng điểm khối).
+        by_region: True → thêm cột 'tinh' (tỉnh cũ theo PRE_REGION_MAP).
+
+        Nhóm của bảng: (nam_hoc, mon_hoc|khoi) hoặc (nam_hoc, mon_hoc|khoi, tinh).
+        """
+        if kind == "subject":
+            name_col, score_col = "mon_hoc", "diem"
+            if by_region:
+                # Cube đã có trục mã tỉnh → chỉ cộng trục chương trình
+                df = self._get_score_cube().rollup("chuong_trinh").to_frame(score_col=score_col)
+            else:
+                df = self._get_subject_histogram().to_frame(score_col=score_col)
+        elif kind == "block":
+            name_col, score_col = "khoi", "tong_diem"
+            if by_region:
+                # Bản dày khối × năm × tỉnh × bin quá lớn → đếm dạng thưa
+                df = count_block_totals_by_province(self.processor.get_score_store(), BLOCK_SUBJECTS_MAP)
+            else:
+                df = self._get_block_histogram("All").to_frame(score_col=score_col)
+        else:
+            raise ValueError(f"kind '{kind}' không hợp lệ (subject, block).")
+
+        group_cols = ["nam_hoc", name_col]
+        if by_region:
+            df = df.assign(tinh=_province_names(df["ma_tinh"].to_numpy()))
+            df = df[df["tinh"].notna()]
+            group_cols.append("tinh")
+        return PercentileTable.from_frame(df, group_cols, score_col=score_col)
+
+    def _percentile_rank(self, scores, group, kind: str = "block",
+                         by_region: bool = False, method: str = "weak") -> np.ndarray:
+        """Hạng phần trăm của một lô điểm; group: (nam_hoc, môn/khối[, tỉnh]) hoặc list nhãn."""
+        return self._get_percentile_table(kind, by_region).percentile_rank(scores, group, method)
+
+    # Histogram khối theo (năm, chương trình) — nền cho quy đổi điểm giữa chương trình
+    @memoized
+    def _get_block_program_histogram(self) -> ScoreHistogram:
+        """Histogram tổng điểm (khoi × nam_hoc × chuong_trinh × bin) của mọi khối."""
+        return build_block_histogram(self.processor.get_score_store(), BLOCK_SUBJECTS_MAP,
+                                     program_codes=self.processor.get_program_codes(),
+                                     count_keys=self._backend.count_keys)
+
+    def _get_distribution_counts(self, kind: str, name: str, cohort) -> np.ndarray:
+        """
+        Histogram 1 chiều của một môn/khối trong một cohort.
+        cohort: nam_hoc (int) hoặc (nam_hoc, chuong_trinh), vd 2024 hoặc (2025, 'CT2018').
+        """
+        year, program = (cohort if isinstance(cohort, tuple) else (cohort, None))
+        if program is not None and program not in PROGRAMS:
+            raise ValueError(f"Chương trình '{program}' không hợp lệ {PROGRAMS}.")
+
+        if kind == "subject":
+            hist = self._get_score_cube().histogram.rollup("ma_tinh")
+            axis = "mon_hoc"
+        elif kind == "block":
+            hist = self._get_block_program_histogram()
+            axis = "khoi"
+        else:
+            raise ValueError(f"kind '{kind}' không hợp lệ (subject, block).")
+
+        if name not in hist.labels(axis) or year not in hist.labels("nam_hoc"):
+            raise ValueError(f"Không có dữ liệu cho {axis}='{name}', nam_hoc={year}.")
+        selection = {axis: name, "nam_hoc": year}
+        if program is not None:
+            selection["chuong_trinh"] = program
+        hist = hist.select(**selection)
+        counts = hist.counts if program is not None else hist.rollup("chuong_trinh").counts
+        if counts.sum() == 0:
+            raise ValueError(f"Cohort {cohort} không có thí sinh cho {axis}='{name}'.")
+        return counts
+
+    @memoized
+    def _get_equating(self, kind: str, name: str, source, target,
+                      bandwidth: float = DEFAULT_EQUATING_BANDWIDTH) -> EquatingFunction:
+        """Hàm quy đổi equipercentile từ cohort `source` sang thang điểm cohort `target`."""
+        return equipercentile_equate(
+            self._get_distribution_counts(kind, name, source),
+            self._get_distribution_counts(kind, name, target),
+            bandwidth=bandwidth,
+            source=f"{name} {source}",
+            target=f"{name} {target}",
+        )
+
+    # Mật độ KDE theo năm của một môn / khối (FFT trên histogram, không nhân bản thí sinh)
+    @memoized
+    def _kde(self, group: str, bandwidth: float | None = None,
+             bw_adjust: float = 1.0, grid_step: float | None = 0.05) -> pd.DataFrame:
+        """
+        group: tên môn (vd 'toan') hoặc mã khối (vd 'A00').
+        Output: ['nam_hoc', 'diem' | 'tong_diem', 'mat_do'] — mọi năm có thí sinh, sẵn để vẽ.
+        """
+        if group in self._get_subject_histogram().labels("mon_hoc"):
+            hist, score_col = self._get_subject_histogram().select(mon_hoc=group), "diem"
+        elif group in BLOCK_SUBJECTS_MAP:
+            hist, score_col = self._get_block_histogram(group).select(khoi=group), "tong_diem"
+        else:
+            raise ValueError(f"'{group}' không phải môn học hay khối thi hợp lệ.")
+
+        grid, density = hist.kde(bandwidth, bw_adjust, grid_step)
+        years = hist.labels("nam_hoc")
+        has_data = hist.counts.sum(axis=1) > 0
+        return pd.DataFrame({
+            "nam_hoc": np.repeat(years[has_data].astype(np.int64), len(grid)),
+            score_col: np.tile(grid, int(has_data.sum())),
+            "mat_do": density[has_data].ravel(),
+        })
+
+    # Tổ hợp môn thí sinh dự thi (bitmask) theo (năm, mã tỉnh)
+    @memoized
+    def _get_subject_combinations(self) -> SubjectCombinations:
+        return build_subject_combinations(self.processor.get_score_store())
+
+    @memoized
+    def _get_region_combinations(self, by_region: bool = False) -> SubjectCombinations:
+        """Tổ hợp môn toàn quốc theo năm, hoặc theo (năm, tỉnh cũ) nếu by_region=True."""
+        combos = self._get_subject_combinations()
+        if not by_region:
+            return combos.rollup("ma_tinh")
+
+        counts, region_names = _sum_codes_by_region(combos.counts, combos.labels("ma_tinh"), axis=1)
+        return SubjectCombinations(
+            combos.subjects, combos.masks,
+            [("nam_hoc", combos.labels("nam_hoc")), ("tinh", np.asarray(region_names, dtype=object))],
+            counts,
+        )
+
+    def _get_block_eligibility(self, blocks: str | list[str] | None = None,
+                               by_region: bool = False) -> pd.DataFrame:
+        """
+        Tỉ lệ thí sinh đủ môn từng khối (môn không có trong dữ liệu bị bỏ như khi tính tổng khối).
+        Output: index nam_hoc (hoặc nam_hoc, tinh), cột = mã khối.
+        """
+        names = list(BLOCK_SUBJECTS_MAP) if blocks is None else [blocks] if isinstance(blocks, str) else list(blocks)
+        unknown = [b for b in names if b not in BLOCK_SUBJECTS_MAP]
+        if unknown:
+            raise ValueError(f"Khối không hợp lệ: {unknown}")
+
+        combos = self._get_region_combinations(by_region)
+        block_map = {
+            b: valid for b in names
+            if (valid := [s for s in BLOCK_SUBJECTS_MAP[b] if s in combos.subjects])
+        }
+        share = combos.eligible_share(block_map)
+        return share[combos.n_students().reshape(-1) > 0]
+
+    # Histogram 2 chiều theo cặp môn (heatmap EDA)
+    def _joint_rows(self, year: int, province: str | None) -> np.ndarray:
+        """Các dòng của một năm (và một tỉnh cũ nếu có)."""
+        store = self.processor.get_score_store()
+        if province is None:
+            return np.flatnonzero(store.years == year)
+        if province not in PRE_REGION_MAP:
+            raise ValueError(f"Tỉnh '{province}' không hợp lệ (không có trong PRE_REGION_MAP).")
+        rows = store.province_rows([int(c) for c in PRE_REGION_MAP[province]])
+        return rows[store.years[rows] == year]
+
+    @memoized
+    def _get_joint_histograms(self, year: int, province: str | None = None, bin_width: float = 0.25,
+                              subjects: tuple[str, ...] | None = None) -> tuple[tuple[str, ...], np.ndarray, np.ndarray]:
+        """(môn, cặp chỉ số (P, 2), số đếm (P, B, B)) cho mọi cặp trong `subjects` (None → mọi môn)."""
+        store = self.processor.get_score_store()
+        subjects = tuple(store.subjects) if subjects is None else subjects
+        pairs, counts = build_joint_histograms(store, self._joint_rows(year, province), bin_width, list(subjects))
+        return subjects, pairs, counts
+
+    def _joint_frame(self, counts: np.ndarray, subject_a: str, subject_b: str, bin_width: float) -> pd.DataFrame:
+        """Ma trận đếm (bin môn a × bin môn b) có nhãn = cận dưới của bin."""
+        edges = np.round(np.arange(counts.shape[-1]) * bin_width, 2)
+        return pd.DataFrame(counts,
+                            index=pd.Index(edges, name=subject_a),
+                            columns=pd.Index(edges, name=subject_b))
+
+    def _joint_histogram(self, subject_a: str, subject_b: str, year: int,
+                         province: str | None = None, bin_width: float = 0.25) -> pd.DataFrame:
+        store = self.processor.get_score_store()
+        for subject in (subject_a, subject_b):
+            if subject not in store.subjects:
+                raise ValueError(f"Môn '{subject}' không có trong dữ liệu.")
+        if subject_a == subject_b:
+            raise ValueError("Cần hai môn khác nhau.")
+
+        # Bin thô → lấy từ lượt tính gộp mọi cặp (được cache); bin mịn → chỉ đếm cặp này
+        subjects = None if bin_width >= JOINT_BATCH_MIN_WIDTH else tuple(sorted((subject_a, subject_b), key=store.subjects.index))
+        names, pairs, counts = self._get_joint_histograms(year, province, bin_width, subjects)
+        i, j = sorted((names.index(subject_a), names.index(subject_b)))
+        matrix = counts[np.flatnonzero((pairs[:, 0] == i) & (pairs[:, 1] == j))[0]]
+        if names[i] != subject_a:
+            matrix = matrix.T
+        return self._joint_frame(matrix, subject_a, subject_b, bin_width)
+
+    def _joint_histogram_all(self, year: int, province: str | None = None,
+                             bin_width: float = 0.25) -> dict[tuple[str, str], pd.DataFrame]:
+        if bin_width < JOINT_BATCH_MIN_WIDTH:
+            raise ValueError(f"Tính mọi cặp môn cần bin_width >= {JOINT_BATCH_MIN_WIDTH}.")
+        names, pairs, counts = self._get_joint_histograms(year, province, bin_width, None)
+        return {
+            (names[i], names[j]): self._joint_frame(counts[p], names[i], names[j], bin_width)
+            for p, (i, j) in enumerate(pairs)
+        }
+
+    # Histogram môn theo (năm, tỉnh cũ) — cộng từ cube, không quét lại thí sinh
+    @memoized
+    def _get_region_subject_histogram(self) -> ScoreHistogram:
+        """Histogram điểm (nam_hoc × tinh × mon_hoc × bin) theo tỉnh cũ (PRE_REGION_MAP)."""
+        hist = self._get_score_cube().rollup("chuong_trinh")
+        counts, region_names = _sum_codes_by_region(hist.counts, hist.labels("ma_tinh"), axis=1)
+        return ScoreHistogram(counts, [
+            ("nam_hoc", hist.labels("nam_hoc")),
+            ("tinh", np.asarray(region_names, dtype=object)),
+            ("mon_hoc", hist.labels("mon_hoc")),
+        ])
+
+    @memoized
+    def _get_inequality_indices(self, by_region: bool = True,
+                                subjects: tuple[str, ...] | None = None) -> pd.DataFrame:
+        """
+        Gini, Theil, q3/q1 và tỉ lệ điểm liệt (<= 1.0) theo (nam_hoc, [tinh], mon_hoc).
+        Bỏ các nhóm không có thí sinh.
+        """
+        hist = self._get_region_subject_histogram() if by_region else self._get_subject_histogram()
+        if subjects is not None:
+            hist = hist.select(mon_hoc=list(subjects))
+        result = hist.inequality()
+        return result[result["count"] > 0]
+
+    # Mô phỏng điểm chuẩn theo chỉ tiêu (histogram tích luỹ tổng điểm khối)
+    @memoized
+    def _get_cutoff_simulator(self, by_region: bool = False) -> CutoffSimulator:
+        """Nhóm truy vấn: (nam_hoc, khoi) hoặc (nam_hoc, khoi, tinh) nếu by_region=True."""
+        if by_region:
+            # Dùng chung bảng tích luỹ khối theo tỉnh cũ với percentile rank
+            return CutoffSimulator(self._get_percentile_table("block", True))
+        return CutoffSimulator.from_frame(self._analyze_scores_by_exam_block("All"), ["nam_hoc", "khoi"])
+
+    def _simulate_cutoffs(self, queries: pd.DataFrame, by_region: bool = False) -> pd.DataFrame:
+        """queries: ['nam_hoc', 'khoi', ('tinh'), 'chi_tieu'] → thêm ['diem_chuan', 'so_trung_tuyen', 'du_chi_tieu']."""
+        return self._get_cutoff_simulator(by_region).simulate(queries)
+
+    def _project_cutoffs(self, queries: pd.DataFrame, target_year: int = 2026,
+                         n_students: dict[str, float] | pd.Series | None = None,
+                         shift: dict[str, float] | pd.Series | None = None,
+                         base_year: int | None = None) -> pd.DataFrame:
+        """Điểm chuẩn trên phân phối dự báo (năm gốc co giãn theo số thí sinh / dịch theo điểm dự báo)."""
+        forecast = project_block_distribution(self._analyze_scores_by_exam_block("All"), target_year,
+                                              base_year=base_year, n_students=n_students, shift=shift)
+        queries = queries.assign(nam_hoc=target_year) if "nam_hoc" not in queries.columns else queries
+        return CutoffSimulator.from_frame(forecast, ["nam_hoc", "khoi"]).simulate(queries)
+
+    # ===== CÁC HÀM THỐNG KÊ DỮ LIỆU
+    # Histogram của một loại nhóm (môn / khối / tỉnh cũ / tỉnh gộp), có thể lọc theo tên nhóm
+    def _get_group_histogram(self, kind: str, names: str | list[str] | None = None) -> ScoreHistogram:
+        """
+        kind: 'subject' | 'block' | 'region' | 'merged_region'.
+        names: tên nhóm (môn, khối, tỉnh) cần giữ; None → tất cả.
+        """
+        if kind == "subject":
+            hist = self._get_subject_histogram()
+        elif kind == "block":
+            hist = self._get_block_histogram("All")
+        elif kind == "region":
+            hist = self._get_province_histogram()
+        elif kind == "merged_region":
+            hist = self._get_merged_region_histogram()
+        else:
+            raise ValueError(f"kind '{kind}' không hợp lệ (subject, block, region, merged_region).")
+
+        if names is not None:
+            hist = hist.select(**{_GROUP_AXES[kind]: [names] if isinstance(names, str) else list(names)})
+        return hist
+
+    def _summarize_groups(self, kind: str, names, summarize) -> pd.DataFrame:
+        """Áp một phép tóm tắt batched của ScoreHistogram, bỏ các nhóm (năm, nhóm) không có thí sinh."""
+        hist = self._get_group_histogram(kind, names)
+        frame = summarize(hist)
+        has_data = hist.counts.reshape(-1, hist.n_bins).sum(axis=1) > 0
+        return frame[has_data]
+
+    def _get_quantiles(self, kind: str, q, names=None) -> pd.DataFrame:
+        return self._summarize_groups(kind, names, lambda h: h.quantiles(q))
+
+    def _get_pass_rates(self, kind: str, thresholds, names=None) -> pd.DataFrame:
+        return self._summarize_groups(kind, names, lambda h: h.pass_rates(thresholds))
+
+    def _get_boxplot_summary(self, kind: str, names=None, whisker: float = 1.5) -> pd.DataFrame:
+        return self._summarize_groups(kind, names, lambda h: h.boxplot(whisker))
+
+    def _statistics_by_year(self, df: pd.DataFrame, score_col: str) -> dict:
+        """Thống kê mô tả theo năm từ DF phân phối (điểm, so_hoc_sinh).
+
+        Tính trực tiếp trên histogram có trọng số (describe_weighted) → O(số bin)
+        mỗi năm, không nhân bản từng thí sinh bằng index.repeat.
+        """
+        stats_dict: dict[int, dict] = {}
+        for year, df_year in df.groupby("nam_hoc"):
+            stats_dict[year] = describe_weighted(df_year[score_col].to_numpy(),
+                                                 df_year["so_hoc_sinh"].to_numpy())
+        return stats_dict
+
+    @memoized
     def _get_statistics_by_subject(self, subject: str) -> dict:
         """
         Trả về dict thống kê điểm theo môn học cho tất cả năm.
@@ -498,70 +1228,18 @@ class Analysis:
             - DF có các cột: ['nam_hoc', 'mon_hoc', 'diem', 'so_hoc_sinh']
         """
         df = self._aggregate_by_exam_subsections(subject)
+        return self._statistics_by_year(df, "diem")
 
-        stats_dict: dict[int, dict] = {}
-
-        for year, df_year in df.groupby("nam_hoc"):
-            scores = df_year.loc[df_year.index.repeat(df_year["so_hoc_sinh"]), "diem"]
-
-            if scores.empty:
-                stats_dict[year] = None
-                continue
-
-            mean = float(scores.mean())
-            median = float(scores.median())
-            mode_series = scores.mode()
-            mode = float(mode_series.iloc[0]) if not mode_series.empty else None
-            std = float(scores.std())
-            min_val = float(scores.min())
-            max_val = float(scores.max())
-
-            stats_dict[year] = {
-                "mean": mean,
-                "median": median,
-                "mode": mode,
-                "std": std,
-                "min": min_val,
-                "max": max_val,
-            }
-
-        return stats_dict
-
+    @memoized
     def _get_statistics_by_block(self, block: str) -> dict:
         """
         Trả về dict thống kê điểm theo khối thi cho tất cả năm.
         key: nam_hoc, value: dict thống kê (mean, median, mode, std, min, max)
         """
         df = self.analyze_scores_by_exam_block(block)
+        return self._statistics_by_year(df, "tong_diem")
 
-        stats_dict = {}
-
-        for year, df_year in df.groupby("nam_hoc"):
-            scores = df_year.loc[df_year.index.repeat(df_year["so_hoc_sinh"]), "tong_diem"]
-
-            if scores.empty:
-                stats_dict[year] = None
-                continue
-
-            mean = float(scores.mean())
-            median = float(scores.median())
-            mode_series = scores.mode()
-            mode = float(mode_series.iloc[0]) if not mode_series.empty else None
-            std = float(scores.std())
-            min_val = float(scores.min())
-            max_val = float(scores.max())
-
-            stats_dict[year] = {
-                "mean": mean,
-                "median": median,
-                "mode": mode,
-                "std": std,
-                "min": min_val,
-                "max": max_val
-            }
-
-        return stats_dict
-
+    @memoized
     def _get_statistics_by_region(self, region: str) -> dict:
         """
         Trả về dict thống kê điểm cho một tỉnh.
@@ -570,35 +1248,29 @@ class Analysis:
         df = self.compare_by_region(region)
 
         stats_dict = {}
-
         for year, df_year in df.groupby("nam_hoc"):
             df_prov = df_year[df_year["tinh"] == region]
-
-            scores = df_prov.loc[df_prov.index.repeat(df_prov["so_hoc_sinh"]), "tong_diem"]
-
-            if scores.empty:
-                stats_dict[year] = None
-                continue
-
-            mean = float(scores.mean())
-            median = float(scores.median())
-            mode_series = scores.mode()
-            mode = float(mode_series.iloc[0]) if not mode_series.empty else None
-            std = float(scores.std())
-            min_val = float(scores.min())
-            max_val = float(scores.max())
-
-            stats_dict[year] = {
-                "mean": mean,
-                "median": median,
-                "mode": mode,
-                "std": std,
-                "min": min_val,
-                "max": max_val
-            }
+            stats_dict[year] = describe_weighted(df_prov["tong_diem"].to_numpy(),
+                                                 df_prov["so_hoc_sinh"].to_numpy())
 
         return stats_dict
         
+    def _get_statistics_by_merged_region(self, region: str, groups: dict[str, list[str]] | None = None) -> dict:
+        """
+        Trả về dict thống kê điểm cho một tỉnh gộp / nhóm tỉnh.
+        Kết quả: {nam_hoc: {mean, median, mode, std, min, max}} (chỉ các năm có thí sinh)
+        """
+        hist = self._get_merged_region_histogram(groups)
+        if region not in hist.labels("tinh"):
+            raise ValueError(f"Tỉnh/nhóm '{region}' không có trong nhóm tỉnh đã cho.")
+
+        desc = hist.select(tinh=region).describe()
+        desc = desc[desc["count"] > 0].drop(columns="count")
+        return {
+            int(year): {k: float(v) for k, v in row.items()}
+            for year, row in desc.iterrows()
+        }
+
     # ======================== PUBLIC METHODS: PHÂN TÍCH DỮ LIỆU =========================
     # ----------------------- Các hàm phân tích dữ liệu -------------------------
     def get_score_distribution(self, subject: str) -> pd.Series:
@@ -608,7 +1280,22 @@ class Analysis:
     def get_arregate_by_exam_subsections(self, subject: str) -> pd.DataFrame:
         """Lấy dataframe thống kê điểm theo môn học."""
         return self._aggregate_by_exam_subsections(subject)
+
+    def get_subject_histogram(self) -> ScoreHistogram:
+        """Lấy histogram dày (nam_hoc × mon_hoc × bin điểm) của toàn bộ môn."""
+        return self._get_subject_histogram()
     
+    def get_score_cube(self) -> ScoreCube:
+        """Lấy cube histogram điểm (nam_hoc × chuong_trinh × ma_tinh × mon_hoc × bin).
+
+        Dùng cube.slice / cube.rollup / cube.stats để trả lời truy vấn mà không quét lại dữ liệu.
+        """
+        return self._get_score_cube()
+
+    def get_block_histogram(self, block: str = "All") -> ScoreHistogram:
+        """Lấy histogram tổng điểm (khoi × nam_hoc × bin) của một khối hoặc toàn bộ khối."""
+        return self._get_block_histogram(block)
+
     def analyze_scores_by_exam_block(self, block: str) -> pd.DataFrame:
         """Lấy dataframe thống kê điểm theo khối."""
         return self._analyze_scores_by_exam_block(block)
@@ -617,6 +1304,21 @@ class Analysis:
         """Lấy dataframe thống kê điểm theo tỉnh."""
         return self._compare_by_region(region)
 
+    def get_province_histogram(self) -> ScoreHistogram:
+        """Lấy histogram tổng điểm (nam_hoc × tỉnh cũ × bin) — nguồn của compare_by_region("ALL")."""
+        return self._get_province_histogram()
+
+    def get_merged_region_histogram(self, groups: dict[str, list[str]] | None = None) -> ScoreHistogram:
+        """Lấy histogram tổng điểm (nam_hoc × tỉnh gộp × bin), cộng từ histogram tỉnh cũ.
+
+        groups: None → 34 tỉnh mới theo REGION_MAP_RAW; hoặc {tên nhóm: [mã tỉnh cũ]}.
+        """
+        return self._get_merged_region_histogram(groups)
+
+    def compare_by_merged_region(self, region: str = "ALL", groups: dict[str, list[str]] | None = None) -> pd.DataFrame:
+        """Lấy dataframe thống kê điểm theo tỉnh gộp (tỉnh mới hoặc nhóm tuỳ chọn)."""
+        return self._compare_by_merged_region(region, groups)
+
     # ----------------------- Các hàm thống kê dữ liệu -------------------------
     def get_statistics_by_subject(self, subject: str) ->dict:
         """Lấy dict thống kê điểm theo môn học, gồm: mean, median, mode, std, min, max"""
@@ -629,3 +1331,187 @@ class Analysis:
     def get_statistics_by_region(self, region: str) ->dict:
         """Lấy dict thống kê điểm theo tỉnh thành, gồm: mean, median, mode, std, min, max"""
         return self._get_statistics_by_region(region)
+
+    def get_statistics_by_merged_region(self, region: str, groups: dict[str, list[str]] | None = None) -> dict:
+        """Lấy dict thống kê điểm theo tỉnh gộp, gồm: mean, median, mode, std, min, max"""
+        return self._get_statistics_by_merged_region(region, groups)
+
+    # ----------------------- Phân vị / tỉ lệ đạt / boxplot (batched) -------------------------
+    def get_quantiles(self, kind: str, q, names: str | list[str] | None = None) -> pd.DataFrame:
+        """Phân vị q (vd: [0.25, 0.5, 0.75]) cho mọi (năm, nhóm) của một loại nhóm.
+
+        kind: 'subject' | 'block' | 'region' | 'merged_region'; names: lọc theo tên nhóm.
+        """
+        return self._get_quantiles(kind, q, names)
+
+    def get_pass_rates(self, kind: str, thresholds, names: str | list[str] | None = None) -> pd.DataFrame:
+        """Tỉ lệ (0..1) thí sinh đạt điểm >= từng ngưỡng (vd: môn [5, 8], khối [15, 24])."""
+        return self._get_pass_rates(kind, thresholds, names)
+
+    def get_boxplot_summary(self, kind: str, names: str | list[str] | None = None,
+                            whisker: float = 1.5) -> pd.DataFrame:
+        """Tóm tắt boxplot: min, q1, median, q3, max, râu Tukey và số điểm ngoại lai."""
+        return self._get_boxplot_summary(kind, names, whisker)
+
+    # ----------------------- Tương quan giữa các môn -------------------------
+    def get_correlation_matrix(self, year: int, region: str | None = None,
+                               kind: str = "corr", min_periods: int = 1) -> pd.DataFrame:
+        """Lấy ma trận tương quan ('corr') / hiệp phương sai ('cov') giữa các môn của một năm.
+
+        region: None → toàn quốc; tên tỉnh cũ → chỉ tỉnh đó.
+        """
+        return self._get_correlation_matrix(year, region, kind, min_periods)
+
+    def get_correlation_matrices(self, kind: str = "corr", by_region: bool = False,
+                                 min_periods: int = 1) -> dict:
+        """Lấy toàn bộ ma trận theo năm (hoặc theo (năm, tỉnh cũ) nếu by_region=True)."""
+        return self._get_correlation_matrices(kind, by_region, min_periods)
+
+    # ----------------------- Hạng phần trăm (percentile rank) -------------------------
+    def get_percentile_table(self, kind: str = "block", by_region: bool = False) -> PercentileTable:
+        """Lấy bảng tra điểm → hạng phần trăm (toàn quốc hoặc theo tỉnh cũ nếu by_region=True)."""
+        return self._get_percentile_table(kind, by_region)
+
+    def percentile_rank(self, scores, group, kind: str = "block",
+                        by_region: bool = False, method: str = "weak") -> np.ndarray:
+        """Hạng phần trăm (0..100) của một lô điểm, vd:
+
+            analysis.percentile_rank([25.5, 27], (2025, 'D01'))
+            analysis.percentile_rank(8.25, (2025, 'toan', 'Hà Nội'), kind='subject', by_region=True)
+
+        method: 'weak' (% điểm <=), 'strict' (% điểm <) hoặc 'mean'.
+        """
+        return self._percentile_rank(scores, group, kind, by_region, method)
+
+    # ----------------------- Khối tốt nhất của từng thí sinh -------------------------
+    def get_best_block(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Mảng gọn theo dòng dữ liệu: (mã tổng điểm cao nhất int16 — điểm × 100, chỉ số khối int16, tên khối).
+
+        Chỉ xét khối thí sinh thi đủ cả 3 môn; -1 nếu không đủ khối nào. Mảng dùng chung với cache → chỉ đọc (đã khoá ghi, sửa → ValueError).
+        """
+        return self._get_best_block()
+
+    def get_best_block_frame(self) -> pd.DataFrame:
+        """Lấy dataframe khối tốt nhất theo thí sinh: ['sbd', 'nam_hoc', 'khoi', 'tong_diem']."""
+        return self._get_best_block_frame()
+
+    def get_best_block_histogram(self) -> ScoreHistogram:
+        """Lấy phân phối toàn quốc (nam_hoc × bin) của tổng điểm khối cao nhất.
+
+        Dạng bảng: get_best_block_histogram().to_frame(score_col='tong_diem').
+        """
+        return self._get_best_block_histogram()
+
+    # ----------------------- Quy đổi điểm giữa các năm / chương trình -------------------------
+    def get_equating(self, kind: str, name: str, source, target,
+                     bandwidth: float = DEFAULT_EQUATING_BANDWIDTH) -> EquatingFunction:
+        """Lấy hàm quy đổi equipercentile của một môn/khối giữa hai cohort.
+
+        source/target: nam_hoc hoặc (nam_hoc, chuong_trinh), vd get_equating('block', 'A00', (2025, 'CT2018'), 2024).
+        bandwidth: σ làm trơn histogram (đơn vị điểm).
+        """
+        return self._get_equating(kind, name, source, target, bandwidth)
+
+    def equate_scores(self, scores, kind: str, name: str, source, target,
+                      bandwidth: float = DEFAULT_EQUATING_BANDWIDTH) -> np.ndarray:
+        """Quy đổi cả mảng điểm từ cohort source sang thang điểm cohort target trong một lần gọi."""
+        return self._get_equating(kind, name, source, target, bandwidth).equate(scores)
+
+    # ----------------------- Mật độ KDE cho biểu đồ EDA -------------------------
+    def kde(self, group: str, bandwidth: float | None = None,
+            bw_adjust: float = 1.0, grid_step: float | None = 0.05) -> pd.DataFrame:
+        """Mật độ KDE theo năm của một môn/khối, tính bằng FFT trên histogram (O(bins log bins)).
+
+        bandwidth: σ (đơn vị điểm); None → quy tắc Scott theo từng năm (như seaborn).
+        Vẽ: sns.lineplot(data=analysis.kde('toan', bw_adjust=2), x='diem', y='mat_do', hue='nam_hoc').
+        """
+        return self._kde(group, bandwidth, bw_adjust, grid_step)
+
+    # ----------------------- Tổ hợp môn dự thi -------------------------
+    def get_subject_combinations(self, by_region: bool = False) -> SubjectCombinations:
+        """Lấy bảng đếm tổ hợp môn (nam_hoc [× tinh] × mask); dùng .count([...]) / .to_frame()."""
+        return self._get_region_combinations(by_region)
+
+    def get_combination_counts(self, by_region: bool = False, min_count: int = 1) -> pd.DataFrame:
+        """Lấy dataframe ['nam_hoc', ('tinh'), 'to_hop', 'so_mon', 'so_hoc_sinh'] các tổ hợp môn đã thi."""
+        return self._get_region_combinations(by_region).to_frame(min_count)
+
+    def get_block_eligibility(self, blocks: str | list[str] | None = None,
+                              by_region: bool = False) -> pd.DataFrame:
+        """Lấy tỉ lệ (0..1) thí sinh thi đủ môn từng khối theo năm (hoặc năm × tỉnh cũ)."""
+        return self._get_block_eligibility(blocks, by_region)
+
+    # ----------------------- Histogram 2 chiều theo cặp môn -------------------------
+    def joint_histogram(self, subject_a: str, subject_b: str, year: int,
+                        province: str | None = None, bin_width: float = 0.25) -> pd.DataFrame:
+        """Lấy ma trận số thí sinh (bin môn a × bin môn b) của một năm (toàn quốc hoặc một tỉnh cũ).
+
+        Nhãn = cận dưới của bin; vẽ: sns.heatmap(analysis.joint_histogram('toan', 'ngoai_ngu', 2025)).
+        """
+        return self._joint_histogram(subject_a, subject_b, year, province, bin_width)
+
+    def joint_histograms(self, year: int, province: str | None = None,
+                         bin_width: float = 0.25) -> dict[tuple[str, str], pd.DataFrame]:
+        """Lấy histogram 2 chiều của MỌI cặp môn trong một năm (một lượt đếm, có cache)."""
+        return self._joint_histogram_all(year, province, bin_width)
+
+    # ----------------------- Chỉ số bất bình đẳng / phân tán -------------------------
+    def get_inequality_indices(self, by_region: bool = True,
+                               subjects: str | list[str] | None = None) -> pd.DataFrame:
+        """Lấy Gini, Theil, q3/q1 và tỉ lệ điểm liệt (<= 1.0) theo năm × tỉnh cũ × môn (hoặc năm × môn).
+
+        Tính dạng đóng trên histogram cho mọi tỉnh cùng lúc; trùng kết quả tính trên dữ liệu từng thí sinh.
+        """
+        if isinstance(subjects, str):
+            subjects = [subjects]
+        return self._get_inequality_indices(by_region, None if subjects is None else tuple(subjects))
+
+    # ----------------------- Mô phỏng điểm chuẩn -------------------------
+    def get_cutoff_simulator(self, by_region: bool = False) -> CutoffSimulator:
+        """Lấy bộ mô phỏng điểm chuẩn (toàn quốc theo năm × khối, hoặc thêm tỉnh cũ)."""
+        return self._get_cutoff_simulator(by_region)
+
+    def simulate_cutoffs(self, queries: pd.DataFrame, by_region: bool = False) -> pd.DataFrame:
+        """Điểm chuẩn cho một lô (năm, khối, [tỉnh], chỉ tiêu) trong một lần gọi vector hoá."""
+        return self._simulate_cutoffs(queries, by_region)
+
+    def project_cutoffs(self, queries: pd.DataFrame, target_year: int = 2026,
+                        n_students: dict[str, float] | pd.Series | None = None,
+                        shift: dict[str, float] | pd.Series | None = None,
+                        base_year: int | None = None) -> pd.DataFrame:
+        """Dự báo điểm chuẩn năm target_year từ phân phối dự báo.
+
+        n_students: {khối: số thí sinh dự báo} (vd từ ForecastBlockModel.forecast_2026 × tổng thí sinh);
+        shift: {khối: độ lệch tổng điểm dự báo}. queries: ['khoi', 'chi_tieu'] (+ 'nam_hoc' tuỳ chọn).
+        """
+        return self._project_cutoffs(queries, target_year, n_students, shift, base_year)
+
+    def update(self, new_partition: pd.DataFrame, program: str | None = None) -> pd.DataFrame:
+        """Thêm partition mới (vd điểm 2026) mà không tính lại histogram của các năm cũ.
+
+        Kết quả nền đã có trong cache được cộng phần chênh của partition (INCREMENTAL_AGGREGATES):
+        histogram môn, khối ('All'), tỉnh cũ, cube điểm, histogram khối theo chương trình,
+        tổ hợp môn và thống kê cặp môn. Kết quả nền chưa từng được tính sẽ tính đầy đủ ở
+        lần gọi đầu tiên sau update().
+
+        Không cập nhật tăng dần (tính lại trên dữ liệu đã nối ở lần gọi kế tiếp): khối tốt
+        nhất theo thí sinh (get_best_block*), joint histogram, phân phối một môn / một tỉnh
+        (get_score_distribution, compare_by_region(<tỉnh>)) và bảng phân vị khối theo tỉnh.
+        Kết quả luôn giống hệt dựng lại từ đầu.
+
+        Args:
+            new_partition (pd.DataFrame): Cùng schema với dữ liệu đã xử lý ('sbd', 'nam_hoc', các môn).
+            program (str | None): 'CT2006' / 'CT2018'; None → suy theo năm.
+
+        Returns:
+            pd.DataFrame: Các ô (loai, nam_hoc, nhom) bị thay đổi kể từ lần clear_dirty_cells() gần nhất.
+        """
+        return self._update(new_partition, program)
+
+    def get_dirty_cells(self) -> pd.DataFrame:
+        """Các ô (năm, môn / khối / tỉnh) bị thay đổi bởi các lần update() chưa được xử lý."""
+        return self._get_dirty_cells()
+
+    def clear_dirty_cells(self) -> None:
+        """Đánh dấu đã xử lý xong các ô bẩn (vd sau khi export lại các file bị ảnh hưởng)."""
+        self._dirty = {}
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+# Engine cột đa luồng là tuỳ chọn: thiếu thư viện → backend tương ứng báo lỗi khi khởi tạo
+try:
+    import polars as pl
+except ImportError:
+    pl = None
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+
+# Backend mặc định của Analysis
+DEFAULT_BACKEND = "pandas"
+
+
+class ComputeBackend:
+    """Backend tính toán của Analysis: numpy + pandas (mặc định).
+
+    Mô tả:
+        - Gom các phép nặng mà Analysis chạy trên khoá nhóm đã mã hoá thành số nguyên:
+          đếm khoá dày (bincount), đếm khoá thưa (unique) và sắp xếp frame kết quả.
+        - Backend khác (Polars, Arrow) chỉ thay phần tính; đầu vào là mảng numpy và
+          đầu ra luôn là numpy / pandas → API của Analysis không đổi theo backend.
+        - Đếm khoá dày luôn dùng np.bincount (một lượt tuyến tính, không engine group-by
+          nào nhanh hơn); các kernel dày khác (cube, tổ hợp môn, histogram 2 chiều, tổng
+          điểm theo dòng) cũng giữ numpy. Backend chỉ thay đếm khoá thưa và sắp xếp.
+        - Mọi backend phải cho kết quả GIỐNG HỆT backend mặc định
+          (tests/test_compute_backend.py).
+
+    Attributes (public API):
+        name (str): Tên backend trong BACKENDS.
+    """
+
+    # ==================== INTERNAL PRIVATE MEMBERS ====================
+    __slots__ = ()
+
+    name = "pandas"
+
+    # ==================== PUBLIC METHODS (API) ====================
+    def count_keys(self, keys: np.ndarray, minlength: int = 0) -> np.ndarray:
+        """Số lần xuất hiện của từng khoá 0..n-1 (như np.bincount), int64."""
+        return np.bincount(keys, minlength=minlength).astype(np.int64, copy=False)
+
+    def unique_counts(self, keys: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """(khoá khác nhau tăng dần, số lần xuất hiện) — dùng khi không gian khoá quá lớn cho bincount."""
+        uniq, counts = np.unique(keys, return_counts=True)
+        return uniq, counts.astype(np.int64, copy=False)
+
+    def sort_frame(self, df: pd.DataFrame, by: list[str]) -> pd.DataFrame:
+        """Sắp xếp ổn định theo các cột `by` (giữ nguyên index như DataFrame.sort_values)."""
+        return df.sort_values(by)
+
+    # ==================== REPRESENTATION / UTILITIES ====================
+    def __repr__(self) -> str:
+        return f"<{type(self).__name__} name={self.name!r}>"
+
+
+class PolarsBackend(ComputeBackend):
+    """Backend Polars: group-by / sort đa luồng trên cột numpy (không copy qua pandas)."""
+
+    __slots__ = ()
+
+    name = "polars"
+
+    # -------------------- CONSTRUCTOR --------------------
+    def __init__(self) -> None:
+        if pl is None:
+            raise ImportError("Backend 'polars' cần thư viện polars (pip install polars).")
+
+    # ==================== PUBLIC METHODS (API) ====================
+    # count_keys: giữ np.bincount của lớp cha (group-by + sort + scatter chậm hơn ~15 lần)
+    def unique_counts(self, keys: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        grouped = (
+            pl.DataFrame({"key": np.asarray(keys, dtype=np.int64)})
+            .group_by("key").agg(pl.len().alias("n"))
+            .sort("key")
+        )
+        return grouped["key"].to_numpy(), grouped["n"].to_numpy().astype(np.int64)
+
+    def sort_frame(self, df: pd.DataFrame, by: list[str]) -> pd.DataFrame:
+        order = (
+            pl.DataFrame({c: df[c].to_numpy() for c in by})
+            .with_row_index("_pos")
+            .sort(by, maintain_order=True)["_pos"]
+            .to_numpy()
+        )
+        return df.take(order)
+
+
+class ArrowBackend(ComputeBackend):
+    """Backend Arrow compute: group-by (Acero, đa luồng) và sort_indices ổn định."""
+
+    __slots__ = ()
+
+    name = "arrow"
+
+    # -------------------- CONSTRUCTOR --------------------
+    def __init__(self) -> None:
+        if pa is None:
+            raise ImportError("Backend 'arrow' cần thư viện pyarrow (pip install pyarrow).")
+
+    # ==================== PUBLIC METHODS (API) ====================
+    # count_keys: giữ np.bincount của lớp cha (group-by + sort + scatter chậm hơn ~15 lần)
+    def unique_counts(self, keys: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        grouped = (
+            pa.table({"key": np.asarray(keys, dtype=np.int64)})
+            .group_by("key").aggregate([("key", "count")])
+            .sort_by("key")
+        )
+        return (grouped["key"].to_numpy(),
+                grouped["key_count"].to_numpy().astype(np.int64))
+
+    def sort_frame(self, df: pd.DataFrame, by: list[str]) -> pd.DataFrame:
+        import pyarrow.compute as pc
+
+        table = pa.table({c: pa.array(df[c].to_numpy()) for c in by})
+        order = pc.sort_indices(table, sort_keys=[(c, "ascending") for c in by]).to_numpy()
+        return df.take(order)
+
+
+# Tên backend → lớp
+BACKENDS: dict[str, type[ComputeBackend]] = {
+    "pandas": ComputeBackend,
+    "polars": PolarsBackend,
+    "arrow": ArrowBackend,
+}
+
+
+def get_backend(backend: str | ComputeBackend = DEFAULT_BACKEND) -> ComputeBackend:
+    """Lấy backend theo tên (hoặc trả lại instance đã có).
+
+    Raises:
+        ValueError: Tên backend không có trong BACKENDS.
+        ImportError: Backend cần thư viện chưa được cài.
+    """
+    if isinstance(backend, ComputeBackend):
+        return backend
+    if backend not in BACKENDS:
+        raise ValueError(f"Backend '{backend}' không hợp lệ. Các backend: {list(BACKENDS)}")
+    return BACKENDS[backend]()
+
+
+def available_backends() -> list[str]:
+    """Các backend dùng được trong môi trường hiện tại (đủ thư viện)."""
+    names = []
+    for name, cls in BACKENDS.items():
+        try:
+            cls()
+        except ImportError:
+            continue
+        names.append(name)
+    return names
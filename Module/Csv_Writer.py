@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pandas as pd
+
+
+# Số luồng ghi mặc định (ghi file nhả GIL; nhiều hơn vài luồng không lợi thêm trên một ổ đĩa)
+DEFAULT_WRITERS = min(4, os.cpu_count() or 1)
+
+# Số file tối đa đang chờ / đang ghi mỗi luồng (hàng đợi có giới hạn → giới hạn DF giữ trong bộ nhớ)
+PENDING_PER_WRITER = 2
+
+
+def _write_csv(df: pd.DataFrame, path: str) -> int:
+    """Serialize DF sang CSV (như df.to_csv(path, index=False)) rồi ghi; trả về số byte."""
+    data = df.to_csv(index=False).encode("utf-8")
+    with open(path, "wb") as fh:
+        fh.write(data)
+    return len(data)
+
+
+class CsvWriterPool:
+    """Pool luồng ghi CSV đồng thời với hàng đợi có giới hạn.
+
+    Mô tả:
+        - `submit(df, path)` chặn khi đã có đủ max_pending file chờ ghi → bên sinh DF
+          (vd ExportPlan.artifacts) không chạy trước quá xa, bộ nhớ bị chặn trên.
+        - Mỗi luồng tự serialize (to_csv) + ghi file; thư mục phải được tạo trước
+          (Export tạo toàn bộ thư mục một lượt trước khi ghi).
+        - Lỗi ghi được ghi nhận ngay khi file đó lỗi: lần `submit` kế tiếp huỷ các file
+          còn chờ và ném lại lỗi (fail-fast), không đợi tới cuối.
+        - `close()` chờ mọi file ghi xong, ném lại lỗi đầu tiên (nếu có) và trả về
+          tổng kết: số file, số byte, thời gian, thông lượng.
+        - Dùng với `with`: thoát khối luôn dừng các luồng và ném lỗi ghi (nếu có), kể cả
+          khi bên sinh DF đang ném lỗi khác (lỗi đó được giữ làm ngữ cảnh của lỗi ghi).
+
+    Attributes (public API):
+        writers     (int): Số luồng ghi.
+        max_pending (int): Số file tối đa trong hàng đợi.
+    """
+
+    # ==================== INTERNAL PRIVATE MEMBERS ====================
+    __slots__ = (
+        "_writers",       # số luồng ghi
+        "_max_pending",   # kích thước hàng đợi
+        "_executor",      # ThreadPoolExecutor
+        "_slots",         # BoundedSemaphore giới hạn số file đang chờ
+        "_lock",          # bảo vệ bộ đếm
+        "_error",         # lỗi ghi đầu tiên (None nếu chưa có)
+        "_files",         # số file đã ghi xong
+        "_bytes",         # tổng số byte đã ghi
+        "_started",       # thời điểm tạo pool (perf_counter)
+    )
+
+    # -------------------- CONSTRUCTOR --------------------
+    def __init__(self, writers: int = DEFAULT_WRITERS, max_pending: int | None = None) -> None:
+        if not isinstance(writers, int) or writers < 1:
+            raise ValueError("writers phải là số nguyên >= 1.")
+        max_pending = max_pending or writers * PENDING_PER_WRITER
+        if max_pending < 1:
+            raise ValueError("max_pending phải >= 1.")
+
+        self._writers = writers
+        self._max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=writers, thread_name_prefix="csv-writer")
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._lock = threading.Lock()
+        self._error: BaseException | None = None
+        self._files = 0
+        self._bytes = 0
+        self._started = time.perf_counter()
+
+    # -------------------- GETTER (read-only) --------------------
+    @property
+    def writers(self) -> int:
+        return self._writers
+
+    @property
+    def max_pending(self) -> int:
+        return self._max_pending
+
+    # ==================== INTERNAL PRIVATE METHODS ====================
+    def _run(self, df: pd.DataFrame, path: str) -> None:
+        try:
+            n_bytes = _write_csv(df, path)
+            with self._lock:
+                self._files += 1
+                self._bytes += n_bytes
+        except BaseException as error:
+            # Ghi nhận trước khi nhả chỗ trong hàng đợi → submit kế tiếp chắc chắn thấy lỗi
+            with self._lock:
+                if self._error is None:
+                    self._error = error
+            raise
+        finally:
+            self._slots.release()
+
+    def _raise_error(self) -> None:
+        """Có lỗi ghi → huỷ các file còn chờ, dừng luồng và ném lại lỗi đầu tiên."""
+        with self._lock:
+            error = self._error
+        if error is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            raise error
+
+    # ==================== PUBLIC METHODS (API) ====================
+    def submit(self, df: pd.DataFrame, path: str | Path) -> None:
+        """Đưa một file vào hàng đợi ghi (chặn khi hàng đợi đầy).
+
+        Raises:
+            Exception: Lỗi của một file đã ghi trước đó (các file còn chờ bị huỷ).
+        """
+        self._slots.acquire()
+        try:
+            self._raise_error()
+            self._executor.submit(self._run, df, str(path))
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def close(self) -> dict[str, float]:
+        """Chờ ghi xong toàn bộ, dừng các luồng và trả về tổng kết.
+
+        Returns:
+            dict: {'files', 'bytes', 'seconds', 'mb_per_s', 'files_per_s'}.
+
+        Raises:
+            Exception: Lỗi đầu tiên gặp phải khi ghi (sau khi mọi file khác đã xong).
+        """
+        self._executor.shutdown(wait=True)
+        self._raise_error()
+        return self.summary()
+
+    def summary(self) -> dict[str, float]:
+        """Tổng kết tới thời điểm hiện tại: số file, số byte, thời gian và thông lượng."""
+        seconds = time.perf_counter() - self._started
+        with self._lock:
+            files, n_bytes = self._files, self._bytes
+        return {
+            "files": files,
+            "bytes": n_bytes,
+            "seconds": seconds,
+            "mb_per_s": n_bytes / 1e6 / seconds if seconds > 0 else float("nan"),
+            "files_per_s": files / seconds if seconds > 0 else float("nan"),
+        }
+
+    def __enter__(self) -> "CsvWriterPool":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        # Chờ các file đã nhận (hàng đợi có giới hạn); lỗi ghi vẫn được ném dù bên sinh DF đang lỗi
+        self._executor.shutdown(wait=True)
+        if self._error is not None and self._error is not exc:
+            raise self._error
+
+    # ==================== REPRESENTATION / UTILITIES ====================
+    def __repr__(self) -> str:
+        return f"<CsvWriterPool writers={self._writers} max_pending={self._max_pending}>"
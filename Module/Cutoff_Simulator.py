@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from Module.Percentile_Table import PercentileTable
+from Module.Score_Store import SCORE_SCALE
+
+
+# Cột chỉ tiêu trong bảng truy vấn và các cột kết quả
+QUOTA_COL = "chi_tieu"
+CUTOFF_COLS = ["diem_chuan", "so_trung_tuyen", "du_chi_tieu"]
+
+
+class CutoffSimulator:
+    """Mô phỏng điểm chuẩn theo chỉ tiêu trên phân phối tổng điểm khối.
+
+    Mô tả:
+        - Điểm chuẩn của (năm, khối, [tỉnh]) với chỉ tiêu Q = điểm cao nhất t sao cho số
+          thí sinh có tổng điểm >= t đạt Q (mọi thí sinh bằng điểm chuẩn đều trúng tuyển).
+        - Dựng trên histogram tích luỹ (PercentileTable) → một lô hàng nghìn truy vấn
+          (khối, chỉ tiêu) chỉ cần một lần np.searchsorted.
+        - Phân phối có thể là dữ liệu thật (Analysis) hoặc phân phối dự báo (vd 2026,
+          xem project_block_distribution).
+
+    Attributes (public API):
+        table      (PercentileTable): Bảng tích luỹ bên dưới.
+        group_cols (list[str])      : Cột nhóm của truy vấn, vd ['nam_hoc', 'khoi'].
+    """
+
+    # ==================== INTERNAL PRIVATE MEMBERS ====================
+    __slots__ = (
+        "_table",         # PercentileTable: số đếm tích luỹ theo nhóm
+    )
+
+    # -------------------- CONSTRUCTOR --------------------
+    def __init__(self, table: PercentileTable) -> None:
+        if not isinstance(table, PercentileTable):
+            raise TypeError("table phải là instance của PercentileTable.")
+        self._table = table
+
+    @classmethod
+    def from_frame(cls,
+                   df: pd.DataFrame,
+                   group_cols: list[str] | None = None,
+                   score_col: str = "tong_diem",
+                   count_col: str = "so_hoc_sinh") -> "CutoffSimulator":
+        """Dựng từ DF phân phối (vd analyze_scores_by_exam_block('All')).
+
+        group_cols=None → ['nam_hoc', 'khoi'] (+ 'tinh' nếu DF có cột này).
+        """
+        if group_cols is None:
+            group_cols = ["nam_hoc", "khoi"] + (["tinh"] if "tinh" in df.columns else [])
+        return cls(PercentileTable.from_frame(df, group_cols, score_col=score_col, count_col=count_col))
+
+    # -------------------- GETTER (read-only) --------------------
+    @property
+    def table(self) -> PercentileTable:
+        return self._table
+
+    @property
+    def group_cols(self) -> list[str]:
+        return self._table.group_cols
+
+    # ==================== PUBLIC METHODS (API) ====================
+    def cutoff(self, quotas, group) -> tuple[np.ndarray, np.ndarray]:
+        """Điểm chuẩn + số trúng tuyển cho một lô chỉ tiêu (xem PercentileTable.cutoff)."""
+        return self._table.cutoff(quotas, group)
+
+    def simulate(self, queries: pd.DataFrame) -> pd.DataFrame:
+        """Chạy một lô truy vấn.
+
+        Args:
+            queries (pd.DataFrame): Cột nhóm (group_cols) + 'chi_tieu'.
+
+        Returns:
+            pd.DataFrame: queries + ['diem_chuan', 'so_trung_tuyen', 'du_chi_tieu'];
+            nhóm không có dữ liệu → NaN, du_chi_tieu = False.
+        """
+        missing = [c for c in [*self.group_cols, QUOTA_COL] if c not in queries.columns]
+        if missing:
+            raise KeyError(f"Thiếu cột {missing} trong bảng truy vấn.")
+
+        groups = list(queries[self.group_cols].itertuples(index=False, name=None))
+        quotas = queries[QUOTA_COL].to_numpy(dtype=np.float64)
+        scores, admitted = self._table.cutoff(quotas, groups)
+
+        out = queries.copy()
+        out["diem_chuan"] = scores
+        out["so_trung_tuyen"] = admitted
+        out["du_chi_tieu"] = admitted >= np.ceil(quotas)
+        return out
+
+    # ==================== REPRESENTATION / UTILITIES ====================
+    def __repr__(self) -> str:
+        return f"<CutoffSimulator groups={self._table.n_groups} by {self.group_cols}>"
+
+
+def project_block_distribution(df: pd.DataFrame,
+                               target_year: int,
+                               base_year: int | None = None,
+                               n_students: dict[str, float] | pd.Series | None = None,
+                               shift: dict[str, float] | pd.Series | None = None,
+                               max_total: float = 30.0) -> pd.DataFrame:
+    """Phân phối tổng điểm dự báo cho năm target_year từ phân phối năm gốc.
+
+    - Hình dạng phân phối lấy từ base_year (mặc định: năm lớn nhất trong df).
+    - n_students {khối: số thí sinh dự báo} (vd share_2026_final × tổng thí sinh) → co giãn
+      số đếm (làm tròn tới thí sinh); khối không có trong map giữ nguyên.
+    - shift {khối: độ lệch tổng điểm dự báo} (vd mean_2026 - mean_2025) → dịch điểm,
+      kẹp vào [0, max_total] và làm tròn về bước 0.01.
+
+    Args:
+        df (pd.DataFrame): Cột ['khoi', 'nam_hoc', ('tinh'), 'tong_diem', 'so_hoc_sinh'].
+
+    Returns:
+        pd.DataFrame: Cùng định dạng, nam_hoc = target_year.
+    """
+    base_year = int(df["nam_hoc"].max()) if base_year is None else base_year
+    base = df[df["nam_hoc"] == base_year].copy()
+    if base.empty:
+        raise ValueError(f"Không có phân phối cho năm gốc {base_year}.")
+
+    if shift is not None:
+        delta = base["khoi"].map(pd.Series(shift, dtype=np.float64)).fillna(0.0).to_numpy()
+        base["tong_diem"] = np.clip(base["tong_diem"].to_numpy() + delta, 0.0, max_total)
+        base["tong_diem"] = np.rint(base["tong_diem"] * SCORE_SCALE) / SCORE_SCALE
+
+    if n_students is not None:
+        current = base.groupby("khoi")["so_hoc_sinh"].transform("sum").to_numpy(dtype=np.float64)
+        target = base["khoi"].map(pd.Series(n_students, dtype=np.float64)).to_numpy()
+        factor = np.where(np.isnan(target), 1.0, target / current)
+        base["so_hoc_sinh"] = np.rint(base["so_hoc_sinh"].to_numpy() * factor).astype(np.int64)
+
+    base["nam_hoc"] = target_year
+    keys = [c for c in ["khoi", "nam_hoc", "tinh"] if c in base.columns]
+    return (
+        base.groupby([*keys, "tong_diem"], as_index=False, sort=True)["so_hoc_sinh"].sum()
+        .loc[lambda d: d["so_hoc_sinh"] > 0]
+        .reset_index(drop=True)
+    )
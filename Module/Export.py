@@ -5,80 +5,9 @@ import numpy as np
 import os
 
 from Module.Processor_Data import DataProcessor
-from Module.Analysis import Analysis
-
-
-# ================== MAP TỈNH CŨ (TRƯỚC KHI GỘP) ==================
-# Sử dụng 2 ký tự đầu của SBD để suy ra tỉnh ban đầu
-_PRE_REGION_MAP = {
-    "Hà Nội": ["01"],
-    "Thành phố Hồ Chí Minh": ["02"],
-    "Hải Phòng": ["03"],
-    "Đà Nẵng": ["04"],
-    "Hà Giang": ["05"],
-    "Cao Bằng": ["06"],
-    "Lai Châu": ["07"],
-    "Lào Cai": ["08"],
-    "Tuyên Quang": ["09"],
-    "Lạng Sơn": ["10"],
-    "Bắc Kạn": ["11"],
-    "Thái Nguyên": ["12"],
-    "Yên Bái": ["13"],
-    "Sơn La": ["14"],
-    "Phú Thọ": ["15"],
-    "Vĩnh Phúc": ["16"],
-    "Quảng Ninh": ["17"],
-    "Bắc Giang": ["18"],
-    "Bắc Ninh": ["19"],
-    "Hải Dương": ["21"],
-    "Hưng Yên": ["22"],
-    "Hoà Bình": ["23"],
-    "Hà Nam": ["24"],
-    "Nam Định": ["25"],
-    "Thái Bình": ["26"],
-    "Ninh Bình": ["27"],
-    "Thanh Hoá": ["28"],
-    "Nghệ An": ["29"],
-    "Hà Tĩnh": ["30"],
-    "Quảng Bình": ["31"],
-    "Quảng Trị": ["32"],
-    "Huế": ["33"],
-    "Quảng Nam": ["34"],
-    "Quảng Ngãi": ["35"],
-    "Kon Tum": ["36"],
-    "Bình Định": ["37"],
-    "Gia Lai": ["38"],
-    "Phú Yên": ["39"],
-    "Đắk Lắk": ["40"],
-    "Khánh Hoà": ["41"],
-    "Lâm Đồng": ["42"],
-    "Bình Phước": ["43"],
-    "Bình Dương": ["44"],
-    "Ninh Thuận": ["45"],
-    "Tây Ninh": ["46"],
-    "Bình Thuận": ["47"],
-    "Đồng Nai": ["48"],
-    "Long An": ["49"],
-    "Đồng Tháp": ["50"],
-    "An Giang": ["51"],
-    "Vũng Tàu": ["52"],
-    "Tiền Giang": ["53"],
-    "Kiên Giang": ["54"],
-    "Cần Thơ": ["55"],
-    "Bến Tre": ["56"],
-    "Vĩnh Long": ["57"],
-    "Trà Vinh": ["58"],
-    "Sóc Trăng": ["59"],
-    "Bạc Liêu": ["60"],
-    "Cà Mau": ["61"],
-    "Điện Biên": ["62"],
-    "Đăk Nông": ["63"],
-    "Hậu Giang": ["64"],
-}
-# mã tỉnh (01–64) -> tên tỉnh cũ
-_CODE_TO_OLD_REGION = {
-    code: name for name, codes in _PRE_REGION_MAP.items() for code in codes
-}
+from Module.Analysis import Analysis, PRE_REGION_MAP
+from Module.Export_Plan import ExportPlan
+from Module.Csv_Writer import CsvWriterPool, DEFAULT_WRITERS
 
 
 class Export:
@@ -94,6 +23,7 @@ class Export:
         processor (DataProcessor): Nguồn dữ liệu đã xử lý (data sạch).
         analysis  (Analysis): Module phân tích được đồng bộ với processor.
         root_path (str): Thư mục gốc lưu toàn bộ file CSV đã export.
+        writers   (int): Số luồng ghi CSV đồng thời của run_export_all.
     """
 
     # ==================== INTERNAL PRIVATE MEMBERS ====================
@@ -101,21 +31,25 @@ class Export:
         "_processor",      # Instance DataProcessor
         "_analysis",       # Instance Analysis (auto-sync theo processor)
         "_root_path",      # Đường dẫn thư mục gốc xuất dữ liệu
+        "_writers",        # Số luồng ghi CSV (CsvWriterPool)
     )
 
     # -------------------- CONSTRUCTOR --------------------
     def __init__(self,
                  processor: DataProcessor,
-                 root_path: str = "Clean_Data_2023-2025") -> None:
+                 root_path: str = "Clean_Data_2023-2025",
+                 writers: int = DEFAULT_WRITERS) -> None:
         """Khởi tạo Export, liên kết Analysis & tạo thư mục gốc nếu cần.
 
         Args:
             processor (DataProcessor): Đối tượng xử lý dữ liệu đầu vào.
             root_path (str): Thư mục gốc lưu clean data sau export.
+            writers (int): Số luồng ghi CSV đồng thời (1 = tuần tự).
         """
         # Gọi setter để đảm bảo validate & sync nội bộ
         self.processor = processor
         self.root_path = root_path
+        self.writers = writers
 
     # -------------------- GETTER / SETTER --------------------
     @property
@@ -149,46 +83,27 @@ class Export:
         # Tự tạo thư mục gốc nếu chưa tồn tại
         Path(self._root_path).mkdir(parents=True, exist_ok=True)
 
+    @property
+    def writers(self) -> int:
+        """Số luồng ghi CSV đồng thời của run_export_all."""
+        return self._writers
+
+    @writers.setter
+    def writers(self, value: int) -> None:
+        if not isinstance(value, int) or value < 1:
+            raise ValueError("writers phải là số nguyên >= 1.")
+        self._writers = value
+
     # ==================== INTERNAL PRIVATE METHODS ====================
-    # ---------- Helpers: Detect domain từ dataframe ----------
+    # ---------- Helpers: Detect domain từ dữ liệu (khối / tỉnh cũ: ExportPlan.blocks / provinces) ----------
     def _detect_subjects(self) -> list[str]:
         """Tự động lấy danh sách môn học từ dữ liệu sạch.
 
         Logic:
-            - Chọn các cột dạng số (điểm thi).
-            - Loại bỏ các cột không phải điểm: 'sbd', 'nam_hoc'.
-        """
-        df = self.processor.get_processed_data()
-        return (
-            df.select_dtypes(include="number")
-              .columns.difference(["sbd", "nam_hoc"])
-              .tolist()
-        )
-
-    def _detect_years(self) -> list[int]:
-        """Lấy danh sách năm học trong dữ liệu (dùng cho phân tích, không gắn vào tên file)."""
-        df = self.processor.get_processed_data()
-        return sorted(df["nam_hoc"].unique().tolist())
-
-    def _detect_provinces(self) -> list[str]:
-        """Lấy danh sách tỉnh/thành **cũ** thực tế có trong dữ liệu.
-
-        Dựa trực tiếp vào 2 ký tự đầu SBD (mã tỉnh 01–64) và map `_PRE_REGION_MAP`.
+            - Các môn có trong ScoreStore (cột điểm của dữ liệu sạch), sắp theo tên.
+            - Không dựng lại DataFrame điểm dày.
         """
-        df_dist = self._build_old_province_distribution()
-        return sorted(df_dist["tinh"].unique().tolist())
-
-    def _detect_blocks(self) -> list[str]:
-        """Lấy danh sách khối thi có mặt trong dữ liệu.
-
-        Thay vì truy cập map nội bộ, ta:
-            - Gọi Analysis.analyze_scores_by_exam_block("All")
-            - Lấy unique các giá trị cột 'khoi'.
-        """
-        df = self.analysis.analyze_scores_by_exam_block("All")
-        if df.empty:
-            return []
-        return sorted(df["khoi"].unique().tolist())
+        return sorted(self.processor.get_score_store().subjects)
 
     # ---------- Helpers: Chuẩn hoá tên folder/file ----------
     def _normalize_name(self, name: str) -> str:
@@ -214,15 +129,8 @@ class Export:
         )
         return cleaned
 
-    def _build_path(self, category: str, name: str) -> str:
-        """Tạo đường dẫn lưu file ANALYSIS (thống kê) theo cấu trúc chuẩn.
-
-        Cấu trúc 4 lớp:
-            root_path /
-                {Subject_Data|Block_Data|Province_Data} /
-                    CleanData_<Tên đã chuẩn hoá> /
-                        Export_Analysis_<Tên đã chuẩn hoá>.csv
-        """
+    def _artifact_dir(self, category: str, name: str) -> Path:
+        """Thư mục chứa file của một nhóm: root_path / {Subject|Block|Province}_Data / CleanData_<tên>."""
         folder_map = {
             "subject": "Subject_Data",
             "block": "Block_Data",
@@ -230,162 +138,96 @@ class Export:
         }
 
         safe_name = self._normalize_name(name)
-        base_dir = (
+        return (
             Path(self._root_path)
             / folder_map[category]
             / f"CleanData_{safe_name}"
         )
-        base_dir.mkdir(parents=True, exist_ok=True)
 
-        file_path = base_dir / f"Export_Analysis_{safe_name}.csv"
+    def _build_path(self, category: str, name: str, mkdir: bool = True) -> str:
+        """Tạo đường dẫn lưu file ANALYSIS (thống kê) theo cấu trúc chuẩn.
+
+        Cấu trúc 4 lớp:
+            root_path /
+                {Subject_Data|Block_Data|Province_Data} /
+                    CleanData_<Tên đã chuẩn hoá> /
+                        Export_Analysis_<Tên đã chuẩn hoá>.csv
+
+        mkdir=False → không tạo thư mục (run_export_all đã tạo trước một lượt).
+        """
+        base_dir = self._artifact_dir(category, name)
+        if mkdir:
+            base_dir.mkdir(parents=True, exist_ok=True)
+
+        file_path = base_dir / f"Export_Analysis_{self._normalize_name(name)}.csv"
         return str(file_path)
 
-    def _build_distribution_path(self, category: str, name: str) -> str:
+    def _build_distribution_path(self, category: str, name: str, mkdir: bool = True) -> str:
         """Tạo đường dẫn lưu file DISTRIBUTION (DataFrame phân phối) cho EDA.
 
         Cùng cấu trúc thư mục với file thống kê, chỉ khác tên file:
             Export_Distribution_<Tên đã chuẩn hoá>.csv
         """
-        folder_map = {
-            "subject": "Subject_Data",
-            "block": "Block_Data",
-            "province": "Province_Data",
-        }
+        base_dir = self._artifact_dir(category, name)
+        if mkdir:
+            base_dir.mkdir(parents=True, exist_ok=True)
 
-        safe_name = self._normalize_name(name)
-        base_dir = (
-            Path(self._root_path)
-            / folder_map[category]
-            / f"CleanData_{safe_name}"
-        )
-        base_dir.mkdir(parents=True, exist_ok=True)
-
-        file_path = base_dir / f"Export_Distribution_{safe_name}.csv"
+        file_path = base_dir / f"Export_Distribution_{self._normalize_name(name)}.csv"
         return str(file_path)
 
-    # ---------- Helper riêng cho TỈNH CŨ ----------
-    def _build_old_province_distribution(self) -> pd.DataFrame:
-        """Tạo phân phối tổng điểm theo **tỉnh cũ** và theo từng năm.
-
-        Output:
-            DataFrame với các cột:
-                ['nam_hoc', 'tinh', 'tong_diem', 'so_hoc_sinh']
-        """
-        df = self.processor.get_processed_data().copy()
+    def _create_artifact_dirs(self, plan: ExportPlan) -> int:
+        """Tạo toàn bộ thư mục của kế hoạch export trong một lượt; trả về số thư mục."""
+        dirs = {self._artifact_dir(category, name) for category, name in plan.groups()}
+        for base_dir in sorted(dirs):
+            base_dir.mkdir(parents=True, exist_ok=True)
+        return len(dirs)
 
-        if "sbd" not in df.columns:
-            raise ValueError("Thiếu cột 'sbd' trong dữ liệu nguồn.")
-        if "nam_hoc" not in df.columns:
-            raise ValueError("Thiếu cột 'nam_hoc' trong dữ liệu nguồn.")
-
-        # Lấy mã tỉnh từ 2 ký tự đầu SBD, map sang tên tỉnh cũ
-        df["sbd"] = df["sbd"].astype(str).str.zfill(8)
-        df["ma_tinh"] = df["sbd"].str[:2]
-        df["tinh"] = df["ma_tinh"].map(_CODE_TO_OLD_REGION)
-        df = df.dropna(subset=["tinh"])
-
-        # Danh sách môn dùng để tính tổng điểm
-        mon_hoc = [
-            "toan", "ngu_van", "ngoai_ngu",
-            "vat_li", "hoa_hoc", "sinh_hoc",
-            "lich_su", "dia_li", "gdcd",
-            "cn_cong_nghiep", "cn_nong_nghiep",
-        ]
-        score_cols = [c for c in mon_hoc if c in df.columns]
-
-        if not score_cols:
-            raise ValueError(
-                "Không tìm thấy cột điểm nào để tính 'tong_diem' theo tỉnh."
-            )
-
-        # Giữ thí sinh có ít nhất 1 môn có điểm
-        df = df[df[score_cols].notna().any(axis=1)]
-
-        # Tổng điểm của tất cả môn (dùng cho phân tích theo tỉnh)
-        df["tong_diem"] = df[score_cols].sum(axis=1, skipna=True)
-
-        counts = (
-            df.groupby(["nam_hoc", "tinh", "tong_diem"])
-              .size()
-              .reset_index(name="so_hoc_sinh")
-              .sort_values(["nam_hoc", "tinh", "tong_diem"])
-              .reset_index(drop=True)
-        )
+    # ---------- Export từng nhóm dữ liệu (internal only) ----------
+    def _build_plan(self) -> ExportPlan:
+        """Kế hoạch export một lượt (histogram môn / khối / tỉnh dựng một lần, dùng chung).
 
-        return counts
+        Khối / tỉnh cũ có thí sinh lấy từ plan.blocks / plan.provinces.
+        """
+        return ExportPlan(self.analysis, self._detect_subjects())
 
-    # ---------- Export từng nhóm dữ liệu (internal only) ----------
     # ====== 1. Thống kê mô tả (dict → DataFrame) ======
-    def _export_subject(self, subject: str) -> None:
+    def _export_subject(self, subject: str, plan: ExportPlan | None = None) -> None:
         """Xuất CSV thống kê mô tả theo MÔN HỌC.
 
         Lấy từ:
-            Analysis.get_statistics_by_subject(subject)
+            Histogram môn của ExportPlan (như Analysis.get_statistics_by_subject(subject))
         Dữ liệu trong file:
             - Một dòng cho mỗi `nam_hoc`
             - Các cột: mean, median, mode, std, min, max
         """
-        stats_dict = self.analysis.get_statistics_by_subject(subject)
-        df = (
-            pd.DataFrame(stats_dict)
-            .T.reset_index()
-            .rename(columns={"index": "nam_hoc"})
-        )
+        if plan is None:
+            plan = self._build_plan()
+        df = plan.subject_statistics(subject)
         df.to_csv(self._build_path("subject", subject), index=False)
 
-    def _export_block(self, block: str) -> None:
+    def _export_block(self, block: str, plan: ExportPlan | None = None) -> None:
         """Xuất CSV thống kê mô tả theo KHỐI THI."""
-        stats_dict = self.analysis.get_statistics_by_block(block)
-        df = (
-            pd.DataFrame(stats_dict)
-            .T.reset_index()
-            .rename(columns={"index": "nam_hoc"})
-        )
+        if plan is None:
+            plan = self._build_plan()
+        df = plan.block_statistics(block)
         df.to_csv(self._build_path("block", block), index=False)
 
-    def _export_province(self, province: str) -> None:
+    def _export_province(self, province: str, plan: ExportPlan | None = None) -> None:
         """Xuất CSV thống kê mô tả theo TỈNH/THÀNH (tỉnh **cũ**).
 
-        Tính thống kê trực tiếp từ phân phối
-        `_build_old_province_distribution()` để không bị ảnh hưởng
-        bởi map gộp tỉnh trong `Analysis.compare_by_region`.
+        Tính thống kê trên lát cắt của histogram tỉnh cũ (cùng nguồn với
+        `Analysis.compare_by_region("ALL")`) để không bị ảnh hưởng
+        bởi map gộp tỉnh trong `Analysis.compare_by_merged_region`.
         """
-        dist = self._build_old_province_distribution()
+        if plan is None:
+            plan = self._build_plan()
 
-        if province not in dist["tinh"].unique():
+        if province not in PRE_REGION_MAP:
+            raise ValueError(f"Tỉnh '{province}' không hợp lệ (không có trong PRE_REGION_MAP).")
+        if province not in plan.provinces:
             raise ValueError(f"Tỉnh '{province}' không tồn tại trong dữ liệu (tỉnh cũ).")
 
-        rows = []
-        for year, df_year in dist[dist["tinh"] == province].groupby("nam_hoc"):
-            scores = df_year.loc[
-                df_year.index.repeat(df_year["so_hoc_sinh"]),
-                "tong_diem",
-            ]
-
-            if scores.empty:
-                continue
-
-            mean = float(scores.mean())
-            median = float(scores.median())
-            mode_series = scores.mode()
-            mode = float(mode_series.iloc[0]) if not mode_series.empty else None
-            std = float(scores.std())
-            min_val = float(scores.min())
-            max_val = float(scores.max())
-
-            rows.append(
-                {
-                    "nam_hoc": year,
-                    "mean": mean,
-                    "median": median,
-                    "mode": mode,
-                    "std": std,
-                    "min": min_val,
-                    "max": max_val,
-                }
-            )
-
-        df_stats = pd.DataFrame(rows).sort_values("nam_hoc")
+        df_stats = plan.province_statistics(province)
         df_stats.to_csv(self._build_path("province", province), index=False)
 
     # ----------------------------- Internal Methods -----------------------------
@@ -440,11 +282,11 @@ class Export:
         comparison.to_csv(filepath, index=False)
 
     # Xuất tổng học sinh tham gia theo năm:
-    def _export_yearly_total_students(self) -> None:
+    def _yearly_total_students(self) -> pd.DataFrame:
         """
-        Tính và lưu tổng số học sinh theo từng năm từ processed data gốc.
+        Tính tổng số học sinh theo từng năm từ processed data gốc.
 
-        File output:
+        File output (run_export_all / _export_yearly_total_students):
             <root_path>/Export_Yearly_Total_Students.csv
 
         Cấu trúc:
@@ -458,25 +300,62 @@ class Export:
             2024, ...
             2025, ...
         """
-        df = self.processor.get_processed_data()
-
-        if "nam_hoc" not in df.columns:
+        columns = self.processor.processed_columns
+        if "nam_hoc" not in columns:
             raise ValueError("Thiếu cột 'nam_hoc' trong dữ liệu nguồn.")
-        if "sbd" not in df.columns:
+        if "sbd" not in columns:
             raise ValueError("Thiếu cột 'sbd' trong dữ liệu nguồn.")
+        # Chỉ cần cột khoá → không giải nén cột điểm
+        df = self.processor.get_processed_data(columns=["sbd", "nam_hoc"])
 
         # Mỗi SBD được coi là một học sinh trong 1 năm
-        yearly = (
+        return (
             df.groupby("nam_hoc")["sbd"]
               .nunique()  # phòng trường hợp sbd trùng
               .reset_index(name="total_students")
               .sort_values("nam_hoc")
         )
 
-        out_path = Path(self._root_path) / "Export_Yearly_Total_Students.csv"
-        yearly.to_csv(out_path, index=False)
+    def _yearly_total_students_path(self) -> Path:
+        """Đường dẫn file tổng số học sinh theo năm (ngay dưới root_path)."""
+        return Path(self._root_path) / "Export_Yearly_Total_Students.csv"
+
+    def _export_yearly_total_students(self) -> None:
+        """Lưu tổng số học sinh theo năm (xem _yearly_total_students)."""
+        out_path = self._yearly_total_students_path()
+        self._yearly_total_students().to_csv(out_path, index=False)
         print(f"[EXPORT] Đã lưu tổng số học sinh theo năm tại: {out_path}")
     
+    # Bảng tra điểm → hạng phần trăm (môn / khối, toàn quốc + theo tỉnh cũ) và nơi lưu
+    def _percentile_artifacts(self, by_region: bool = True):
+        """Sinh lần lượt (PercentileTable, đường dẫn CSV) cho từng bảng phần trăm.
+
+        File output:
+            <root_path>/Percentile_Data/Export_Percentile_Subject.csv
+            <root_path>/Percentile_Data/Export_Percentile_Block.csv
+            <root_path>/Percentile_Data/Export_Percentile_Subject_Province.csv   (by_region=True)
+            <root_path>/Percentile_Data/Export_Percentile_Block_Province.csv     (by_region=True)
+        """
+        base_dir = Path(self._root_path) / "Percentile_Data"
+        for kind in ("subject", "block"):
+            for regional in ((False, True) if by_region else (False,)):
+                suffix = "_Province" if regional else ""
+                table = self.analysis.get_percentile_table(kind, by_region=regional)
+                yield table, base_dir / f"Export_Percentile_{kind.capitalize()}{suffix}.csv"
+
+    # Xuất bảng tra điểm → hạng phần trăm (môn / khối, toàn quốc + theo tỉnh cũ)
+    def _export_percentile_tables(self, by_region: bool = True) -> list[str]:
+        """
+        Lưu bảng phần trăm cạnh clean data, đọc lại bằng PercentileTable.load().
+        Đường dẫn file: xem _percentile_artifacts (run_export_all ghi cùng các file này qua pool).
+        """
+        paths = []
+        for table, path in self._percentile_artifacts(by_region):
+            out_path = table.save(path)
+            paths.append(str(out_path))
+            print(f"[EXPORT] Đã lưu bảng phần trăm tại: {out_path}")
+        return paths
+
     # ==================== PUBLIC API METHODS: XUẤT DỮ LIỆU VỚI RETURN ====================
     # Xuất dữ liệu điểm theo khối thi ra DataFrame
     def export_score_by_block(self, block: str) -> pd.DataFrame:
@@ -513,13 +392,20 @@ class Export:
         """Xuất dữ liệu phân tích điểm theo tỉnh thành ra DataFrame."""
         return self._export_city_analysis(city)
 
+    # Xuất bảng tra điểm → hạng phần trăm ra CSV
+    def export_percentile_tables(self, by_region: bool = True) -> list[str]:
+        """Xuất bảng tra điểm → hạng phần trăm (môn, khối; thêm bản theo tỉnh cũ nếu by_region)."""
+        return self._export_percentile_tables(by_region)
+
     # ==================== PUBLIC API: EXPORT TOÀN BỘ ====================
-    def run_export_all(self) -> None:
+    def run_export_all(self) -> dict[str, float]:
         """
         Chạy full export:
         - Theo MÔN học: distribution + statistics
         - Theo KHỐI thi: distribution + statistics
         - Theo TỈNH CŨ: distribution + statistics
+        - Bảng tra điểm → hạng phần trăm (môn / khối, toàn quốc + theo tỉnh cũ)
+        - Tổng số học sinh theo năm
 
         Tất cả được lưu dưới thư mục root_path với cấu trúc:
             root_path/
@@ -531,48 +417,42 @@ class Export:
 
                 Province_Data/CleanData_<tinh_cu>/Export_Analysis_*.csv
                 Province_Data/CleanData_<tinh_cu>/Export_Distribution_*.csv
+
+                Percentile_Data/Export_Percentile_{Subject|Block}[_Province].csv
+
+                Export_Yearly_Total_Students.csv
+
+        Returns:
+            dict: Tổng kết ghi file của CsvWriterPool
+            {'files', 'bytes', 'seconds', 'mb_per_s', 'files_per_s'}.
         """
-        # -------- 1. EXPORT THEO MÔN HỌC --------
-        subjects = self._detect_subjects()
-        for subj in subjects:
-            # Distribution theo môn
-            df_dist = self.analysis.get_arregate_by_exam_subsections(subj)
-            dist_path = self._build_distribution_path("subject", subj)
-            df_dist.to_csv(dist_path, index=False)
-
-            # Statistics theo môn
-            self._export_subject(subj)
-
-        # -------- 2. EXPORT THEO KHỐI THI --------
-        blocks = self._detect_blocks()
-        for blk in blocks:
-            # Distribution theo khối
-            df_block = self.analysis.analyze_scores_by_exam_block(blk)
-            if df_block is None or df_block.empty:
-                continue
-            dist_path = self._build_distribution_path("block", blk)
-            df_block.to_csv(dist_path, index=False)
-
-            # Statistics theo khối
-            self._export_block(blk)
-
-        # -------- 3. EXPORT THEO TỈNH CŨ --------
-        # Lấy full distribution theo tỉnh cũ
-        df_prov_all = self._build_old_province_distribution()
-        provinces = sorted(df_prov_all["tinh"].unique().tolist())
-
-        for prov in provinces:
-            df_prov = df_prov_all[df_prov_all["tinh"] == prov].copy()
-            if df_prov.empty:
-                continue
-
-            # Distribution theo tỉnh cũ
-            dist_path = self._build_distribution_path("province", prov)
-            df_prov.to_csv(dist_path, index=False)
-
-            # Statistics theo tỉnh cũ
-            self._export_province(prov)
-
-        # -------- 4. EXPORT TỔNG SỐ HỌC SINH THEO NĂM --------
-        self._export_yearly_total_students()
+        # -------- 1–3. MÔN HỌC / KHỐI THI / TỈNH CŨ: distribution + statistics --------
+        # Một kế hoạch duy nhất: histogram môn, khối, tỉnh cũ dựng MỘT lần;
+        # mỗi file là một lát cắt → O(số thí sinh + số file) thay vì O(số tỉnh × số thí sinh)
+        plan = self._build_plan()
+        # Tạo mọi thư mục trước → các luồng ghi không còn gọi mkdir cho từng file
+        self._create_artifact_dirs(plan)
+
+        # Luồng chính dựng DF, pool serialize + ghi song song (hàng đợi có giới hạn)
+        with CsvWriterPool(self._writers) as pool:
+            for category, name, kind, df in plan.artifacts():
+                if kind == "distribution":
+                    path = self._build_distribution_path(category, name, mkdir=False)
+                else:
+                    path = self._build_path(category, name, mkdir=False)
+                pool.submit(df, path)
+
+            # -------- 4. BẢNG PHẦN TRĂM (môn / khối, toàn quốc + theo tỉnh cũ) --------
+            (Path(self._root_path) / "Percentile_Data").mkdir(parents=True, exist_ok=True)
+            for table, path in self._percentile_artifacts():
+                pool.submit(table.to_frame(), path)
+
+            # -------- 5. EXPORT TỔNG SỐ HỌC SINH THEO NĂM --------
+            pool.submit(self._yearly_total_students(), self._yearly_total_students_path())
+            summary = pool.close()
+
+        print(f"[EXPORT] Đã ghi {summary['files']} file, {summary['bytes'] / 1e6:.2f} MB "
+              f"trong {summary['seconds']:.2f}s ({summary['mb_per_s']:.2f} MB/s, "
+              f"{summary['files_per_s']:.0f} file/s, {self._writers} luồng ghi)")
+        return summary
 # ==================== END OF MODULE ====================
@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+
+from Module.Analysis import Analysis
+from Module.Score_Histogram import ScoreHistogram, describe_weighted
+
+
+# Loại file của mỗi artifact (trùng tiền tố tên file Export_<Kind>_<tên>.csv)
+ARTIFACT_KINDS = ("distribution", "analysis")
+
+
+def _stats_from_histogram(hist: ScoreHistogram) -> dict[int, dict]:
+    """{nam_hoc: thống kê mô tả} cho histogram (nam_hoc × bin), bỏ qua năm không có thí sinh.
+
+    Dùng describe_weighted trên đúng các bin khác 0 → kết quả trùng từng bit với
+    Analysis._statistics_by_year trên DF phân phối tương ứng.
+    """
+    scores = hist.scores
+    stats_dict: dict[int, dict] = {}
+    for year, counts in zip(hist.labels("nam_hoc").tolist(), hist.counts):
+        bins = np.flatnonzero(counts)
+        if len(bins) == 0:
+            continue
+        stats_dict[int(year)] = describe_weighted(scores[bins], counts[bins])
+    return stats_dict
+
+
+def _occupied_labels(hist: ScoreHistogram, name: str) -> list[str]:
+    """Nhãn (sắp theo tên) của trục `name` có ít nhất một thí sinh."""
+    axes = tuple(i for i in range(hist.counts.ndim) if i != hist.axis_names.index(name))
+    occupied = hist.counts.sum(axis=axes) > 0
+    return sorted(hist.labels(name)[occupied].tolist())
+
+
+def _stats_frame(stats_dict: dict) -> pd.DataFrame:
+    """dict {nam_hoc: thống kê} → DF một dòng mỗi năm (định dạng file Export_Analysis)."""
+    return (
+        pd.DataFrame(stats_dict)
+        .T.reset_index()
+        .rename(columns={"index": "nam_hoc"})
+    )
+
+
+class ExportPlan:
+    """Kế hoạch export một lượt: dựng histogram dùng chung MỘT lần, dẫn xuất mọi file.
+
+    Mô tả:
+        - Ba nguồn dùng chung lấy từ Analysis (đã cache): histogram môn
+          (nam_hoc × mon_hoc), histogram khối 'All' (khoi × nam_hoc) và histogram
+          tỉnh cũ (nam_hoc × tinh).
+        - Mỗi file Distribution / Analysis của một môn / khối / tỉnh chỉ là một lát
+          cắt của histogram → O(số bin), không quét lại thí sinh, không lọc lại DF
+          phân phối của cả nước cho từng tỉnh.
+        - Tổng chi phí export: O(số thí sinh + số artifact).
+        - Nội dung file trùng với các hàm phân tích từng nhóm của Analysis.
+
+    Attributes (public API):
+        subjects  (list[str]): Môn được export.
+        blocks    (list[str]): Khối có thí sinh.
+        provinces (list[str]): Tỉnh cũ có thí sinh.
+    """
+
+    # ==================== INTERNAL PRIVATE MEMBERS ====================
+    __slots__ = (
+        "_analysis",          # Analysis nguồn (fallback cho môn không có trong histogram)
+        "_subjects",          # danh sách môn cần export
+        "_subject_hist",      # ScoreHistogram (nam_hoc × mon_hoc × bin)
+        "_block_hist",        # ScoreHistogram (khoi × nam_hoc × bin)
+        "_province_hist",     # ScoreHistogram (nam_hoc × tinh × bin)
+        "_blocks",            # khối có thí sinh (sắp theo tên, tính một lần)
+        "_provinces",         # tỉnh cũ có thí sinh (sắp theo tên, tính một lần)
+    )
+
+    # -------------------- CONSTRUCTOR --------------------
+    def __init__(self, analysis: Analysis, subjects: list[str]) -> None:
+        if not isinstance(analysis, Analysis):
+            raise TypeError("analysis phải là instance của Analysis.")
+        self._analysis = analysis
+        self._subjects = list(subjects)
+        self._subject_hist = analysis.get_subject_histogram()
+        self._block_hist = analysis.get_block_histogram("All")
+        self._province_hist = analysis.get_province_histogram()
+        self._blocks = _occupied_labels(self._block_hist, "khoi")
+        self._provinces = _occupied_labels(self._province_hist, "tinh")
+
+    # -------------------- GETTER (read-only) --------------------
+    @property
+    def subjects(self) -> list[str]:
+        return list(self._subjects)
+
+    @property
+    def blocks(self) -> list[str]:
+        return list(self._blocks)
+
+    @property
+    def provinces(self) -> list[str]:
+        return list(self._provinces)
+
+    # ==================== INTERNAL PRIVATE METHODS ====================
+    def _has_subject(self, subject: str) -> bool:
+        return subject in self._subject_hist.labels("mon_hoc")
+
+    # ==================== PUBLIC METHODS (API) ====================
+    # ---------- Theo môn ----------
+    def subject_distribution(self, subject: str) -> pd.DataFrame:
+        """Như Analysis.get_arregate_by_exam_subsections(subject)."""
+        if not self._has_subject(subject):
+            return self._analysis.get_arregate_by_exam_subsections(subject)
+        return self._subject_hist.select(mon_hoc=[subject]).to_frame(score_col="diem")
+
+    def subject_statistics(self, subject: str) -> pd.DataFrame:
+        """Thống kê theo năm của một môn (như Analysis.get_statistics_by_subject)."""
+        if not self._has_subject(subject):
+            return _stats_frame(self._analysis.get_statistics_by_subject(subject))
+        return _stats_frame(_stats_from_histogram(self._subject_hist.select(mon_hoc=subject)))
+
+    # ---------- Theo khối ----------
+    def block_distribution(self, block: str) -> pd.DataFrame:
+        """Như Analysis.analyze_scores_by_exam_block(block)."""
+        return self._block_hist.select(khoi=[block]).to_frame(score_col="tong_diem")
+
+    def block_statistics(self, block: str) -> pd.DataFrame:
+        """Thống kê theo năm của một khối (như Analysis.get_statistics_by_block)."""
+        return _stats_frame(_stats_from_histogram(self._block_hist.select(khoi=block)))
+
+    # ---------- Theo tỉnh cũ ----------
+    def province_distribution(self, province: str) -> pd.DataFrame:
+        """Các dòng của một tỉnh trong Analysis.compare_by_region('ALL')."""
+        return self._province_hist.select(tinh=[province]).to_frame(score_col="tong_diem")
+
+    def province_statistics(self, province: str) -> pd.DataFrame:
+        """Thống kê theo năm của một tỉnh cũ (chỉ các năm có thí sinh)."""
+        stats_dict = _stats_from_histogram(self._province_hist.select(tinh=province))
+        rows = [{"nam_hoc": year, **stats} for year, stats in stats_dict.items()]
+        return pd.DataFrame(rows).sort_values("nam_hoc")
+
+    # ---------- Toàn bộ ----------
+    def groups(self) -> list[tuple[str, str]]:
+        """(category, tên nhóm) của mọi nhóm sẽ export — biết trước khi dựng DF nào."""
+        return ([("subject", s) for s in self._subjects]
+                + [("block", b) for b in self._blocks]
+                + [("province", p) for p in self._provinces])
+
+    def artifacts(self) -> Iterator[tuple[str, str, str, pd.DataFrame]]:
+        """Sinh (category, tên nhóm, kind, DataFrame) cho mọi file theo thứ tự của run_export_all.
+
+        category ∈ {'subject', 'block', 'province'}; kind ∈ ARTIFACT_KINDS.
+        Sinh lần lượt (generator) → số DF trong bộ nhớ do bên ghi quyết định (vd hàng đợi CsvWriterPool).
+        """
+        for subject in self._subjects:
+            yield "subject", subject, "distribution", self.subject_distribution(subject)
+            yield "subject", subject, "analysis", self.subject_statistics(subject)
+
+        for block in self._blocks:
+            yield "block", block, "distribution", self.block_distribution(block)
+            yield "block", block, "analysis", self.block_statistics(block)
+
+        for province in self._provinces:
+            yield "province", province, "distribution", self.province_distribution(province)
+            yield "province", province, "analysis", self.province_statistics(province)
+
+    # ==================== REPRESENTATION / UTILITIES ====================
+    def __len__(self) -> int:
+        """Số file sẽ được sinh."""
+        return len(ARTIFACT_KINDS) * len(self.groups())
+
+    def __repr__(self) -> str:
+        return (f"<ExportPlan subjects={len(self._subjects)} blocks={len(self._blocks)} "
+                f"provinces={len(self._provinces)}>")
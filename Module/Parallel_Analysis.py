@@ -0,0 +1,254 @@
+from __future__ import annotations
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from Module.Score_Store import ScoreStore, MAX_SCORE_CODE
+from Module.Shared_Data import (
+    SharedDataDescriptor, AttachedScoreData, SharedArrays, attach_shared, attach_arrays,
+)
+from Module.Score_Histogram import ScoreHistogram, build_subject_histogram, build_block_histogram
+from Module.Compute_Backend import ComputeBackend
+
+
+# Số task mỗi worker khi chia nhóm (nhiều hơn 1 để cân tải giữa nhóm nặng / nhẹ)
+TASKS_PER_WORKER = 2
+
+# Dữ liệu đã attach trong tiến trình worker (một lần mỗi worker, dùng lại cho mọi task)
+_WORKER_DATA: AttachedScoreData | None = None
+
+# Mảng phụ đã attach trong worker: {tên segment đầu tiên: (segment, {tên: view})}
+_WORKER_ARRAYS: dict[str, tuple[list, dict[str, np.ndarray]]] = {}
+
+
+# ==================== PHÍA WORKER ====================
+def _init_worker(descriptor: SharedDataDescriptor) -> None:
+    """Initializer của pool: gắn vào shared memory một lần cho mỗi tiến trình worker."""
+    global _WORKER_DATA
+    _WORKER_DATA = attach_shared(descriptor)
+
+
+def _worker_store() -> ScoreStore:
+    if _WORKER_DATA is None:
+        raise RuntimeError("Worker chưa attach dữ liệu (pool phải được tạo qua AnalysisPool).")
+    return _WORKER_DATA.store
+
+
+def _worker_arrays(spec: dict) -> dict[str, np.ndarray]:
+    """View chỉ đọc của một nhóm mảng phụ (SharedArrays); attach một lần mỗi worker."""
+    key = next(iter(spec.values()))[0] if spec else ""
+    if key not in _WORKER_ARRAYS:
+        _WORKER_ARRAYS[key] = attach_arrays(spec)
+    return _WORKER_ARRAYS[key][1]
+
+
+def _subject_task(subjects: list[str], backend: ComputeBackend) -> np.ndarray:
+    """Histogram (năm × môn × bin) cho một phần danh sách môn."""
+    return build_subject_histogram(_worker_store(), subjects, backend.count_keys).counts
+
+
+def _block_task(blocks: dict[str, list[str]], backend: ComputeBackend) -> tuple[list[str], np.ndarray]:
+    """Histogram (khối × năm × bin) cho một phần các khối; trả về cả tên khối còn lại sau lọc môn."""
+    hist = build_block_histogram(_worker_store(), blocks, count_keys=backend.count_keys)
+    return hist.labels("khoi").tolist(), hist.counts
+
+
+def _region_task(regions: list[tuple[int, list[int]]],
+                 totals: dict,
+                 n_subjects: int,
+                 backend: ComputeBackend) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Đếm tổng điểm (năm, tỉnh, tổng) cho một phần các tỉnh, chỉ chạm dòng của các tỉnh đó.
+
+    Tổng điểm theo dòng đã tính MỘT lần ở tiến trình chính và chia qua shared memory
+    → task chỉ cắt lát dòng của tỉnh được giao, không quét lại cột môn.
+
+    Args:
+        regions (list): [(chỉ số tỉnh trong kết quả, [mã tỉnh int])].
+        totals (dict): Spec SharedArrays của 'total', 'n_scores', 'order', 'offsets'.
+        n_subjects (int): Số môn được cộng vào tổng điểm.
+
+    Returns:
+        tuple: (năm, chỉ số tỉnh, mã tổng điểm, số thí sinh) cho các ô khác 0.
+    """
+    store = _worker_store()
+    shared = _worker_arrays(totals)
+    order, offsets = shared["order"], shared["offsets"]
+    parts = [
+        (idx, order[offsets[c + 1]:offsets[c + 2]])
+        for idx, codes in regions for c in codes
+    ]
+    rows = np.concatenate([r for _, r in parts]) if parts else np.empty(0, dtype=np.int64)
+    row_region = np.concatenate([np.full(len(r), idx, dtype=np.int64) for idx, r in parts]) \
+        if parts else np.empty(0, dtype=np.int64)
+
+    keep = shared["n_scores"][rows] > 0
+    rows, row_region = rows[keep], row_region[keep]
+    years = store.years[rows].astype(np.int64)
+    total = shared["total"][rows]
+
+    n_bins = n_subjects * MAX_SCORE_CODE + 1
+    n_regions = int(row_region.max()) + 1 if len(row_region) else 1
+    keys = (years * n_regions + row_region) * n_bins + total
+    uniq, cnt = backend.unique_counts(keys)
+    group, score = np.divmod(uniq, n_bins)
+    year, region = np.divmod(group, n_regions)
+    return year, region, score, cnt
+
+
+# ==================== PHÍA TIẾN TRÌNH CHÍNH ====================
+def split_groups(groups: list, n_parts: int) -> list[list]:
+    """Chia danh sách nhóm thành tối đa n_parts đoạn liên tiếp, không rỗng, giữ thứ tự."""
+    n_parts = max(1, min(n_parts, len(groups)))
+    bounds = np.linspace(0, len(groups), n_parts + 1).round().astype(int)
+    return [list(groups[a:b]) for a, b in zip(bounds[:-1], bounds[1:]) if b > a]
+
+
+class AnalysisPool:
+    """Pool tiến trình cho các phép phân tích 'All' song song theo nhóm.
+
+    Mô tả:
+        - Mỗi worker attach vào ScoreStore đã publish (DataProcessor.publish_shared)
+          MỘT lần trong initializer → task chỉ pickle tên nhóm, không pickle dữ liệu.
+        - `map` trả kết quả theo đúng thứ tự task → ghép kết quả tất định, không phụ
+          thuộc worker nào xong trước.
+        - `share` đặt kết quả trung gian của tiến trình chính (vd tổng điểm theo dòng)
+          lên shared memory một lần; giải phóng cùng pool trong `close`.
+
+    Attributes (public API):
+        descriptor (SharedDataDescriptor): Dữ liệu mà các worker đang gắn vào.
+        workers    (int)                 : Số tiến trình.
+    """
+
+    # ==================== INTERNAL PRIVATE MEMBERS ====================
+    __slots__ = (
+        "_descriptor",    # SharedDataDescriptor đã gửi cho worker
+        "_workers",       # số tiến trình
+        "_executor",      # ProcessPoolExecutor
+        "_shared",        # {khoá: SharedArrays} mảng phụ đã chia cho worker
+    )
+
+    # -------------------- CONSTRUCTOR --------------------
+    def __init__(self, descriptor: SharedDataDescriptor, workers: int | None = None) -> None:
+        if not isinstance(descriptor, SharedDataDescriptor):
+            raise TypeError("descriptor phải là instance của SharedDataDescriptor.")
+        self._descriptor = descriptor
+        self._workers = workers or os.cpu_count() or 1
+        self._shared: dict[str, SharedArrays] = {}
+        self._executor = ProcessPoolExecutor(
+            max_workers=self._workers, initializer=_init_worker, initargs=(descriptor,)
+        )
+
+    # -------------------- GETTER (read-only) --------------------
+    @property
+    def descriptor(self) -> SharedDataDescriptor:
+        return self._descriptor
+
+    @property
+    def workers(self) -> int:
+        return self._workers
+
+    # ==================== PUBLIC METHODS (API) ====================
+    def map(self, func, tasks: list[tuple]) -> list:
+        """Chạy func(*args) cho từng task trên pool; kết quả theo thứ tự tasks."""
+        futures = [self._executor.submit(func, *args) for args in tasks]
+        return [f.result() for f in futures]
+
+    def share(self, key: str, arrays: dict[str, np.ndarray]) -> dict:
+        """Spec shared memory của nhóm mảng `key`; chỉ publish ở lần gọi đầu của pool này."""
+        if key not in self._shared:
+            self._shared[key] = SharedArrays(arrays)
+        return self._shared[key].spec
+
+    def n_parts(self, n_groups: int) -> int:
+        """Số phần nên chia cho n_groups nhóm."""
+        return min(n_groups, self._workers * TASKS_PER_WORKER)
+
+    def close(self) -> None:
+        """Dừng các worker (worker tự bỏ gắn shared memory khi kết thúc) và giải phóng mảng phụ."""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        for shared in self._shared.values():
+            shared.release()
+        self._shared = {}
+
+    def __enter__(self) -> "AnalysisPool":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # ==================== REPRESENTATION / UTILITIES ====================
+    def __repr__(self) -> str:
+        return f"<AnalysisPool workers={self._workers} {self._descriptor!r}>"
+
+
+def parallel_subject_histogram(pool: AnalysisPool,
+                               store: ScoreStore,
+                               subjects: list[str],
+                               backend: ComputeBackend) -> ScoreHistogram:
+    """Như build_subject_histogram(store, subjects) nhưng chia môn cho các worker."""
+    missing = [s for s in subjects if s not in store.subjects]
+    if missing:
+        raise KeyError(f"Môn không có trong ScoreStore: {missing}")
+
+    parts = split_groups(list(subjects), pool.n_parts(len(subjects)))
+    results = pool.map(_subject_task, [(part, backend) for part in parts])
+    years = np.unique(store.years)
+    counts = (np.concatenate(results, axis=1) if results
+              else np.zeros((len(years), 0, MAX_SCORE_CODE + 1), dtype=np.int64))
+    return ScoreHistogram(
+        counts,
+        [("nam_hoc", years.astype(np.int64)), ("mon_hoc", np.asarray(subjects, dtype=object))],
+    )
+
+
+def parallel_block_histogram(pool: AnalysisPool,
+                             store: ScoreStore,
+                             blocks: dict[str, list[str]],
+                             backend: ComputeBackend) -> ScoreHistogram:
+    """Như build_block_histogram(store, blocks) nhưng chia khối cho các worker.
+
+    Mỗi phần có số bin theo khối rộng nhất của phần đó → đệm 0 về số bin chung trước khi ghép.
+    """
+    items = list(blocks.items())
+    parts = split_groups(items, pool.n_parts(len(items)))
+    results = pool.map(_block_task, [(dict(part), backend) for part in parts])
+
+    names = [name for part_names, _ in results for name in part_names]
+    years = np.unique(store.years)
+    n_bins = max((counts.shape[-1] for _, counts in results), default=1)
+    padded = [
+        np.pad(counts, [(0, 0)] * (counts.ndim - 1) + [(0, n_bins - counts.shape[-1])])
+        for _, counts in results
+    ]
+    counts = (np.concatenate(padded, axis=0) if padded
+              else np.zeros((0, len(years), n_bins), dtype=np.int64))
+    return ScoreHistogram(
+        counts,
+        [("khoi", np.asarray(names, dtype=object)), ("nam_hoc", years.astype(np.int64))],
+    )
+
+
+def parallel_region_counts(pool: AnalysisPool,
+                           regions: list[list[int]],
+                           totals: dict,
+                           n_subjects: int,
+                           backend: ComputeBackend) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Đếm (năm, tỉnh, tổng điểm) cho mọi tỉnh, chia tỉnh cho các worker.
+
+    Args:
+        regions (list[list[int]]): Mã tỉnh (int) của từng tỉnh; chỉ số trong list = chỉ số tỉnh.
+        totals (dict): Spec từ pool.share — tổng điểm / số môn theo dòng + chỉ mục tỉnh
+            ('total', 'n_scores', 'order', 'offsets').
+        n_subjects (int): Số môn được cộng vào tổng điểm.
+
+    Returns:
+        tuple: (năm, chỉ số tỉnh, mã tổng điểm, số thí sinh) — chưa sắp xếp.
+    """
+    indexed = list(enumerate(regions))
+    parts = split_groups(indexed, pool.n_parts(len(indexed)))
+    results = pool.map(_region_task, [(part, totals, n_subjects, backend) for part in parts])
+    if not results:
+        return tuple(np.empty(0, dtype=np.int64) for _ in range(4))
+    return tuple(np.concatenate([r[k] for r in results]) for k in range(4))
@@ -0,0 +1,305 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from Module.Score_Store import SCORE_SCALE
+
+
+# Cách tính hạng phần trăm của một điểm x trong nhóm
+#   weak   : % thí sinh có điểm <= x
+#   strict : % thí sinh có điểm <  x
+#   mean   : trung bình hai cách trên (quy ước "mid-rank")
+PERCENTILE_KINDS = ("weak", "strict", "mean")
+
+# Tên cột của bảng khi lưu ra CSV (sau các cột nhóm và cột điểm)
+_COUNT_COL = "so_hoc_sinh"
+_CUMULATIVE_COL = "so_tich_luy"
+_PERCENTILE_COL = "phan_vi"
+
+
+class PercentileTable:
+    """Bảng tra điểm → hạng phần trăm cho nhiều nhóm (năm, môn/khối, [tỉnh]).
+
+    Mô tả:
+        - Mỗi nhóm giữ các mã điểm có thí sinh (tăng dần) và số đếm tích luỹ.
+        - Mọi nhóm nối thành MỘT mảng khoá toàn cục `nhóm * K + mã điểm` (tăng dần),
+          nên một lô truy vấn thuộc nhiều nhóm khác nhau chỉ cần 2 lần np.searchsorted.
+        - Nhóm không có trong bảng hoặc điểm NaN → NaN.
+        - Cùng mảng tích luỹ trả lời chiều ngược lại: điểm chuẩn theo chỉ tiêu (cutoff).
+        - Lưu / đọc dạng CSV dài (cùng kiểu với các file Export_Distribution_*).
+
+    Attributes (public API):
+        group_cols (list[str])   : Tên các cột nhóm, vd ['nam_hoc', 'khoi', 'tinh'].
+        score_col  (str)         : Tên cột điểm.
+        groups     (pd.DataFrame): Nhãn các nhóm (theo thứ tự trong bảng) + tổng thí sinh.
+        n_groups   (int)         : Số nhóm.
+        nbytes     (int)         : Bộ nhớ của các mảng tra cứu.
+    """
+
+    # ==================== INTERNAL PRIVATE MEMBERS ====================
+    __slots__ = (
+        "_group_cols",    # tên các cột nhóm
+        "_score_col",     # tên cột điểm
+        "_scale",         # điểm = mã / scale
+        "_labels",        # list[tuple] nhãn nhóm theo chỉ số nhóm
+        "_group_index",   # dict {nhãn nhóm (tuple): chỉ số nhóm}
+        "_keys",          # int64: nhóm * _stride + (mã điểm + 1), tăng dần
+        "_counts",        # int64: số thí sinh tại từng khoá
+        "_cumulative",    # int64: [0, cumsum(_counts)] — tích luỹ toàn cục
+        "_offsets",       # int64: khoá của nhóm g nằm ở [_offsets[g], _offsets[g + 1])
+        "_stride",        # số khoá dành cho mỗi nhóm (mã điểm lớn nhất + 3)
+    )
+
+    # -------------------- CONSTRUCTOR --------------------
+    def __init__(self,
+                 group_cols: list[str],
+                 labels: list[tuple],
+                 codes: np.ndarray,
+                 counts: np.ndarray,
+                 offsets: np.ndarray,
+                 score_col: str = "diem",
+                 scale: int = SCORE_SCALE) -> None:
+        """Dựng bảng từ mảng đã sắp (dùng from_frame / load thay vì gọi trực tiếp).
+
+        Args:
+            group_cols (list[str]): Tên các cột nhóm.
+            labels (list[tuple]): Nhãn của từng nhóm.
+            codes (np.ndarray): Mã điểm (int), tăng dần trong mỗi nhóm, không trùng.
+            counts (np.ndarray): Số thí sinh tại từng mã điểm (> 0).
+            offsets (np.ndarray): Biên các nhóm trong codes (len = số nhóm + 1).
+            score_col (str): Tên cột điểm.
+            scale (int): Điểm = mã / scale.
+        """
+        codes = np.asarray(codes, dtype=np.int64)
+        counts = np.asarray(counts, dtype=np.int64)
+        offsets = np.asarray(offsets, dtype=np.int64)
+        if len(codes) != len(counts) or len(offsets) != len(labels) + 1:
+            raise ValueError("codes/counts/offsets không khớp với số nhóm.")
+        if len(codes) and codes.min() < 0:
+            raise ValueError("Mã điểm phải không âm.")
+
+        self._group_cols = list(group_cols)
+        self._score_col = score_col
+        self._scale = scale
+        self._labels = [tuple(label) for label in labels]
+        self._group_index = {label: g for g, label in enumerate(self._labels)}
+        if len(self._group_index) != len(self._labels):
+            raise ValueError("Nhãn nhóm bị trùng.")
+
+        self._stride = int(codes.max()) + 3 if len(codes) else 3
+        group_of_row = np.repeat(np.arange(len(self._labels), dtype=np.int64), np.diff(offsets))
+        self._keys = group_of_row * self._stride + codes + 1
+        if np.any(np.diff(self._keys) <= 0):
+            raise ValueError("Mã điểm phải tăng dần và không trùng trong mỗi nhóm.")
+        self._counts = counts
+        self._cumulative = np.concatenate([[0], np.cumsum(counts)])
+        self._offsets = offsets
+        # Chỉ đọc: bảng được cache và dùng chung giữa các lời gọi
+        for arr in (self._keys, self._counts, self._cumulative, self._offsets):
+            arr.setflags(write=False)
+
+    @classmethod
+    def from_frame(cls,
+                   df: pd.DataFrame,
+                   group_cols: list[str],
+                   score_col: str = "diem",
+                   count_col: str = _COUNT_COL,
+                   scale: int = SCORE_SCALE) -> "PercentileTable":
+        """Dựng bảng từ DF phân phối dạng dài (nhóm..., điểm, số thí sinh).
+
+        Các dòng trùng (nhóm, điểm) được cộng dồn; dòng có số thí sinh <= 0 bị bỏ.
+
+        Args:
+            df (pd.DataFrame): Vd kết quả ScoreHistogram.to_frame().
+            group_cols (list[str]): Các cột xác định nhóm.
+            score_col (str): Cột điểm.
+            count_col (str): Cột số thí sinh.
+            scale (int): Điểm = mã / scale.
+        """
+        missing = [c for c in [*group_cols, score_col, count_col] if c not in df.columns]
+        if missing:
+            raise KeyError(f"Thiếu cột {missing} trong DataFrame.")
+
+        df = df[df[count_col] > 0]
+        codes = np.rint(df[score_col].to_numpy(dtype=np.float64) * scale).astype(np.int64)
+        merged = (
+            pd.DataFrame({**{c: df[c].to_numpy() for c in group_cols},
+                          "_code": codes, "_count": df[count_col].to_numpy(dtype=np.int64)})
+            .groupby([*group_cols, "_code"], sort=True)["_count"].sum()
+            .reset_index()
+        )
+
+        group_id = merged.groupby(group_cols, sort=False).ngroup().to_numpy()
+        starts = np.flatnonzero(np.r_[True, group_id[1:] != group_id[:-1]]) if len(merged) else np.empty(0, np.int64)
+        labels = list(merged[group_cols].iloc[starts].itertuples(index=False, name=None))
+        offsets = np.r_[starts, len(merged)].astype(np.int64)
+        return cls(group_cols, labels, merged["_code"].to_numpy(), merged["_count"].to_numpy(),
+                   offsets, score_col=score_col, scale=scale)
+
+    # -------------------- GETTER (read-only) --------------------
+    @property
+    def group_cols(self) -> list[str]:
+        return list(self._group_cols)
+
+    @property
+    def score_col(self) -> str:
+        return self._score_col
+
+    @property
+    def n_groups(self) -> int:
+        return len(self._labels)
+
+    @property
+    def groups(self) -> pd.DataFrame:
+        frame = pd.DataFrame(self._labels, columns=self._group_cols)
+        frame[_COUNT_COL] = self._cumulative[self._offsets[1:]] - self._cumulative[self._offsets[:-1]]
+        return frame
+
+    @property
+    def nbytes(self) -> int:
+        return int(self._keys.nbytes + self._counts.nbytes + self._cumulative.nbytes + self._offsets.nbytes)
+
+    # ==================== INTERNAL PRIVATE METHODS ====================
+    def _lookup_groups(self, group, n: int) -> np.ndarray:
+        """Chỉ số nhóm cho từng truy vấn; -1 nếu nhóm không có trong bảng.
+
+        group: một nhãn (tuple, hoặc giá trị đơn khi chỉ có 1 cột nhóm) dùng chung cho
+        mọi điểm, hoặc list nhãn (mỗi điểm một nhãn).
+        """
+        def normalize(label):
+            return label if isinstance(label, tuple) else (label,)
+
+        if isinstance(group, list):
+            if len(group) != n:
+                raise ValueError("Danh sách nhóm phải có cùng độ dài với scores.")
+            return np.fromiter((self._group_index.get(normalize(g), -1) for g in group),
+                               dtype=np.int64, count=n)
+        return np.full(n, self._group_index.get(normalize(group), -1), dtype=np.int64)
+
+    # ==================== PUBLIC METHODS (API) ====================
+    def percentile_rank(self, scores, group, kind: str = "weak") -> np.ndarray:
+        """Hạng phần trăm (0..100) của một lô điểm trong nhóm tương ứng.
+
+        Args:
+            scores: Điểm (số hoặc mảng).
+            group: Nhãn nhóm chung, vd (2025, 'D01') / (2025, 'D01', 'Hà Nội'),
+                hoặc list nhãn cùng độ dài với scores.
+            kind (str): 'weak' (<=), 'strict' (<) hoặc 'mean'.
+
+        Returns:
+            np.ndarray: float64 cùng shape với scores; NaN cho nhóm lạ / điểm NaN.
+        """
+        if kind not in PERCENTILE_KINDS:
+            raise ValueError(f"kind phải thuộc {PERCENTILE_KINDS}.")
+        scores = np.asarray(scores, dtype=np.float64)
+        flat = scores.ravel()
+        gidx = self._lookup_groups(group, len(flat))
+
+        valid = (gidx >= 0) & ~np.isnan(flat)
+        result = np.full(len(flat), np.nan)
+        if not valid.any():
+            return result.reshape(scores.shape)
+
+        g = gidx[valid]
+        # Mã điểm kẹp vào [-1, max + 1] → khoá luôn nằm trong dải của nhóm
+        codes = np.clip(np.rint(flat[valid] * self._scale), -1, self._stride - 2).astype(np.int64)
+        queries = g * self._stride + codes + 1
+
+        base = self._cumulative[self._offsets[g]]
+        total = self._cumulative[self._offsets[g + 1]] - base
+        below = self._cumulative[np.searchsorted(self._keys, queries, side="left")] - base
+        upto = self._cumulative[np.searchsorted(self._keys, queries, side="right")] - base
+
+        if kind == "weak":
+            hits = upto
+        elif kind == "strict":
+            hits = below
+        else:
+            hits = (below + upto) / 2
+        with np.errstate(invalid="ignore", divide="ignore"):
+            result[valid] = 100.0 * hits / total
+        return result.reshape(scores.shape)
+
+    def cutoff(self, quotas, group) -> tuple[np.ndarray, np.ndarray]:
+        """Điểm chuẩn theo chỉ tiêu: điểm cao nhất t sao cho số thí sinh có điểm >= t đạt chỉ tiêu.
+
+        Trong nhóm, số thí sinh >= mã thứ k là total - C_{k-1} (C = tích luỹ tăng dần), nên
+        điểm chuẩn là mã cuối cùng có C_{k-1} <= total - quota → một np.searchsorted cho cả lô.
+
+        Args:
+            quotas: Chỉ tiêu (số hoặc mảng, >= 1).
+            group: Nhãn nhóm chung hoặc list nhãn cùng độ dài với quotas (như percentile_rank).
+
+        Returns:
+            tuple: (điểm chuẩn, số thí sinh trúng tuyển tại điểm chuẩn — có thể > chỉ tiêu do đồng điểm).
+            Chỉ tiêu vượt số thí sinh → điểm thấp nhất, trúng tuyển = toàn bộ; nhóm lạ / chỉ tiêu < 1 → NaN.
+        """
+        quotas = np.asarray(quotas, dtype=np.float64)
+        flat = quotas.ravel()
+        gidx = self._lookup_groups(group, len(flat))
+
+        valid = (gidx >= 0) & (flat >= 1)
+        scores = np.full(len(flat), np.nan)
+        admitted = np.full(len(flat), np.nan)
+        if valid.any():
+            g = gidx[valid]
+            base = self._cumulative[self._offsets[g]]
+            total = self._cumulative[self._offsets[g + 1]] - base
+            quota = np.ceil(flat[valid]).astype(np.int64)
+
+            # C_{k-1} toàn cục = _cumulative[:-1], tăng ngặt (mọi count > 0)
+            pos = np.searchsorted(self._cumulative[:-1], base + total - quota, side="right") - 1
+            pos = np.maximum(pos, self._offsets[g])          # chỉ tiêu > total → nhận hết (mã thấp nhất)
+            codes = self._keys[pos] - g * self._stride - 1
+            scores[valid] = codes / self._scale
+            admitted[valid] = total - (self._cumulative[pos] - base)
+        return scores.reshape(quotas.shape), admitted.reshape(quotas.shape)
+
+    def to_frame(self) -> pd.DataFrame:
+        """Bảng dạng dài: [nhóm..., điểm, so_hoc_sinh, so_tich_luy, phan_vi (weak, %)]."""
+        sizes = np.diff(self._offsets)
+        group_of_row = np.repeat(np.arange(self.n_groups), sizes)
+        frame = pd.DataFrame(
+            [self._labels[g] for g in group_of_row] if len(group_of_row) else None,
+            columns=self._group_cols,
+        )
+        base = self._cumulative[self._offsets[:-1]][group_of_row]
+        total = np.repeat(self._cumulative[self._offsets[1:]] - self._cumulative[self._offsets[:-1]], sizes)
+        cumulative = self._cumulative[1:] - base
+
+        frame[self._score_col] = (self._keys - group_of_row * self._stride - 1) / self._scale
+        frame[_COUNT_COL] = self._counts
+        frame[_CUMULATIVE_COL] = cumulative
+        frame[_PERCENTILE_COL] = 100.0 * cumulative / np.maximum(total, 1)
+        return frame
+
+    def save(self, path: str | Path) -> Path:
+        """Lưu bảng ra CSV (tạo thư mục cha nếu cần)."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.to_frame().to_csv(path, index=False)
+        return path
+
+    @classmethod
+    def load(cls, path: str | Path, scale: int = SCORE_SCALE) -> "PercentileTable":
+        """Đọc bảng đã lưu bằng save(): cột nhóm = các cột đứng trước cột điểm."""
+        df = pd.read_csv(path)
+        columns = list(df.columns)
+        if _COUNT_COL not in columns or columns.index(_COUNT_COL) < 1:
+            raise ValueError(f"File '{path}' không phải bảng phân vị (thiếu cột '{_COUNT_COL}').")
+        score_col = columns[columns.index(_COUNT_COL) - 1]
+        group_cols = columns[:columns.index(score_col)]
+        return cls.from_frame(df, group_cols, score_col=score_col, count_col=_COUNT_COL, scale=scale)
+
+    # ==================== REPRESENTATION / UTILITIES ====================
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __repr__(self) -> str:
+        return (
+            f"<PercentileTable groups={self.n_groups} by {self._group_cols} "
+            f"rows={len(self._keys)} nbytes={self.nbytes}>"
+        )
@@ -1,5 +1,9 @@
 from Module.Load_Data import DataLoader
+from Module.Score_Store import ScoreStore, PROGRAMS
+from Module.Shared_Data import SharedDataDescriptor, SharedScoreData
+from Module.Profiler import StageProfiler
 from pathlib import Path
+import json
 import pandas as pd
 import numpy as np
 
@@ -22,6 +26,13 @@ class DataProcessor:
     Read-only properties (tự tính từ data_xxx):
         loader (DataLoader): Instance của DataLoader để load dữ liệu.
         combined_data (pd.DataFrame): Dữ liệu tổng hợp từ các năm.
+        score_store (ScoreStore): Bản nén cột (CSC) của các cột điểm, tự xây lại khi combined_data đổi.
+
+    Lưu trữ điểm:
+        - Mặc định ScoreStore là nguồn DUY NHẤT của điểm: khi store được xây, các cột điểm
+          bị bỏ khỏi combined_data (chỉ giữ 'sbd', 'nam_hoc'...).
+        - combined_data / get_processed_data() dựng lại cột điểm (float64) từ store khi được
+          hỏi → bản dày chỉ tồn tại trong lúc người gọi còn giữ nó.
     """
     
     # Slots: Cố định các thuộc tính có thể sử dụng, để tiết kiệm bộ nhớ. Không thể thêm thuộc tính mới ngoài danh sách này.
@@ -36,7 +47,14 @@ class DataProcessor:
         "_data_2024",                                 # dữ liệu năm 2024
         "_data_2025_ct2006",                          # dữ liệu năm 2025 CT2006
         "_data_2025_ct2018",                          # dữ liệu năm 2025 CT2018
-        "_combined_data"                              # dữ liệu tổng hợp từ các năm
+        "_combined_data",                             # dữ liệu tổng hợp từ các năm
+        "_score_store",                               # bản nén cột (CSC) của các cột điểm
+        "_shared",                                    # SharedScoreData đang publish (nếu có)
+        "_profile_report",                            # báo cáo profile của lần process_all gần nhất
+        "_data_version",                              # tăng mỗi khi combined_data đổi (khoá cache)
+        "_program_codes",                             # mã chương trình (0=CT2006, 1=CT2018) theo dòng
+        "_compact",                                   # True → bỏ cột điểm khỏi combined_data khi đã có store
+        "_columns",                                   # thứ tự cột đầy đủ khi cột điểm chỉ nằm trong store (None → đủ cột)
     )
     
     # ------- Xây dựng setter & getter để xử lý các biến --------
@@ -300,8 +318,14 @@ class DataProcessor:
     # -------- Combined Data --------
     @property
     def combined_data(self) -> pd.DataFrame:
-        """Trả về DataFrame tổng hợp từ các năm."""
-        return self._combined_data
+        """Trả về DataFrame tổng hợp từ các năm.
+
+        Khi cột điểm chỉ còn trong ScoreStore, mỗi lần truy cập dựng một DataFrame mới
+        (sửa tại chỗ không ảnh hưởng dữ liệu → gán lại qua setter).
+        """
+        if self._columns is None:
+            return self._combined_data
+        return self._materialize(self._columns)
     
     @combined_data.setter
     def combined_data(self, value: pd.DataFrame) -> None:
@@ -310,7 +334,28 @@ class DataProcessor:
         if value.empty:
             raise ValueError("Giá trị gán cho combined_data không được rỗng.")
         
+        # Frame mới (kể cả cùng số dòng nhưng đổi thứ tự) → không còn biết dòng nào thuộc partition nào
+        self._program_codes = None
         self._combined_data = value
+        self._columns = None
+        # Dữ liệu đổi → bản nén / shared memory cũ không còn đúng
+        self._reset_derived_data()
+
+    # -------- Score Store (dạng nén cột) --------
+    @property
+    def score_store(self) -> ScoreStore:
+        """Bản nén cột của combined_data (xây lười ở lần truy cập đầu)."""
+        return self.get_score_store()
+
+    # -------- Phiên bản dữ liệu --------
+    @property
+    def data_version(self) -> int:
+        """Số phiên bản của combined_data; tăng mỗi lần dữ liệu được gán/xây lại.
+
+        Dùng làm khoá cho cache kết quả phân tích (Analysis). Sửa DataFrame tại chỗ
+        (không qua setter / process_all) sẽ KHÔNG làm tăng phiên bản.
+        """
+        return self._data_version
 
     # -------- Khởi tạo và tải dữ liệu --------
     def __init__(self, project_root: Path | str | None = None):
@@ -330,6 +375,13 @@ class DataProcessor:
         self._data_2025_ct2006 = None
         self._data_2025_ct2018 = None
         self._combined_data = pd.DataFrame()
+        self._score_store = None
+        self._shared = None
+        self._profile_report = None
+        self._data_version = 0
+        self._program_codes = None
+        self._compact = True
+        self._columns = None
         
         # Khởi tạo DataLoader bên trong
         self.loader = DataLoader(project_root)
@@ -540,13 +592,24 @@ class DataProcessor:
     # Xây dựng Data Tổng kết hợp dữ liệu từ các năm 
     def _build_combined_data(self) -> pd.DataFrame:
         """ Kết hợp dữ liệu từ các năm thành một DataFrame duy nhất."""
-        self._combined_data = pd.concat(
-            [self.data_2018, self.data_2019, self.data_2020, self.data_2021, self.data_2022,
-            self.data_2023, self.data_2024, self.data_2025_ct2006, self.data_2025_ct2018],
-            ignore_index=True
+        parts = [self.data_2018, self.data_2019, self.data_2020, self.data_2021, self.data_2022,
+                 self.data_2023, self.data_2024, self.data_2025_ct2006, self.data_2025_ct2018]
+        self._combined_data = pd.concat(parts, ignore_index=True)
+        self._columns = None
+        # Chương trình của từng dòng theo partition gốc: 8 partition CT2006, cuối cùng là CT2018
+        self._program_codes = np.repeat(
+            np.array([0] * 8 + [1], dtype=np.int8), [len(df) for df in parts]
         )
+        self._reset_derived_data()
         return self._combined_data
     
+    # Bỏ các dữ liệu dẫn xuất từ combined_data (store nén, shared memory)
+    def _reset_derived_data(self) -> None:
+        """Huỷ ScoreStore đã cache, giải phóng shared memory và tăng phiên bản dữ liệu."""
+        self._score_store = None
+        self.release_shared()
+        self._data_version += 1
+
     # Xây dựng hàm kiểm tra tính hợp lệ và ép kiểu dữ liệu đã xử lý
     def _validate_data(self) -> None:
         """Kiểm tra tính hợp lệ của self.combined_data và ép kiểu float.
@@ -599,8 +662,10 @@ class DataProcessor:
             if coerced > 0 and hasattr(self, 'logger'):
                 self.logger.warning(f"Cột '{col}': {coerced} giá trị không phải số đã bị coerce thành NaN.")
 
-        # Lưu lại (không cần gán lại nếu df là alias, nhưng làm rõ ý đồ)
-        self.combined_data = df        
+        # Lưu lại (df là alias: cùng dòng, cùng thứ tự → giữ mã chương trình theo partition,
+        # không đi qua setter vốn bỏ mã chương trình)
+        self._combined_data = df
+        self._reset_derived_data()
     
     # Xây dựng hàm kiểm tra xung đột dữ liệu trước khi dedup
     def _check_conflicts_before_dedup(self) -> None:
@@ -667,18 +732,237 @@ class DataProcessor:
 
     # ===================== PUBLIC API: Hàm thực hiện toàn bộ quy trình xử lý =====================
     # ------- Xây dựng hàm để thực hiện toàn bộ quy trình xử lý --------
-    def process_all(self) -> None:
-        """Thực hiện toàn bộ quy trình xử lý dữ liệu."""
-        self._normalize_columns()
-        self._apply_target_schema_all_years()
-        
-        self._check_conflicts_before_dedup()  
-        
-        self._preprocess_data()
-        self._build_combined_data()
-        self._validate_data()
-    
+    def process_all(self, sparse: bool = True, profile: bool = False, trace_alloc: bool = False) -> None:
+        """Thực hiện toàn bộ quy trình xử lý dữ liệu.
+
+        Args:
+            sparse (bool): True (mặc định) → sau khi validate, xây ScoreStore và bỏ các cột
+                điểm dày khỏi combined_data (store là nguồn duy nhất của điểm).
+                False → giữ cột điểm float64 trong combined_data cạnh store (tốn gấp đôi bộ nhớ).
+            profile (bool): True → đo wall/CPU time, mức tăng đỉnh RSS, số dòng và byte
+                dữ liệu vào/ra cho từng bước; xem kết quả qua get_profile_report().
+            trace_alloc (bool): True (cùng profile=True) → dùng thêm tracemalloc để đo
+                byte cấp phát và các vị trí cấp phát nhiều nhất của từng bước.
+        """
+        profiler = StageProfiler(enabled=profile, trace_alloc=trace_alloc)
+        probe = self._probe_data_size
+        self._compact = sparse
+
+        try:
+            profiler.run("_normalize_columns", self._normalize_columns, probe)
+            profiler.run("_apply_target_schema_all_years", self._apply_target_schema_all_years, probe)
+
+            profiler.run("_check_conflicts_before_dedup", self._check_conflicts_before_dedup, probe)
+
+            profiler.run("_preprocess_data", self._preprocess_data, probe)
+            profiler.run("_build_combined_data", self._build_combined_data, probe)
+            profiler.run("_validate_data", self._validate_data, probe)
+
+            if sparse:
+                profiler.run("_compact_score_columns", self._compact_score_columns, probe)
+        finally:
+            profiler.finish()
+            self._profile_report = profiler.report() if profile else None
+
+    # Đo kích thước dữ liệu hiện tại (phục vụ profiler)
+    def _probe_data_size(self) -> tuple[int, int]:
+        """Trả về (số dòng, số byte) của dữ liệu đang xử lý.
+
+        - Trước khi gộp: tổng trên các DataFrame theo năm.
+        - Sau khi gộp: combined_data.
+        Số byte là memory_usage(deep=False) để đo nhanh, không duyệt chuỗi.
+        """
+        if self._combined_data is not None and not self._combined_data.empty:
+            frames = [self._combined_data]
+        else:
+            frames = [df for df in (self._data_2018, self._data_2019, self._data_2020,
+                                    self._data_2021, self._data_2022, self._data_2023,
+                                    self._data_2024, self._data_2025_ct2006, self._data_2025_ct2018)
+                      if df is not None]
+        rows = sum(len(df) for df in frames)
+        nbytes = sum(int(df.memory_usage(index=True, deep=False).sum()) for df in frames)
+        return rows, nbytes
+
+    def get_profile_report(self, as_json: bool = False) -> dict | str | None:
+        """Báo cáo profile của lần process_all(profile=True) gần nhất.
+
+        Args:
+            as_json (bool): True → trả về chuỗi JSON thay vì dict.
+
+        Returns:
+            dict | str | None: {"stages": [...], "total": {...}, "trace_alloc": bool};
+            None nếu lần chạy gần nhất không bật profile.
+        """
+        if self._profile_report is None or not as_json:
+            return self._profile_report
+        return json.dumps(self._profile_report, indent=2, ensure_ascii=False)
+
+    # Bỏ các cột điểm dày của combined_data (ScoreStore là nguồn duy nhất)
+    def _compact_score_columns(self) -> None:
+        """Xây ScoreStore (nếu chưa có) rồi bỏ các cột điểm khỏi combined_data."""
+        self.get_score_store()
+        self._drop_score_columns()
+
+    def _drop_score_columns(self) -> None:
+        """Bỏ cột điểm khỏi combined_data khi store đã xây.
+
+        - Thứ tự cột đầy đủ được giữ trong _columns để dựng lại đúng schema khi cần.
+        - Gán thẳng vào slot để không làm mất store (dữ liệu không đổi, chỉ đổi layout).
+        """
+        if self._columns is not None:
+            return
+        store = self._score_store
+        columns = self._combined_data.columns.tolist()
+        self._combined_data = self._combined_data.drop(columns=store.subjects)
+        self._columns = columns
+
+    # Dựng lại DataFrame (cột khoá + cột điểm giải nén từ store) theo thứ tự cột cho trước
+    def _materialize(self, columns: list[str]) -> pd.DataFrame:
+        store = self._score_store
+        data = {
+            col: (store.column_values(col) if col in store.subjects else self._combined_data[col])
+            for col in columns
+        }
+        return pd.DataFrame(data, index=self._combined_data.index)
+
     # ------- Hàm lấy dữ liệu đã được xử lý --------
-    def get_processed_data(self) -> pd.DataFrame:
-        """Trả về kết quả đã xử lý."""
-        return self._combined_data
\ No newline at end of file
+    @property
+    def processed_columns(self) -> list[str]:
+        """Tên các cột của dữ liệu đã xử lý (không dựng lại cột điểm)."""
+        return list(self._combined_data.columns if self._columns is None else self._columns)
+
+    def get_processed_data(self, columns: list[str] | None = None) -> pd.DataFrame:
+        """Trả về kết quả đã xử lý.
+
+        Args:
+            columns (list[str] | None): Chỉ lấy các cột này (vd ['sbd', 'nam_hoc'] không phải
+                giải nén cột điểm nào). None → toàn bộ cột.
+        """
+        if columns is None:
+            return self.combined_data
+        if self._columns is None:
+            return self._combined_data[columns]
+        unknown = [c for c in columns if c not in self._columns]
+        if unknown:
+            raise KeyError(f"Không có cột {unknown} trong dữ liệu đã xử lý.")
+        return self._materialize(list(columns))
+
+    def get_score_store(self) -> ScoreStore:
+        """Trả về bản nén cột (ScoreStore) của dữ liệu đã xử lý.
+
+        Returns:
+            ScoreStore: Store được cache, chỉ xây lại khi combined_data thay đổi.
+
+        Raises:
+            ValueError: Khi chưa có dữ liệu đã xử lý (chưa gọi process_all()).
+        """
+        if self._score_store is None:
+            if self._combined_data is None or self._combined_data.empty:
+                raise ValueError("Chưa có dữ liệu đã xử lý, hãy gọi process_all() trước.")
+            self._score_store = ScoreStore.from_frame(self._combined_data)
+            if self._compact:
+                self._drop_score_columns()
+        return self._score_store
+
+    def get_program_codes(self) -> np.ndarray:
+        """Mã chương trình của từng dòng combined_data: 0 = CT2006, 1 = CT2018 (xem PROGRAMS).
+
+        Lấy từ partition gốc khi _build_combined_data (và nối tiếp qua append_partition).
+        Nếu combined_data được gán trực tiếp (không còn thông tin partition) → suy theo năm:
+        năm < 2025 là CT2006, năm 2025 coi là CT2018.
+
+        Raises:
+            ValueError: Khi chưa có dữ liệu đã xử lý.
+        """
+        if self._combined_data is None or self._combined_data.empty:
+            raise ValueError("Chưa có dữ liệu đã xử lý, hãy gọi process_all() trước.")
+        if self._program_codes is not None:
+            return self._program_codes
+        years = self._combined_data["nam_hoc"].to_numpy()
+        return (years >= 2025).astype(np.int8)
+
+    # ------- Nối thêm partition mới (vd điểm 2026) --------
+    def append_partition(self, df: pd.DataFrame, program: str | None = None) -> ScoreStore:
+        """Nối một partition đã chuẩn hoá (cùng schema với combined_data) vào dữ liệu đã xử lý.
+
+        - ScoreStore được nối tăng dần (chỉ nén partition mới) thay vì nén lại toàn bộ.
+        - Phiên bản dữ liệu tăng → kết quả phân tích cũ không còn dùng được trực tiếp
+          (Analysis.update cộng phần chênh vào các histogram nền).
+
+        Args:
+            df (pd.DataFrame): Partition mới, có 'sbd', 'nam_hoc' và các cột điểm (thiếu cột → NaN).
+            program (str | None): Nhãn chương trình trong PROGRAMS; None → suy theo năm
+                (năm >= 2025 là CT2018).
+
+        Returns:
+            ScoreStore: Store của riêng partition mới (để tính phần chênh của histogram).
+
+        Raises:
+            ValueError: Khi chưa có dữ liệu đã xử lý, partition rỗng, có cột lạ,
+                điểm ngoài [0, 10] hoặc nhãn chương trình không hợp lệ.
+        """
+        store = self.get_score_store()
+        if not isinstance(df, pd.DataFrame) or df.empty:
+            raise ValueError("Partition mới phải là DataFrame không rỗng.")
+        columns = self.processed_columns
+        unknown = [c for c in df.columns if c not in columns]
+        if unknown:
+            raise ValueError(f"Partition có cột không thuộc schema: {unknown}")
+        if program is not None and program not in PROGRAMS:
+            raise ValueError(f"program phải thuộc {PROGRAMS}.")
+
+        part = df.reindex(columns=columns)
+        scores = part[store.subjects].apply(pd.to_numeric, errors="coerce")
+        if ((scores < 0) | (scores > 10)).any().any():
+            raise ValueError("Partition có điểm nằm ngoài [0, 10].")
+        part = part.astype(self._combined_data.dtypes.to_dict())
+
+        new_store = ScoreStore.from_frame(part, subjects=store.subjects)
+        if program is None:
+            new_programs = (new_store.years >= 2025).astype(np.int8)
+        else:
+            new_programs = np.full(new_store.n_rows, PROGRAMS.index(program), dtype=np.int8)
+        programs = np.concatenate([self.get_program_codes().astype(np.int8), new_programs])
+
+        compact = self._columns
+        if compact is not None:
+            # Cột điểm chỉ nằm trong store → chỉ nối các cột khoá
+            part = part[self._combined_data.columns]
+        self.combined_data = pd.concat([self._combined_data, part], ignore_index=True)
+        # Setter đã bỏ store cũ → gắn store nối tăng dần, giữ layout và mã chương trình theo partition
+        self._columns = compact
+        self._score_store = store.append(new_store)
+        self._program_codes = programs
+        return new_store
+
+    # ------- Chia sẻ dữ liệu cho worker process (shared memory) --------
+    def publish_shared(self) -> SharedDataDescriptor:
+        """Đặt ma trận điểm (ScoreStore), mảng năm học và mã tỉnh lên shared memory.
+
+        Worker nhận descriptor (vài trăm byte) rồi gọi
+        `Module.Shared_Data.attach_shared(descriptor)` để dùng store zero-copy,
+        thay vì pickle toàn bộ DataFrame sang từng process.
+
+        Returns:
+            SharedDataDescriptor: Mô tả các segment; gọi lại khi dữ liệu chưa đổi
+            sẽ trả về cùng descriptor (không publish lại).
+
+        Raises:
+            ValueError: Khi chưa có dữ liệu đã xử lý.
+        """
+        store = self.get_score_store()
+        if self._shared is not None and not self._shared.released and self._shared.store is store:
+            return self._shared.descriptor
+
+        self.release_shared()
+        self._shared = SharedScoreData(store)
+        return self._shared.descriptor
+
+    def release_shared(self) -> None:
+        """Giải phóng (close + unlink) các segment đã publish. Gọi nhiều lần vẫn an toàn.
+
+        Segment cũng tự được dọn khi tiến trình kết thúc (atexit).
+        """
+        if self._shared is not None:
+            self._shared.release()
+            self._shared = None
\ No newline at end of file
@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import json
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable
+
+try:
+    import resource                      # Linux / macOS
+except ImportError:                      # Windows: không có module resource
+    resource = None
+
+
+# Đơn vị ru_maxrss: KB trên Linux, byte trên macOS
+_RSS_UNIT = 1 if sys.platform == "darwin" else 1024
+
+
+def _peak_rss_bytes() -> int | None:
+    """Đỉnh RSS (high-water mark) của tiến trình hiện tại, None nếu không đo được."""
+    if resource is None:
+        return None
+    return int(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss) * _RSS_UNIT
+
+
+class StageProfiler:
+    """Đo thời gian và bộ nhớ cho từng bước (stage) của một pipeline.
+
+    Mô tả:
+        - Mỗi stage ghi lại: wall time, CPU time, mức tăng đỉnh RSS, số dòng và
+          số byte dữ liệu vào/ra (qua hàm `probe` do pipeline cung cấp).
+        - trace_alloc=True → bật tracemalloc: byte cấp phát (net/peak) và top
+          vị trí cấp phát nhiều nhất (so sánh snapshot trước/sau stage).
+        - enabled=False → `run()` chỉ gọi hàm, không đo gì (chi phí ~0).
+        - Kết quả trả về dạng dict (report()) hoặc chuỗi JSON (to_json()).
+
+    Attributes (public API):
+        enabled     (bool): Có đo hay không.
+        trace_alloc (bool): Có dùng tracemalloc hay không.
+        top_n       (int) : Số vị trí cấp phát giữ lại cho mỗi stage.
+        stages      (list[dict]): Bản ghi của các stage đã chạy.
+    """
+
+    # ==================== INTERNAL PRIVATE MEMBERS ====================
+    __slots__ = (
+        "_enabled",             # bật/tắt đo đạc
+        "_trace_alloc",         # bật tracemalloc
+        "_top_n",               # số hot spot giữ lại
+        "_stages",              # danh sách bản ghi stage
+        "_started_tracing",     # profiler tự bật tracemalloc → tự tắt khi xong
+    )
+
+    # -------------------- CONSTRUCTOR --------------------
+    def __init__(self, enabled: bool = True, trace_alloc: bool = False, top_n: int = 10) -> None:
+        """Khởi tạo profiler.
+
+        Args:
+            enabled (bool): Có đo hay không.
+            trace_alloc (bool): Bật tracemalloc để đo byte cấp phát + hot spot.
+            top_n (int): Số vị trí cấp phát giữ lại cho mỗi stage.
+        """
+        if not isinstance(top_n, int) or top_n < 0:
+            raise ValueError("top_n phải là số nguyên không âm.")
+        self._enabled = bool(enabled)
+        self._trace_alloc = bool(enabled and trace_alloc)
+        self._top_n = top_n
+        self._stages: list[dict[str, Any]] = []
+        self._started_tracing = False
+
+    # -------------------- GETTER --------------------
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    @property
+    def trace_alloc(self) -> bool:
+        return self._trace_alloc
+
+    @property
+    def top_n(self) -> int:
+        return self._top_n
+
+    @property
+    def stages(self) -> list[dict[str, Any]]:
+        return list(self._stages)
+
+    # ==================== INTERNAL PRIVATE METHODS ====================
+    def _top_allocations(self,
+                         before: tracemalloc.Snapshot,
+                         after: tracemalloc.Snapshot) -> list[dict[str, Any]]:
+        """Top vị trí (file:line) có lượng cấp phát tăng nhiều nhất giữa 2 snapshot."""
+        filters = [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        ]
+        diffs = after.filter_traces(filters).compare_to(before.filter_traces(filters), "lineno")
+        top = []
+        for stat in diffs[: self._top_n]:
+            frame = stat.traceback[0]
+            top.append({
+                "location": f"{frame.filename}:{frame.lineno}",
+                "size_diff_bytes": int(stat.size_diff),
+                "count_diff": int(stat.count_diff),
+            })
+        return top
+
+    # ==================== PUBLIC METHODS (API) ====================
+    def run(self,
+            name: str,
+            func: Callable[[], Any],
+            probe: Callable[[], tuple[int, int]] | None = None) -> Any:
+        """Chạy một stage và ghi lại số liệu.
+
+        Args:
+            name (str): Tên stage (thường là tên method).
+            func (Callable): Hàm không tham số thực thi stage.
+            probe (Callable | None): Hàm trả về (số dòng, số byte dữ liệu) hiện tại,
+                được gọi trước và sau stage.
+
+        Returns:
+            Any: Giá trị trả về của func.
+        """
+        if not self._enabled:
+            return func()
+
+        if self._trace_alloc and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+        rows_in, bytes_in = probe() if probe else (None, None)
+        snap_before = tracemalloc.take_snapshot() if self._trace_alloc else None
+        if self._trace_alloc:
+            tracemalloc.reset_peak()
+            traced_before = tracemalloc.get_traced_memory()[0]
+
+        rss_before = _peak_rss_bytes()
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+
+        result = func()
+
+        wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+        rss_after = _peak_rss_bytes()
+
+        record: dict[str, Any] = {
+            "stage": name,
+            "wall_time_s": wall,
+            "cpu_time_s": cpu,
+            "peak_rss_bytes": rss_after,
+            "peak_rss_delta_bytes": None if rss_after is None else rss_after - rss_before,
+        }
+
+        if self._trace_alloc:
+            traced_after, traced_peak = tracemalloc.get_traced_memory()
+            record["alloc_net_bytes"] = traced_after - traced_before
+            record["alloc_peak_bytes"] = traced_peak - traced_before
+            record["top_allocations"] = self._top_allocations(snap_before, tracemalloc.take_snapshot())
+
+        rows_out, bytes_out = probe() if probe else (None, None)
+        record.update({
+            "rows_in": rows_in,
+            "rows_out": rows_out,
+            "data_bytes_in": bytes_in,
+            "data_bytes_out": bytes_out,
+        })
+
+        self._stages.append(record)
+        return result
+
+    def finish(self) -> None:
+        """Tắt tracemalloc nếu chính profiler đã bật nó."""
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def report(self) -> dict[str, Any]:
+        """Báo cáo có cấu trúc: danh sách stage + tổng hợp.
+
+        Returns:
+            dict: {"stages": [...], "total": {...}, "trace_alloc": bool}.
+        """
+        peaks = [s["peak_rss_bytes"] for s in self._stages if s["peak_rss_bytes"] is not None]
+        total = {
+            "wall_time_s": sum(s["wall_time_s"] for s in self._stages),
+            "cpu_time_s": sum(s["cpu_time_s"] for s in self._stages),
+            "peak_rss_bytes": max(peaks) if peaks else None,
+        }
+        # Stage làm tăng đỉnh RSS nhiều nhất / chạy lâu nhất (để đọc nhanh)
+        if self._stages:
+            total["slowest_stage"] = max(self._stages, key=lambda s: s["wall_time_s"])["stage"]
+            deltas = [s for s in self._stages if s["peak_rss_delta_bytes"] is not None]
+            if deltas:
+                total["peak_rss_stage"] = max(deltas, key=lambda s: s["peak_rss_delta_bytes"])["stage"]
+        return {
+            "stages": [dict(s) for s in self._stages],
+            "total": total,
+            "trace_alloc": self._trace_alloc,
+        }
+
+    def to_json(self, indent: int | None = 2) -> str:
+        """Báo cáo dạng chuỗi JSON."""
+        return json.dumps(self.report(), indent=indent, ensure_ascii=False)
+
+    # ==================== REPRESENTATION / UTILITIES ====================
+    def __repr__(self) -> str:
+        return (
+            f"<StageProfiler enabled={self._enabled} trace_alloc={self._trace_alloc} "
+            f"stages={len(self._stages)}>"
+        )
@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+import copy
+import functools
+import sys
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+import numpy as np
+import pandas as pd
+
+
+# Giới hạn bộ nhớ mặc định của cache kết quả phân tích (byte)
+DEFAULT_CACHE_BYTES = 512 * 1024 ** 2
+
+
+def _estimate_nbytes(value: Any) -> int:
+    """Ước lượng số byte của một kết quả (DataFrame, Series, ndarray, dict, histogram...)."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            _estimate_nbytes(k) + _estimate_nbytes(v) for k, v in value.items()
+        )
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(_estimate_nbytes(v) for v in value)
+    if hasattr(value, "nbytes"):
+        return int(value.nbytes)
+    return sys.getsizeof(value)
+
+
+def _freeze(value: Any) -> Any:
+    """Đánh dấu chỉ đọc các mảng numpy của kết quả (cả mảng nằm trong tuple) trước khi cache.
+
+    ScoreHistogram, ScoreCube, PairwiseMoments... tự khoá mảng trong constructor.
+    """
+    if isinstance(value, np.ndarray):
+        value.setflags(write=False)
+    elif isinstance(value, tuple):
+        for item in value:
+            _freeze(item)
+    return value
+
+
+def _detach(value: Any) -> Any:
+    """Bản sao an toàn để người gọi sửa kết quả không làm hỏng cache."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return value.copy()
+    if isinstance(value, (dict, list)):
+        return copy.deepcopy(value)
+    return value
+
+
+class ResultCache:
+    """Cache LRU cho kết quả phân tích, giới hạn theo bộ nhớ.
+
+    Mô tả:
+        - Khoá gồm (tên method, tham số, phiên bản dữ liệu); khi phiên bản dữ liệu
+          đổi, toàn bộ kết quả cũ bị bỏ (không giữ bộ nhớ cho dữ liệu đã lỗi thời).
+        - Vượt `max_bytes` → loại kết quả ít dùng gần đây nhất; kết quả lớn hơn
+          `max_bytes` không được cache.
+        - DataFrame/Series/dict được copy khi trả về → người gọi sửa thoải mái.
+        - Đối tượng khác (ScoreHistogram, ScoreCube, mảng numpy, tuple mảng...) được
+          trả về nguyên bản nhưng mảng bên trong là chỉ đọc (ghi vào → ValueError),
+          nên không thể làm hỏng kết quả đã cache.
+
+    Attributes (public API):
+        max_bytes (int) : Giới hạn bộ nhớ.
+        nbytes    (int) : Bộ nhớ (ước lượng) đang dùng.
+        hits      (int) : Số lần lấy được từ cache.
+        misses    (int) : Số lần phải tính lại.
+    """
+
+    # ==================== INTERNAL PRIVATE MEMBERS ====================
+    __slots__ = (
+        "_max_bytes",       # giới hạn bộ nhớ (byte)
+        "_entries",         # OrderedDict {key: (value, nbytes)} theo thứ tự dùng gần nhất
+        "_nbytes",          # tổng byte đang giữ
+        "_version",         # phiên bản dữ liệu của các entry hiện có
+        "_hits",            # số lần hit
+        "_misses",          # số lần miss
+    )
+
+    # -------------------- CONSTRUCTOR --------------------
+    def __init__(self, max_bytes: int = DEFAULT_CACHE_BYTES) -> None:
+        """Khởi tạo cache.
+
+        Args:
+            max_bytes (int): Giới hạn bộ nhớ; 0 → tắt cache.
+        """
+        if not isinstance(max_bytes, int) or max_bytes < 0:
+            raise ValueError("max_bytes phải là số nguyên không âm.")
+        self._max_bytes = max_bytes
+        self._entries: OrderedDict[Hashable, tuple[Any, int]] = OrderedDict()
+        self._nbytes = 0
+        self._version = None
+        self._hits = 0
+        self._misses = 0
+
+    # -------------------- GETTER --------------------
+    @property
+    def max_bytes(self) -> int:
+        return self._max_bytes
+
+    @property
+    def nbytes(self) -> int:
+        return self._nbytes
+
+    @property
+    def hits(self) -> int:
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        return self._misses
+
+    # ==================== INTERNAL PRIVATE METHODS ====================
+    def _sync_version(self, version: Hashable) -> None:
+        """Dữ liệu đổi phiên bản → bỏ toàn bộ entry cũ."""
+        if version != self._version:
+            self.clear()
+            self._version = version
+
+    def _evict(self) -> None:
+        """Loại entry ít dùng gần đây nhất cho tới khi vừa giới hạn bộ nhớ."""
+        while self._nbytes > self._max_bytes and self._entries:
+            _, (_, size) = self._entries.popitem(last=False)
+            self._nbytes -= size
+
+    # ==================== PUBLIC METHODS (API) ====================
+    def get_or_compute(self, key: Hashable, version: Hashable, compute: Callable[[], Any]) -> Any:
+        """Lấy kết quả theo khoá; chưa có thì tính, lưu rồi trả về.
+
+        Args:
+            key (Hashable): Khoá (tên method, tham số).
+            version (Hashable): Phiên bản dữ liệu nguồn hiện tại.
+            compute (Callable): Hàm không tham số tính kết quả.
+
+        Returns:
+            Any: Kết quả (bản sao với DataFrame/Series/dict).
+        """
+        self._sync_version(version)
+        full_key = (key, version)
+
+        entry = self._entries.get(full_key)
+        if entry is not None:
+            self._entries.move_to_end(full_key)
+            self._hits += 1
+            return _detach(entry[0])
+
+        self._misses += 1
+        value = _freeze(compute())
+        size = _estimate_nbytes(value)
+        if size <= self._max_bytes:
+            self._entries[full_key] = (value, size)
+            self._nbytes += size
+            self._evict()
+        return _detach(value)
+
+    def peek(self, key: Hashable, version: Hashable) -> Any:
+        """Kết quả đã cache cho (key, version) — nguyên bản, không copy; None nếu chưa có.
+
+        Không tính, không đổi thứ tự LRU và không tính vào hit/miss.
+        """
+        entry = self._entries.get((key, version)) if version == self._version else None
+        return None if entry is None else entry[0]
+
+    def put(self, key: Hashable, version: Hashable, value: Any) -> None:
+        """Ghi sẵn một kết quả (vd histogram đã cập nhật tăng dần) cho phiên bản dữ liệu `version`."""
+        self._sync_version(version)
+        full_key = (key, version)
+        value = _freeze(value)
+        old = self._entries.pop(full_key, None)
+        if old is not None:
+            self._nbytes -= old[1]
+        size = _estimate_nbytes(value)
+        if size <= self._max_bytes:
+            self._entries[full_key] = (value, size)
+            self._nbytes += size
+            self._evict()
+
+    def clear(self) -> None:
+        """Xoá toàn bộ kết quả đã cache."""
+        self._entries.clear()
+        self._nbytes = 0
+
+    def info(self) -> dict[str, int]:
+        """Thống kê nhanh: số entry, byte đang dùng, giới hạn, hit/miss."""
+        return {
+            "entries": len(self._entries),
+            "nbytes": self._nbytes,
+            "max_bytes": self._max_bytes,
+            "hits": self._hits,
+            "misses": self._misses,
+        }
+
+    # ==================== REPRESENTATION / UTILITIES ====================
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __repr__(self) -> str:
+        return (
+            f"<ResultCache entries={len(self._entries)} nbytes={self._nbytes} "
+            f"max_bytes={self._max_bytes} hits={self._hits} misses={self._misses}>"
+        )
+
+
+def method_key(name: str, *args, **kwargs) -> tuple:
+    """Khoá cache của lời gọi method `name(*args, **kwargs)` (dùng chung với @memoized)."""
+    return name, args, tuple(sorted(kwargs.items()))
+
+
+def memoized(method: Callable) -> Callable:
+    """Decorator cho method của lớp có `self._cache` (ResultCache) và `self._data_version()`.
+
+    Tham số không hash được (list, dict...) → bỏ qua cache, tính trực tiếp.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        key = method_key(method.__name__, *args, **kwargs)
+        try:
+            hash(key)
+        except TypeError:
+            return method(self, *args, **kwargs)
+        return self._cache.get_or_compute(
+            key, self._data_version(), lambda: method(self, *args, **kwargs)
+        )
+    return wrapper
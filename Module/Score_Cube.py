@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from Module.Score_Store import ScoreStore, PROGRAMS, MAX_SCORE_CODE
+from Module.Score_Histogram import ScoreHistogram
+
+
+# Thứ tự trục nhóm của cube (trục cuối luôn là bin điểm)
+CUBE_AXES = ("nam_hoc", "chuong_trinh", "ma_tinh", "mon_hoc")
+
+
+class ScoreCube:
+    """Cube OLAP vật chất hoá: histogram điểm theo (năm, chương trình, mã tỉnh, môn).
+
+    Mô tả:
+        - Xây MỘT lần từ ScoreStore (mỗi môn một lượt bincount), sau đó mọi câu hỏi
+          (môn X ở tỉnh Y qua các năm, mọi tỉnh của một môn-năm, toàn quốc...) chỉ là
+          phép cắt / cộng trên mảng đếm, không quét lại dữ liệu thí sinh.
+        - Trục 'ma_tinh' dùng mã tỉnh cũ (2 ký tự đầu SBD, int; -1 = SBD không hợp lệ)
+          → cộng hết trục tỉnh luôn khớp số liệu toàn quốc.
+        - Đếm lưu dạng int32 để giới hạn bộ nhớ (mỗi ô < 2^31 thí sinh).
+
+    Attributes (public API):
+        histogram  (ScoreHistogram): Histogram 4 trục nhóm bên dưới.
+        axis_names (list[str])     : ['nam_hoc', 'chuong_trinh', 'ma_tinh', 'mon_hoc'].
+        nbytes     (int)           : Bộ nhớ của mảng đếm.
+    """
+
+    # ==================== INTERNAL PRIVATE MEMBERS ====================
+    __slots__ = (
+        "_hist",          # ScoreHistogram (nam_hoc × chuong_trinh × ma_tinh × mon_hoc × bin)
+    )
+
+    # -------------------- CONSTRUCTOR --------------------
+    def __init__(self, histogram: ScoreHistogram) -> None:
+        """Bọc một ScoreHistogram có đúng các trục CUBE_AXES."""
+        if not isinstance(histogram, ScoreHistogram):
+            raise TypeError("histogram phải là instance của ScoreHistogram.")
+        if tuple(histogram.axis_names) != CUBE_AXES:
+            raise ValueError(f"Cube cần các trục {CUBE_AXES}, nhận được {histogram.axis_names}.")
+        self._hist = histogram
+
+    # -------------------- GETTER (read-only) --------------------
+    @property
+    def histogram(self) -> ScoreHistogram:
+        return self._hist
+
+    @property
+    def axis_names(self) -> list[str]:
+        return self._hist.axis_names
+
+    @property
+    def nbytes(self) -> int:
+        return self._hist.nbytes
+
+    # ==================== PUBLIC METHODS (API) ====================
+    def labels(self, name: str) -> np.ndarray:
+        """Nhãn của một trục (vd: cube.labels('ma_tinh'))."""
+        return self._hist.labels(name)
+
+    def slice(self, **selection) -> ScoreHistogram:
+        """Cắt cube theo nhãn (cùng quy ước ScoreHistogram.select).
+
+        Ví dụ: cube.slice(mon_hoc='toan', ma_tinh=1) → (nam_hoc × chuong_trinh × bin).
+        """
+        return self._hist.select(**selection)
+
+    def merge(self, other: "ScoreCube") -> "ScoreCube":
+        """Cộng cube của một partition mới vào cube hiện có (giữ kiểu đếm int32 của cube)."""
+        merged = self._hist.merge(other.histogram)
+        return ScoreCube(ScoreHistogram(
+            merged.counts.astype(self._hist.counts.dtype),
+            [(name, merged.labels(name)) for name in merged.axis_names],
+            merged.scale,
+        ))
+
+    def rollup(self, *names: str, **selection) -> ScoreHistogram:
+        """Cắt theo `selection` rồi cộng dồn (bỏ) các trục `names`.
+
+        Ví dụ: cube.rollup('ma_tinh', 'chuong_trinh', mon_hoc='toan') → toàn quốc theo năm.
+        """
+        return self._hist.select(**selection).rollup(*names)
+
+    def stats(self, *names: str, **selection) -> pd.DataFrame:
+        """Thống kê mô tả (count, mean, median, mode, std, min, max) cho mọi nhóm còn lại.
+
+        Args:
+            *names (str): Các trục cộng dồn trước khi tính.
+            **selection: Lát cắt theo nhãn.
+
+        Returns:
+            pd.DataFrame: Index theo các trục còn lại (nhóm rỗng → count = 0, NaN).
+        """
+        return self.rollup(*names, **selection).describe()
+
+    # ==================== REPRESENTATION / UTILITIES ====================
+    def __repr__(self) -> str:
+        shape = " × ".join(f"{n}[{len(self._hist.labels(n))}]" for n in self.axis_names)
+        return f"<ScoreCube {shape} × bin[{self._hist.n_bins}] nbytes={self.nbytes}>"
+
+
+def build_score_cube(store: ScoreStore, program_codes: np.ndarray) -> ScoreCube:
+    """Vật chất hoá cube (năm, chương trình, mã tỉnh, môn) × bin điểm từ ScoreStore.
+
+    Mỗi môn một lượt bincount trên khoá ((năm * P + chương trình) * R + tỉnh) * n_bins + mã điểm,
+    nên bộ nhớ tạm chỉ tỉ lệ với số ô có điểm của một môn.
+
+    Args:
+        store (ScoreStore): Dữ liệu điểm dạng nén cột.
+        program_codes (np.ndarray): Mã chương trình theo dòng (chỉ số trong PROGRAMS).
+
+    Returns:
+        ScoreCube: Cube với nhãn năm (int), chương trình (PROGRAMS), mã tỉnh (int), môn.
+    """
+    program_codes = np.asarray(program_codes)
+    if len(program_codes) != store.n_rows:
+        raise ValueError("program_codes phải có cùng số dòng với ScoreStore.")
+
+    n_bins = MAX_SCORE_CODE + 1
+    years, year_idx = np.unique(store.years, return_inverse=True)
+    provinces, prov_idx = np.unique(store.province_codes, return_inverse=True)
+    n_years, n_programs, n_provinces = len(years), len(PROGRAMS), len(provinces)
+
+    # Chỉ số nhóm (năm, chương trình, tỉnh) của từng dòng
+    group = (year_idx * n_programs + program_codes.astype(np.int64)) * n_provinces + prov_idx
+    n_groups = n_years * n_programs * n_provinces
+
+    counts = np.zeros((n_groups, len(store.subjects), n_bins), dtype=np.int32)
+    for j, subject in enumerate(store.subjects):
+        rows, codes = store.column(subject)
+        counts[:, j, :] = np.bincount(
+            group[rows] * n_bins + codes, minlength=n_groups * n_bins
+        ).reshape(n_groups, n_bins)
+
+    hist = ScoreHistogram(
+        counts.reshape(n_years, n_programs, n_provinces, len(store.subjects), n_bins),
+        [
+            ("nam_hoc", years.astype(np.int64)),
+            ("chuong_trinh", np.asarray(PROGRAMS, dtype=object)),
+            ("ma_tinh", provinces.astype(np.int64)),
+            ("mon_hoc", np.asarray(store.subjects, dtype=object)),
+        ],
+    )
+    return ScoreCube(hist)
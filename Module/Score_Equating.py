@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from Module.Score_Store import SCORE_SCALE
+
+
+# Độ rộng làm trơn mặc định (đơn vị điểm): σ của kernel Gauss áp lên histogram trước khi lấy CDF
+DEFAULT_EQUATING_BANDWIDTH = 0.1
+
+# Khối lượng cộng đều vào mọi bin (tỉ lệ với tổng thí sinh) để CDF tăng ngặt → nghịch đảo duy nhất
+_SMOOTHING_FLOOR = 1e-6
+
+
+def smooth_counts(counts: np.ndarray, bandwidth_bins: float) -> np.ndarray:
+    """Làm trơn histogram 1 chiều bằng kernel Gauss (phản xạ ở hai biên để giữ khối lượng).
+
+    Args:
+        counts (np.ndarray): Số đếm theo bin.
+        bandwidth_bins (float): σ của kernel tính theo số bin; <= 0 → không làm trơn.
+
+    Returns:
+        np.ndarray: float64 cùng độ dài, cùng tổng (xấp xỉ) với counts.
+    """
+    counts = np.asarray(counts, dtype=np.float64)
+    if bandwidth_bins <= 0 or len(counts) < 2:
+        return counts.copy()
+
+    half = min(int(np.ceil(4 * bandwidth_bins)), len(counts) - 1)
+    offsets = np.arange(-half, half + 1)
+    kernel = np.exp(-0.5 * (offsets / bandwidth_bins) ** 2)
+    kernel /= kernel.sum()
+
+    padded = np.pad(counts, half, mode="reflect")
+    return np.convolve(padded, kernel, mode="valid")
+
+
+def _continuous_cdf(counts: np.ndarray, bandwidth_bins: float) -> np.ndarray:
+    """CDF liên tục hoá (0..1) tại các biên bin: bin i trải đều trên [i - 0.5, i + 0.5].
+
+    Returns:
+        np.ndarray: len(counts) + 1 giá trị, tăng ngặt, từ 0 tới 1.
+    """
+    smoothed = smooth_counts(counts, bandwidth_bins)
+    total = smoothed.sum()
+    if total <= 0:
+        raise ValueError("Phân phối rỗng (không có thí sinh), không thể quy đổi.")
+    smoothed = smoothed + _SMOOTHING_FLOOR * total / len(smoothed)
+    cdf = np.concatenate([[0.0], np.cumsum(smoothed)])
+    return cdf / cdf[-1]
+
+
+class EquatingFunction:
+    """Hàm quy đổi điểm theo phương pháp equipercentile giữa hai phân phối.
+
+    Mô tả:
+        - e(x) = G⁻¹(F(x)): điểm x của phân phối nguồn có cùng hạng phần trăm với e(x)
+          ở phân phối đích. F, G là CDF liên tục hoá của histogram đã làm trơn.
+        - Giữ bảng tra (điểm nguồn trên lưới bin → điểm quy đổi); `equate` nội suy tuyến
+          tính trên bảng nên đổi cả mảng điểm trong một lần gọi.
+
+    Attributes (public API):
+        source (str)       : Nhãn phân phối nguồn.
+        target (str)       : Nhãn phân phối đích.
+        scores (np.ndarray): Lưới điểm nguồn.
+        table  (np.ndarray): Điểm quy đổi tương ứng.
+    """
+
+    # ==================== INTERNAL PRIVATE MEMBERS ====================
+    __slots__ = (
+        "_source",        # nhãn phân phối nguồn
+        "_target",        # nhãn phân phối đích
+        "_scores",        # lưới điểm nguồn (tâm bin)
+        "_table",         # điểm quy đổi tại từng điểm lưới
+    )
+
+    # -------------------- CONSTRUCTOR --------------------
+    def __init__(self, source: str, target: str, scores: np.ndarray, table: np.ndarray) -> None:
+        if len(scores) != len(table):
+            raise ValueError("scores và table phải cùng độ dài.")
+        self._source, self._target = source, target
+        self._scores = np.asarray(scores, dtype=np.float64)
+        self._table = np.asarray(table, dtype=np.float64)
+        # Chỉ đọc: bảng quy đổi được cache và dùng chung giữa các lời gọi
+        self._scores.setflags(write=False)
+        self._table.setflags(write=False)
+
+    # -------------------- GETTER (read-only) --------------------
+    @property
+    def source(self) -> str:
+        return self._source
+
+    @property
+    def target(self) -> str:
+        return self._target
+
+    @property
+    def scores(self) -> np.ndarray:
+        return self._scores
+
+    @property
+    def table(self) -> np.ndarray:
+        return self._table
+
+    # ==================== PUBLIC METHODS (API) ====================
+    def equate(self, scores) -> np.ndarray:
+        """Quy đổi một mảng điểm nguồn sang thang điểm đích (NaN giữ nguyên NaN).
+
+        Điểm ngoài lưới bị kẹp về hai đầu bảng.
+        """
+        scores = np.asarray(scores, dtype=np.float64)
+        return np.interp(scores, self._scores, self._table)
+
+    def to_frame(self, round_to: float | None = None) -> pd.DataFrame:
+        """Bảng quy đổi ['diem_goc', 'diem_quy_doi'] (làm tròn theo bước round_to nếu có)."""
+        table = self._table if round_to is None else np.round(self._table / round_to) * round_to
+        return pd.DataFrame({"diem_goc": self._scores, "diem_quy_doi": table})
+
+    # ==================== REPRESENTATION / UTILITIES ====================
+    def __repr__(self) -> str:
+        return f"<EquatingFunction {self._source} → {self._target} points={len(self._scores)}>"
+
+
+def equipercentile_equate(source_counts: np.ndarray,
+                          target_counts: np.ndarray,
+                          scale: int = SCORE_SCALE,
+                          bandwidth: float = DEFAULT_EQUATING_BANDWIDTH,
+                          source: str = "source",
+                          target: str = "target") -> EquatingFunction:
+    """Dựng hàm quy đổi equipercentile từ hai histogram (bin i ↔ điểm i / scale).
+
+    Args:
+        source_counts (np.ndarray): Histogram phân phối nguồn.
+        target_counts (np.ndarray): Histogram phân phối đích (có thể khác số bin).
+        scale (int): Điểm = chỉ số bin / scale.
+        bandwidth (float): σ làm trơn (đơn vị điểm); 0 → chỉ nội suy tuyến tính.
+        source (str), target (str): Nhãn hiển thị.
+
+    Returns:
+        EquatingFunction: Bảng quy đổi cho mọi bin của phân phối nguồn.
+    """
+    cdf_source = _continuous_cdf(source_counts, bandwidth * scale)
+    cdf_target = _continuous_cdf(target_counts, bandwidth * scale)
+
+    # Hạng phần trăm tại tâm bin nguồn, rồi nghịch đảo CDF đích (tăng ngặt) bằng nội suy
+    ranks = (cdf_source[:-1] + cdf_source[1:]) / 2
+    edges = np.arange(len(cdf_target)) - 0.5
+    equated = np.interp(ranks, cdf_target, edges)
+    equated = np.clip(equated, 0, len(target_counts) - 1) / scale
+
+    return EquatingFunction(source, target, np.arange(len(cdf_source) - 1) / scale, equated)
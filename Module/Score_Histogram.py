@@ -0,0 +1,817 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from Module.Score_Store import ScoreStore, PROGRAMS, SCORE_SCALE, MAX_SCORE_CODE
+
+
+# Ngưỡng điểm liệt: bài thi đạt <= 1.0 điểm
+FAILING_SCORE = 1.0
+
+
+class ScoreHistogram:
+    """Histogram điểm dạng dày: counts[nhóm..., bin] với bin k ↔ điểm k / scale.
+
+    Mô tả:
+        - Các trục nhóm (năm, môn, khối, tỉnh, ...) có nhãn; trục cuối là bin điểm.
+        - Là "nguồn sự thật" cho phân phối: các DataFrame dạng dài
+          (['nam_hoc', 'mon_hoc', 'diem', 'so_hoc_sinh'], ...) chỉ là view của counts.
+        - Chọn lát cắt (select) và cộng dồn (rollup) đều là phép numpy trên counts,
+          không quét lại dữ liệu thí sinh.
+
+    Attributes (public API):
+        counts     (np.ndarray): Mảng đếm (số nguyên), shape (*group_shape, n_bins).
+        axis_names (list[str]) : Tên các trục nhóm theo thứ tự.
+        scale      (int)       : Hệ số mã hoá điểm (bin k ↔ điểm k / scale).
+        n_bins     (int)       : Số bin điểm.
+        scores     (np.ndarray): Giá trị điểm của từng bin.
+    """
+
+    # ==================== INTERNAL PRIVATE MEMBERS ====================
+    __slots__ = (
+        "_counts",        # mảng đếm (*group_shape, n_bins)
+        "_axes",          # list[(tên trục, nhãn np.ndarray)]
+        "_scale",         # hệ số mã hoá điểm
+    )
+
+    # -------------------- CONSTRUCTOR --------------------
+    def __init__(self,
+                 counts: np.ndarray,
+                 axes: list[tuple[str, list | np.ndarray]],
+                 scale: int = SCORE_SCALE) -> None:
+        """Khởi tạo histogram.
+
+        Args:
+            counts (np.ndarray): Mảng đếm, trục cuối là bin điểm.
+            axes (list[tuple[str, list | np.ndarray]]): (tên trục, nhãn) cho các trục nhóm.
+            scale (int): Hệ số mã hoá điểm.
+
+        Raises:
+            ValueError: Khi số trục / số nhãn không khớp với shape của counts.
+        """
+        counts = np.asarray(counts)
+        if counts.ndim != len(axes) + 1:
+            raise ValueError("counts phải có đúng len(axes) + 1 chiều (trục cuối là bin điểm).")
+        normalized = []
+        for dim, (name, labels) in enumerate(axes):
+            labels = np.asarray(labels)
+            if len(labels) != counts.shape[dim]:
+                raise ValueError(f"Trục '{name}' có {len(labels)} nhãn nhưng counts có {counts.shape[dim]}.")
+            # Nhãn chỉ đọc: histogram được cache dùng chung giữa các lời gọi
+            labels.setflags(write=False)
+            normalized.append((name, labels))
+        # Chỉ đọc → sửa kết quả trả về (hoặc lát select) không làm hỏng histogram đã cache
+        counts.setflags(write=False)
+        self._counts = counts
+        self._axes = normalized
+        self._scale = int(scale)
+
+    # -------------------- GETTER (read-only) --------------------
+    @property
+    def counts(self) -> np.ndarray:
+        return self._counts
+
+    @property
+    def axis_names(self) -> list[str]:
+        return [name for name, _ in self._axes]
+
+    @property
+    def scale(self) -> int:
+        return self._scale
+
+    @property
+    def n_bins(self) -> int:
+        return int(self._counts.shape[-1])
+
+    @property
+    def nbytes(self) -> int:
+        return int(self._counts.nbytes)
+
+    @property
+    def scores(self) -> np.ndarray:
+        """Giá trị điểm của từng bin (k / scale)."""
+        return np.arange(self.n_bins) / self._scale
+
+    # ==================== INTERNAL PRIVATE METHODS ====================
+    def _axis_position(self, name: str) -> int:
+        for dim, (axis_name, _) in enumerate(self._axes):
+            if axis_name == name:
+                return dim
+        raise KeyError(f"Histogram không có trục '{name}'. Các trục: {self.axis_names}")
+
+    def _group_index(self) -> pd.Index:
+        """Index (MultiIndex nếu nhiều trục) cho các nhóm theo thứ tự C của counts."""
+        if not self._axes:
+            return pd.RangeIndex(1)
+        if len(self._axes) == 1:
+            return pd.Index(self._axes[0][1], name=self._axes[0][0])
+        return pd.MultiIndex.from_product([labels for _, labels in self._axes], names=self.axis_names)
+
+    # ==================== PUBLIC METHODS (API) ====================
+    def labels(self, name: str) -> np.ndarray:
+        """Nhãn của một trục nhóm."""
+        return self._axes[self._axis_position(name)][1]
+
+    def select(self, **selection) -> "ScoreHistogram":
+        """Lấy lát cắt theo nhãn.
+
+        - Nhãn đơn (vd: nam_hoc=2024) → bỏ trục đó.
+        - Danh sách nhãn (vd: mon_hoc=['toan', 'ngu_van']) → giữ trục, theo thứ tự đã cho.
+
+        Raises:
+            KeyError: Khi trục hoặc nhãn không tồn tại.
+        """
+        counts = self._counts
+        axes = list(self._axes)
+        for name, wanted in selection.items():
+            names = [n for n, _ in axes]
+            if name not in names:
+                raise KeyError(f"Histogram không có trục '{name}'. Các trục: {names}")
+            dim = names.index(name)
+            labels = axes[dim][1]
+            single = np.ndim(wanted) == 0
+            wanted_list = [wanted] if single else list(wanted)
+
+            positions = []
+            for label in wanted_list:
+                hits = np.flatnonzero(labels == label)
+                if len(hits) == 0:
+                    raise KeyError(f"Trục '{name}' không có nhãn {label!r}.")
+                positions.append(int(hits[0]))
+
+            if single:
+                # Nhãn đơn → chỉ số cơ bản: view, không copy
+                counts = counts[(slice(None),) * dim + (positions[0],)]
+                axes.pop(dim)
+            else:
+                counts = np.take(counts, positions, axis=dim)
+                axes[dim] = (name, labels[positions])
+        return ScoreHistogram(counts, axes, self._scale)
+
+    def rollup(self, *names: str) -> "ScoreHistogram":
+        """Cộng dồn (bỏ) các trục đã cho, vd: rollup('tinh') → toàn quốc."""
+        dims = sorted(self._axis_position(n) for n in names)
+        counts = self._counts.sum(axis=tuple(dims)) if dims else self._counts
+        axes = [axis for dim, axis in enumerate(self._axes) if dim not in dims]
+        return ScoreHistogram(counts, axes, self._scale)
+
+    def merge(self, other: "ScoreHistogram") -> "ScoreHistogram":
+        """Cộng hai histogram cùng trục (vd histogram cũ + histogram của partition mới).
+
+        Nhãn mỗi trục là hợp của hai bên: giữ thứ tự của self, nhãn mới nối vào cuối;
+        trục nhãn số (năm, mã tỉnh) được sắp tăng dần như khi dựng từ đầu. Số bin lấy
+        theo bên lớn hơn.
+
+        Raises:
+            ValueError: Khi khác tên trục hoặc khác hệ số mã hoá điểm.
+        """
+        if self.axis_names != other.axis_names or self._scale != other.scale:
+            raise ValueError("Chỉ cộng được histogram cùng trục và cùng hệ số mã hoá điểm.")
+
+        axes = []
+        for (name, labels), (_, extra) in zip(self._axes, other._axes):
+            merged = np.concatenate([labels, extra[~np.isin(extra, labels)]])
+            if merged.dtype.kind in "iu":
+                merged = np.sort(merged)
+            axes.append((name, merged))
+
+        n_bins = max(self.n_bins, other.n_bins)
+        counts = np.zeros((*(len(labels) for _, labels in axes), n_bins), dtype=np.int64)
+        for hist in (self, other):
+            positions = []
+            for (_, labels), (_, own) in zip(axes, hist._axes):
+                lookup = {label: k for k, label in enumerate(labels.tolist())}
+                positions.append([lookup[label] for label in own.tolist()])
+            counts[np.ix_(*positions, np.arange(hist.n_bins))] += hist.counts
+        return ScoreHistogram(counts, axes, self._scale)
+
+    def nonzero_groups(self) -> list[tuple]:
+        """Các nhóm (tuple nhãn theo thứ tự trục) có ít nhất một thí sinh."""
+        occupied = np.nonzero(self._counts.sum(axis=-1))
+        return list(zip(*(labels[pos].tolist() for (_, labels), pos in zip(self._axes, occupied))))
+
+    def to_frame(self, score_col: str = "diem", count_col: str = "so_hoc_sinh") -> pd.DataFrame:
+        """View dạng dài: một dòng cho mỗi ô (nhóm..., bin) có thí sinh.
+
+        Thứ tự dòng theo thứ tự nhãn của từng trục rồi đến điểm tăng dần.
+
+        Returns:
+            pd.DataFrame: Cột [<các trục>..., score_col, count_col].
+        """
+        positions = np.nonzero(self._counts)
+        data = {}
+        for (name, labels), pos in zip(self._axes, positions[:-1]):
+            values = labels[pos]
+            if values.dtype.kind in "iu":
+                values = values.astype(np.int64)
+            elif values.dtype.kind == "U":
+                values = values.astype(object)
+            data[name] = values
+        data[score_col] = positions[-1] / self._scale
+        data[count_col] = self._counts[positions].astype(np.int64)
+        return pd.DataFrame(data)
+
+    def describe(self) -> pd.DataFrame:
+        """Thống kê mô tả cho MỌI nhóm cùng lúc, tính trực tiếp trên counts (O(bins)/nhóm).
+
+        Cùng định nghĩa với pandas trên dữ liệu đã "nhân bản" theo tần suất:
+        median nội suy tuyến tính, mode = điểm nhỏ nhất có tần suất lớn nhất,
+        std mẫu (ddof=1). Nhóm không có thí sinh → NaN.
+
+        Returns:
+            pd.DataFrame: Index theo các trục nhóm; cột count, mean, median, mode, std, min, max.
+        """
+        counts = self._counts.reshape(-1, self.n_bins).astype(np.float64)
+        scores = self.scores
+        n = counts.sum(axis=1)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = counts @ scores / n
+            sq_dev = (scores[None, :] - mean[:, None]) ** 2
+            std = np.sqrt((counts * sq_dev).sum(axis=1) / (n - 1))
+        std[n < 2] = np.nan
+
+        present = counts > 0
+        empty = n == 0
+        mode = scores[counts.argmax(axis=1)]
+        min_val = scores[present.argmax(axis=1)]
+        max_val = scores[self.n_bins - 1 - present[:, ::-1].argmax(axis=1)]
+        median = _quantiles_from_counts(counts, scores, np.array([0.5]))[:, 0]
+        for arr in (mode, min_val, max_val):
+            arr[empty] = np.nan
+
+        return pd.DataFrame({
+            "count": n.astype(np.int64),
+            "mean": mean,
+            "median": median,
+            "mode": mode,
+            "std": std,
+            "min": min_val,
+            "max": max_val,
+        }, index=self._group_index())
+
+    def quantiles(self, q) -> pd.DataFrame:
+        """Phân vị tuỳ ý cho MỌI nhóm trong một lượt, từ histogram cộng dồn (không nhân bản dòng).
+
+        Args:
+            q (float | list[float]): Phân vị trong [0, 1] (nội suy tuyến tính như pandas).
+
+        Returns:
+            pd.DataFrame: Index theo các trục nhóm; mỗi cột là một phân vị (NaN cho nhóm rỗng).
+        """
+        q = np.atleast_1d(np.asarray(q, dtype=float))
+        if ((q < 0) | (q > 1)).any():
+            raise ValueError("Phân vị phải nằm trong [0, 1].")
+        values = _quantiles_from_counts(self._counts.reshape(-1, self.n_bins), self.scores, q)
+        return pd.DataFrame(values, columns=q.tolist(), index=self._group_index())
+
+    def pass_rates(self, thresholds) -> pd.DataFrame:
+        """Tỉ lệ thí sinh đạt điểm >= ngưỡng cho MỌI nhóm (vd: [5, 8] với môn, [15, 24] với khối).
+
+        Args:
+            thresholds (float | list[float]): Các ngưỡng điểm.
+
+        Returns:
+            pd.DataFrame: Index theo các trục nhóm; mỗi cột là tỉ lệ (0..1) cho một ngưỡng.
+        """
+        thresholds = np.atleast_1d(np.asarray(thresholds, dtype=float))
+        counts = self._counts.reshape(-1, self.n_bins)
+        # at_least[:, k] = số thí sinh có mã điểm >= k
+        at_least = np.concatenate(
+            [np.cumsum(counts[:, ::-1], axis=1)[:, ::-1], np.zeros((len(counts), 1), dtype=counts.dtype)],
+            axis=1,
+        )
+        # Mã điểm nhỏ nhất đạt ngưỡng (trừ eps để 5.0 * 100 không bị làm tròn lên 501)
+        first_code = np.clip(np.ceil(thresholds * self._scale - 1e-9).astype(np.int64), 0, self.n_bins)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            rates = at_least[:, first_code] / at_least[:, [0]]
+        return pd.DataFrame(rates, columns=thresholds.tolist(), index=self._group_index())
+
+    def boxplot(self, whisker: float = 1.5) -> pd.DataFrame:
+        """Tóm tắt boxplot (five-number + râu Tukey) cho MỌI nhóm.
+
+        - q1/median/q3: phân vị nội suy tuyến tính.
+        - whisker_low/high: điểm có thật nhỏ/lớn nhất còn nằm trong [q1 - w*IQR, q3 + w*IQR].
+        - n_outliers: số thí sinh nằm ngoài hai râu.
+
+        Returns:
+            pd.DataFrame: Cột count, min, q1, median, q3, max, whisker_low, whisker_high, n_outliers.
+        """
+        counts = self._counts.reshape(-1, self.n_bins)
+        scores = self.scores
+        n = counts.sum(axis=1)
+        empty = n == 0
+
+        q1, median, q3 = _quantiles_from_counts(counts, scores, np.array([0.25, 0.5, 0.75])).T
+        iqr = q3 - q1
+        low_fence, high_fence = q1 - whisker * iqr, q3 + whisker * iqr
+
+        present = counts > 0
+        inside = present & (scores[None, :] >= low_fence[:, None]) & (scores[None, :] <= high_fence[:, None])
+        min_val = scores[present.argmax(axis=1)]
+        max_val = scores[self.n_bins - 1 - present[:, ::-1].argmax(axis=1)]
+        whisker_low = scores[inside.argmax(axis=1)]
+        whisker_high = scores[self.n_bins - 1 - inside[:, ::-1].argmax(axis=1)]
+        n_outliers = n - np.where(inside, counts, 0).sum(axis=1)
+        for arr in (min_val, max_val, whisker_low, whisker_high):
+            arr[empty] = np.nan
+
+        return pd.DataFrame({
+            "count": n.astype(np.int64),
+            "min": min_val,
+            "q1": q1,
+            "median": median,
+            "q3": q3,
+            "max": max_val,
+            "whisker_low": whisker_low,
+            "whisker_high": whisker_high,
+            "n_outliers": n_outliers.astype(np.int64),
+        }, index=self._group_index())
+
+    def inequality(self, failing_score: float = FAILING_SCORE) -> pd.DataFrame:
+        """Chỉ số bất bình đẳng / phân tán cho MỌI nhóm, dạng đóng trên counts.
+
+        - gini: Σ_k x_k c_k (2 C_{k-1} + c_k - N) / (N Σ x) — đúng bằng Gini (dân số)
+          trên dữ liệu đã nhân bản, với C = số đếm cộng dồn theo điểm tăng dần.
+        - theil: (1/N) Σ_k c_k (x_k/μ) ln(x_k/μ), quy ước 0·ln 0 = 0.
+        - iqr_ratio: q3 / q1 (phân vị nội suy tuyến tính); q1 = 0 → NaN.
+        - failing_share: tỉ lệ điểm <= failing_score (điểm liệt).
+
+        Returns:
+            pd.DataFrame: Cột count, gini, theil, iqr_ratio, failing_share; nhóm rỗng / μ = 0 → NaN.
+        """
+        counts = self._counts.reshape(-1, self.n_bins).astype(np.float64)
+        scores = self.scores
+        n = counts.sum(axis=1)
+
+        cum_before = np.cumsum(counts, axis=1) - counts
+        mass = counts * scores[None, :]
+        total = mass.sum(axis=1)
+        q1, q3 = _quantiles_from_counts(counts, scores, np.array([0.25, 0.75])).T
+        failing_bins = int(np.floor(failing_score * self._scale + 1e-9)) + 1
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            gini = (mass * (2 * cum_before + counts - n[:, None])).sum(axis=1) / (n * total)
+            ratio = scores[None, :] / (total / n)[:, None]
+            log_ratio = np.log(np.where(ratio > 0, ratio, 1.0))
+            theil = (counts * ratio * log_ratio).sum(axis=1) / n
+            iqr_ratio = np.where(q1 > 0, q3 / q1, np.nan)
+            failing_share = counts[:, :failing_bins].sum(axis=1) / n
+
+        undefined = (n == 0) | (total == 0)
+        gini[undefined] = np.nan
+        theil[undefined] = np.nan
+        return pd.DataFrame({
+            "count": n.astype(np.int64),
+            "gini": gini,
+            "theil": theil,
+            "iqr_ratio": iqr_ratio,
+            "failing_share": failing_share,
+        }, index=self._group_index())
+
+    def kde(self,
+            bandwidth: float | None = None,
+            bw_adjust: float = 1.0,
+            grid_step: float | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """Mật độ KDE Gauss cho MỌI nhóm bằng tích chập FFT của histogram với kernel.
+
+        - Tương đương KDE trên dữ liệu đã nhân bản theo tần suất (điểm đã làm tròn 0.01),
+          nhưng chỉ tốn O(bins log bins) mỗi nhóm: rfft(counts) × biến đổi Fourier của
+          kernel Gauss (exp(-2π²σ²f²)), rồi irfft. Đệm 0 đủ 4σ → không bị cuộn vòng.
+        - bandwidth=None → quy tắc Scott như seaborn/scipy: σ = std · n^(-1/5) theo từng nhóm.
+
+        Args:
+            bandwidth (float | None): σ của kernel (đơn vị điểm) dùng chung cho mọi nhóm.
+            bw_adjust (float): Hệ số nhân σ (như tham số bw_adjust của seaborn.kdeplot).
+            grid_step (float | None): Bước lưới trả về (bội của 1/scale); None → mọi bin.
+
+        Returns:
+            tuple: (lưới điểm, mật độ shape (*group_shape, len(lưới))); nhóm rỗng → NaN.
+        """
+        counts = self._counts.reshape(-1, self.n_bins).astype(np.float64)
+        scores = self.scores
+        n = counts.sum(axis=1)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            if bandwidth is None:
+                mean = counts @ scores / n
+                var = (counts * (scores[None, :] - mean[:, None]) ** 2).sum(axis=1) / (n - 1)
+                sigma = np.sqrt(var) * n ** (-0.2)
+            else:
+                sigma = np.full(len(n), float(bandwidth))
+        sigma_bins = np.nan_to_num(sigma * bw_adjust * self._scale, nan=0.0)
+
+        pad = int(np.ceil(4 * sigma_bins.max())) if len(sigma_bins) else 0
+        size = self.n_bins + pad
+        freqs = np.fft.rfftfreq(size)
+        transfer = np.exp(-2 * np.pi ** 2 * sigma_bins[:, None] ** 2 * freqs[None, :] ** 2)
+        smoothed = np.fft.irfft(np.fft.rfft(counts, size, axis=1) * transfer, size, axis=1)[:, :self.n_bins]
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            density = np.maximum(smoothed, 0) * self._scale / n[:, None]
+
+        step = 1 if grid_step is None else max(int(round(grid_step * self._scale)), 1)
+        return scores[::step], density[:, ::step].reshape(*self._counts.shape[:-1], -1)
+
+    # ==================== REPRESENTATION / UTILITIES ====================
+    def __repr__(self) -> str:
+        shape = " × ".join(f"{name}[{len(labels)}]" for name, labels in self._axes)
+        return f"<ScoreHistogram {shape} × bin[{self.n_bins}] total={int(self._counts.sum())}>"
+
+
+# ==================== THỐNG KÊ TRÊN PHÂN PHỐI CÓ TRỌNG SỐ ====================
+def _quantiles_from_counts(counts: np.ndarray, scores: np.ndarray, q: np.ndarray) -> np.ndarray:
+    """Phân vị (nội suy tuyến tính như pandas/numpy) từ counts 2D (nhóm × bin).
+
+    Vị trí h = (n - 1) * q trên dãy đã nhân bản; giá trị tại hạng r là bin đầu tiên
+    có số đếm cộng dồn > r → tìm bằng đếm số bin có cumsum <= r (không nhân bản dòng).
+
+    Returns:
+        np.ndarray: (nhóm × len(q)), NaN cho nhóm rỗng.
+    """
+    cum = np.cumsum(counts, axis=1)
+    n = cum[:, -1]
+    h = (n[:, None] - 1) * q[None, :]
+    lo_rank = np.floor(h)
+    hi_rank = np.minimum(lo_rank + 1, np.maximum(n[:, None] - 1, 0))
+
+    def value_at(rank: np.ndarray) -> np.ndarray:
+        idx = (cum[:, None, :] <= rank[:, :, None]).sum(axis=2)
+        return scores[np.minimum(idx, len(scores) - 1)]
+
+    lo, hi = value_at(lo_rank), value_at(hi_rank)
+    out = lo + (h - lo_rank) * (hi - lo)
+    out[n == 0] = np.nan
+    return out
+
+
+def weighted_quantile(values, weights, q) -> np.ndarray:
+    """Phân vị của phân phối (giá trị, tần suất) — bằng với quantile của dữ liệu đã nhân bản.
+
+    Args:
+        values (array-like): Giá trị điểm (không cần sắp xếp).
+        weights (array-like): Số thí sinh tương ứng.
+        q (float | array-like): Phân vị trong [0, 1].
+
+    Returns:
+        np.ndarray: Phân vị theo thứ tự q (NaN nếu tổng trọng số = 0).
+    """
+    values = np.asarray(values, dtype=float)
+    weights = np.asarray(weights, dtype=float)
+    order = np.argsort(values, kind="stable")
+    q = np.atleast_1d(np.asarray(q, dtype=float))
+    return _quantiles_from_counts(weights[order][None, :], values[order], q)[0]
+
+
+def describe_weighted(values, weights) -> dict | None:
+    """Thống kê mô tả (mean, median, mode, std, min, max) từ phân phối có trọng số.
+
+    Kết quả trùng với việc nhân bản mỗi giá trị theo tần suất rồi gọi
+    mean/median/mode/std/min/max của pandas, nhưng chỉ tốn O(số bin).
+
+    Args:
+        values (array-like): Giá trị điểm.
+        weights (array-like): Số thí sinh tương ứng.
+
+    Returns:
+        dict | None: {"mean", "median", "mode", "std", "min", "max"}; None nếu không có thí sinh.
+    """
+    values = np.asarray(values, dtype=float)
+    weights = np.asarray(weights, dtype=float)
+    keep = weights > 0
+    values, weights = values[keep], weights[keep]
+    n = weights.sum()
+    if n == 0:
+        return None
+
+    # Gộp các giá trị trùng (đồng thời sắp xếp tăng dần) để mode tính trên tổng tần suất
+    values, inverse = np.unique(values, return_inverse=True)
+    weights = np.bincount(inverse, weights=weights)
+
+    mean = float((values * weights).sum() / n)
+    std = float(np.sqrt((weights * (values - mean) ** 2).sum() / (n - 1))) if n > 1 else float("nan")
+    median = float(_quantiles_from_counts(weights[None, :], values, np.array([0.5]))[0, 0])
+    # argmax trả về vị trí đầu tiên → điểm nhỏ nhất trong các mode (như Series.mode().iloc[0])
+    mode = float(values[weights.argmax()])
+
+    return {
+        "mean": mean,
+        "median": median,
+        "mode": mode,
+        "std": std,
+        "min": float(values[0]),
+        "max": float(values[-1]),
+    }
+
+
+# ==================== ENGINE: XÂY HISTOGRAM TỪ SCORESTORE ====================
+def build_subject_histogram(store: ScoreStore,
+                            subjects: list[str] | None = None,
+                            count_keys=np.bincount) -> ScoreHistogram:
+    """Đếm phân phối điểm của mọi (năm, môn) trong MỘT lần bincount.
+
+    Mỗi ô có điểm trong store được mã hoá thành khoá
+    (chỉ số năm * số môn + chỉ số môn) * n_bins + mã điểm, rồi đếm một lần.
+
+    Args:
+        store (ScoreStore): Dữ liệu điểm dạng nén cột.
+        subjects (list[str] | None): Môn cần giữ và thứ tự trục môn. None → toàn bộ môn trong store.
+        count_keys (callable): Hàm đếm khoá (keys, minlength) → số đếm, vd ComputeBackend.count_keys.
+
+    Returns:
+        ScoreHistogram: Trục ('nam_hoc', 'mon_hoc') × bin điểm (0..10, bước 0.01).
+    """
+    subjects = store.subjects if subjects is None else list(subjects)
+    missing = [s for s in subjects if s not in store.subjects]
+    if missing:
+        raise KeyError(f"Môn không có trong ScoreStore: {missing}")
+
+    n_bins = MAX_SCORE_CODE + 1
+    years, year_idx = np.unique(store.years, return_inverse=True)
+
+    # Chỉ số môn (theo thứ tự yêu cầu) cho từng ô có điểm; -1 = môn không được chọn
+    position = np.full(len(store.subjects), -1, dtype=np.int64)
+    for k, subject in enumerate(subjects):
+        position[store.subject_index(subject)] = k
+    cell_subject = np.repeat(position, np.diff(store.indptr))
+    keep = cell_subject >= 0
+    if not keep.all():
+        cell_subject = cell_subject[keep]
+        rows, codes = store.indices[keep], store.codes[keep]
+    else:
+        rows, codes = store.indices, store.codes
+
+    keys = (year_idx[rows] * len(subjects) + cell_subject) * n_bins + codes
+    counts = count_keys(keys, minlength=len(years) * len(subjects) * n_bins)
+
+    return ScoreHistogram(
+        counts.reshape(len(years), len(subjects), n_bins),
+        [("nam_hoc", years.astype(np.int64)), ("mon_hoc", np.asarray(subjects, dtype=object))],
+    )
+
+
+def _block_subject_sets(store: ScoreStore,
+                        blocks: dict[str, list[str]]) -> tuple[list[str], np.ndarray, np.ndarray, int]:
+    """Chuẩn bị bitmask cho các khối: bỏ môn không có trong store, gộp khối trùng tập môn.
+
+    Returns:
+        tuple: (tên khối còn môn, mask duy nhất (uint16), chỉ số mask của từng khối, số môn tối đa).
+    """
+    names, masks, widths = [], [], []
+    for name, subjects in blocks.items():
+        valid = {s for s in subjects if s in store.subjects}
+        if not valid:
+            continue
+        names.append(name)
+        masks.append(sum(1 << store.subject_index(s) for s in valid))
+        widths.append(len(valid))
+
+    unique_masks, block_to_unique = np.unique(np.asarray(masks, dtype=np.uint16), return_inverse=True)
+    return names, unique_masks, block_to_unique, max(widths, default=0)
+
+
+def _iter_block_matrix(store: ScoreStore, unique_masks: np.ndarray, chunk_size: int):
+    """Duyệt theo đoạn dòng: trả về (dòng đầu đoạn, tổng mã điểm, cờ đủ môn) dạng dày (dòng × tập môn).
+
+    Tổng điểm mọi khối = ma trận điểm @ ma trận 0/1 (môn × tập môn); thí sinh đủ môn
+    ⇔ (presence & mask) == mask — một phép AND cho tất cả khối. Bộ nhớ tạm tỉ lệ với
+    chunk_size × số tập môn.
+    """
+    if len(unique_masks) == 0:
+        return
+    bits = 1 << np.arange(len(store.subjects))
+    selector = ((unique_masks[None, :] & bits[:, None]) != 0).astype(np.int32)   # môn × tập môn
+    presence = store.presence_mask()
+
+    for start in range(0, store.n_rows, chunk_size):
+        stop = min(start + chunk_size, store.n_rows)
+        codes = store.to_dense(start=start, stop=stop)
+        totals = np.maximum(codes, 0).astype(np.int32) @ selector                   # dòng × tập môn
+        eligible = (presence[start:stop, None] & unique_masks[None, :]) == unique_masks
+        yield start, totals, eligible
+
+
+def _iter_block_totals(store: ScoreStore, unique_masks: np.ndarray, chunk_size: int):
+    """Như _iter_block_matrix nhưng dạng thưa: (dòng, chỉ số tập môn, tổng mã điểm) của các cặp đủ môn."""
+    for start, totals, eligible in _iter_block_matrix(store, unique_masks, chunk_size):
+        r, u = np.nonzero(eligible)
+        yield start + r, u, totals[r, u]
+
+
+def build_block_histogram(store: ScoreStore,
+                          blocks: dict[str, list[str]],
+                          chunk_size: int = 1 << 16,
+                          program_codes: np.ndarray | None = None,
+                          count_keys=np.bincount) -> ScoreHistogram:
+    """Phân phối tổng điểm của NHIỀU khối thi theo năm trong các lượt vector hoá theo đoạn.
+
+    Mô tả:
+        - Môn không có trong store bị bỏ khỏi khối (như cách lọc `valid_subjects` cũ);
+          khối không còn môn nào bị loại khỏi kết quả.
+        - Mỗi khối ↔ một bitmask môn; thí sinh đủ môn ⇔ (presence & mask) == mask.
+        - Các khối có cùng tập môn (vd. X63/X66) chỉ được tính một lần.
+        - Mỗi đoạn dòng: giải nén mã điểm, tổng điểm mọi khối = ma trận điểm @ ma trận 0/1
+          (môn × khối), rồi đếm bằng một lần bincount trên khoá (khối, năm, tổng).
+
+    Args:
+        store (ScoreStore): Dữ liệu điểm dạng nén cột.
+        blocks (dict[str, list[str]]): {tên khối: danh sách môn}; giữ nguyên thứ tự khối.
+        chunk_size (int): Số dòng mỗi đoạn (giới hạn bộ nhớ tạm).
+        program_codes (np.ndarray | None): Mã chương trình theo dòng (chỉ số trong PROGRAMS);
+            có → thêm trục 'chuong_trinh' sau 'nam_hoc'.
+        count_keys (callable): Hàm đếm khoá (keys, minlength) → số đếm, vd ComputeBackend.count_keys.
+
+    Returns:
+        ScoreHistogram: Trục ('khoi', 'nam_hoc'[, 'chuong_trinh']) × bin tổng điểm (bước 0.01).
+    """
+    names, unique_masks, block_to_unique, width = _block_subject_sets(store, blocks)
+    years, year_idx = np.unique(store.years, return_inverse=True)
+    n_bins = width * MAX_SCORE_CODE + 1
+
+    # Nhóm theo dòng: năm, hoặc (năm, chương trình)
+    n_programs = 1 if program_codes is None else len(PROGRAMS)
+    row_group = year_idx if program_codes is None else year_idx * n_programs + np.asarray(program_codes, dtype=np.int64)
+    n_row_groups = len(years) * n_programs
+
+    n_groups = len(unique_masks) * n_row_groups
+    counts = np.zeros(n_groups * n_bins, dtype=np.int64)
+    for rows, u, totals in _iter_block_totals(store, unique_masks, chunk_size):
+        keys = (u * n_row_groups + row_group[rows]) * n_bins + totals
+        counts += count_keys(keys, minlength=n_groups * n_bins)
+
+    axes = [("khoi", np.asarray(names, dtype=object)), ("nam_hoc", years.astype(np.int64))]
+    shape = [len(unique_masks), len(years)]
+    if program_codes is not None:
+        axes.append(("chuong_trinh", np.asarray(PROGRAMS, dtype=object)))
+        shape.append(n_programs)
+    counts = counts.reshape(*shape, n_bins)[block_to_unique]
+    return ScoreHistogram(counts, axes)
+
+
+def count_block_totals_by_province(store: ScoreStore,
+                                   blocks: dict[str, list[str]],
+                                   chunk_size: int = 1 << 16) -> pd.DataFrame:
+    """Phân phối tổng điểm khối theo (khối, năm, mã tỉnh) dạng thưa (chỉ các ô có thí sinh).
+
+    Bản dày (khối × năm × tỉnh × bin) quá lớn (~1 GB) nên mỗi đoạn chỉ giữ các khoá
+    xuất hiện (np.unique), cuối cùng gộp các đoạn lại.
+
+    Returns:
+        pd.DataFrame: Cột ['khoi', 'nam_hoc', 'ma_tinh', 'tong_diem', 'so_hoc_sinh'],
+        sắp theo khoi, nam_hoc, ma_tinh, tong_diem.
+    """
+    names, unique_masks, block_to_unique, width = _block_subject_sets(store, blocks)
+    years, year_idx = np.unique(store.years, return_inverse=True)
+    provinces, prov_idx = np.unique(store.province_codes, return_inverse=True)
+    n_bins = width * MAX_SCORE_CODE + 1
+
+    key_parts, count_parts = [], []
+    for rows, u, totals in _iter_block_totals(store, unique_masks, chunk_size):
+        keys = ((u * len(years) + year_idx[rows]) * len(provinces) + prov_idx[rows]) * n_bins + totals
+        uniq, cnt = np.unique(keys, return_counts=True)
+        key_parts.append(uniq)
+        count_parts.append(cnt)
+
+    if key_parts:
+        keys, inverse = np.unique(np.concatenate(key_parts), return_inverse=True)
+        counts = np.bincount(inverse, weights=np.concatenate(count_parts)).astype(np.int64)
+    else:
+        keys, counts = np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+    group, code = np.divmod(keys, n_bins)
+    group, p = np.divmod(group, len(provinces))
+    u, y = np.divmod(group, len(years))
+
+    # Mở rộng tập môn duy nhất → từng khối (khối trùng tập môn dùng chung số đếm)
+    frames = []
+    for b, name in enumerate(names):
+        hit = u == block_to_unique[b]
+        frames.append(pd.DataFrame({
+            "khoi": name,
+            "nam_hoc": years[y[hit]].astype(np.int64),
+            "ma_tinh": provinces[p[hit]].astype(np.int64),
+            "tong_diem": code[hit] / SCORE_SCALE,
+            "so_hoc_sinh": counts[hit],
+        }))
+    if not frames:
+        return pd.DataFrame(columns=["khoi", "nam_hoc", "ma_tinh", "tong_diem", "so_hoc_sinh"])
+    return (
+        pd.concat(frames, ignore_index=True)
+        .sort_values(["khoi", "nam_hoc", "ma_tinh", "tong_diem"], kind="stable")
+        .reset_index(drop=True)
+    )
+
+
+def best_block_totals(store: ScoreStore,
+                      blocks: dict[str, list[str]],
+                      n_subjects: int = 3,
+                      chunk_size: int = 1 << 16) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Khối có tổng điểm cao nhất của từng thí sinh, trên các khối thí sinh thi đủ môn.
+
+    Mô tả:
+        - Chỉ xét khối còn đủ `n_subjects` môn hợp lệ sau khi lọc môn không có trong store
+          (vd. B08, D07 bị viết sai tên môn → còn 2 môn → không so được với khối 3 môn).
+        - Mỗi đoạn dòng: ma trận tổng (dòng × khối) như build_block_histogram, khối thiếu môn
+          gán -1, rồi argmax theo hàng — không có vòng lặp Python theo thí sinh / khối.
+        - Hoà điểm → khối đứng trước trong `blocks`; khối trùng tập môn (vd. X63/X66) → tên đầu tiên.
+
+    Args:
+        store (ScoreStore): Dữ liệu điểm dạng nén cột.
+        blocks (dict[str, list[str]]): {tên khối: danh sách môn}.
+        n_subjects (int): Số môn hợp lệ bắt buộc của một khối.
+        chunk_size (int): Số dòng mỗi đoạn (giới hạn bộ nhớ tạm).
+
+    Returns:
+        tuple: (mã tổng điểm cao nhất int16, chỉ số khối int16, tên khối np.ndarray);
+        thí sinh không đủ môn khối nào → -1 ở cả hai mảng.
+    """
+    full = {
+        name: subjects for name, subjects in blocks.items()
+        if len({s for s in subjects if s in store.subjects}) == n_subjects
+    }
+    names, unique_masks, block_to_unique, _ = _block_subject_sets(store, full)
+
+    # Xếp tập môn theo thứ tự xuất hiện đầu tiên trong `blocks` → argmax ưu tiên khối đứng trước
+    first_block = np.full(len(unique_masks), len(names), dtype=np.int64)
+    np.minimum.at(first_block, block_to_unique, np.arange(len(names)))
+    order = np.argsort(first_block, kind="stable")
+    unique_masks, first_block = unique_masks[order], first_block[order]
+
+    best_total = np.full(store.n_rows, -1, dtype=np.int16)
+    best_block = np.full(store.n_rows, -1, dtype=np.int16)
+    for start, totals, eligible in _iter_block_matrix(store, unique_masks, chunk_size):
+        totals = np.where(eligible, totals, -1)
+        u = totals.argmax(axis=1)
+        top = totals[np.arange(len(u)), u]
+        stop = start + len(u)
+        best_total[start:stop] = top
+        best_block[start:stop] = np.where(top >= 0, first_block[u], -1)
+
+    return best_total, best_block, np.asarray(names, dtype=object)
+
+
+def build_best_block_histogram(store: ScoreStore,
+                               best_total: np.ndarray,
+                               n_subjects: int = 3) -> ScoreHistogram:
+    """Phân phối toàn quốc của tổng điểm khối cao nhất theo năm (bỏ thí sinh không đủ khối nào).
+
+    Returns:
+        ScoreHistogram: Trục ('nam_hoc',) × bin tổng điểm (bước 0.01).
+    """
+    years, year_idx = np.unique(store.years, return_inverse=True)
+    n_bins = n_subjects * MAX_SCORE_CODE + 1
+    has_block = best_total >= 0
+    keys = year_idx[has_block] * n_bins + best_total[has_block]
+    counts = np.bincount(keys, minlength=len(years) * n_bins).reshape(len(years), n_bins)
+    return ScoreHistogram(counts, [("nam_hoc", years.astype(np.int64))])
+
+
+def build_joint_histograms(store: ScoreStore,
+                           rows: np.ndarray | None = None,
+                           bin_width: float = 0.25,
+                           subjects: list[str] | None = None,
+                           chunk_size: int = 1 << 15) -> tuple[np.ndarray, np.ndarray]:
+    """Histogram 2 chiều cho MỌI cặp môn (i < j) trong một lượt bincount theo đoạn.
+
+    Mỗi đoạn dòng: mã điểm → chỉ số bin (mã // độ rộng bin), khoá
+    (cặp, bin_i, bin_j) cho mọi cặp có điểm cả hai môn, rồi một lần bincount.
+    Bin k chứa điểm trong [k·w, (k+1)·w); bin cuối chứa điểm tối đa.
+
+    Args:
+        store (ScoreStore): Dữ liệu điểm dạng nén cột.
+        rows (np.ndarray | None): Chỉ số dòng cần đếm (vd. một năm / một tỉnh); None → mọi dòng.
+        bin_width (float): Độ rộng bin (bội của 0.01), vd 0.25 → 41 bin cho thang 10.
+        subjects (list[str] | None): Các môn tham gia ghép cặp; None → mọi môn của store.
+        chunk_size (int): Số dòng mỗi đoạn.
+
+    Returns:
+        tuple: (các cặp chỉ số trong `subjects` shape (P, 2), số đếm shape (P, B, B) với B = số bin).
+    """
+    width = int(round(bin_width * SCORE_SCALE))
+    if width < 1 or not np.isclose(width, bin_width * SCORE_SCALE):
+        raise ValueError("bin_width phải là bội dương của 0.01.")
+    n_bins = MAX_SCORE_CODE // width + 1
+    subjects = store.subjects if subjects is None else list(subjects)
+    pairs = np.stack(np.triu_indices(len(subjects), k=1), axis=1)
+    n_cells = len(pairs) * n_bins * n_bins
+
+    rows = np.arange(store.n_rows) if rows is None else np.sort(np.asarray(rows, dtype=np.int64))
+    counts = np.zeros(n_cells, dtype=np.int64)
+    if len(rows) == 0:
+        return pairs, counts.reshape(len(pairs), n_bins, n_bins)
+
+    # Duyệt theo đoạn dòng liên tiếp của store (bộ nhớ tạm ~ chunk_size × số môn), chỉ giữ dòng được chọn
+    for start in range(int(rows[0]), int(rows[-1]) + 1, chunk_size):
+        lo, hi = np.searchsorted(rows, [start, start + chunk_size])
+        if lo == hi:
+            continue
+        codes = store.to_dense(subjects, start=start, stop=start + chunk_size)[rows[lo:hi] - start]
+        bins = np.where(codes >= 0, codes // width, -1).astype(np.int64)
+        left, right = bins[:, pairs[:, 0]], bins[:, pairs[:, 1]]           # dòng × cặp
+        both = (left >= 0) & (right >= 0)
+        pair_idx = np.broadcast_to(np.arange(len(pairs)), both.shape)[both]
+        keys = (pair_idx * n_bins + left[both]) * n_bins + right[both]
+        counts += np.bincount(keys, minlength=n_cells)
+
+    return pairs, counts.reshape(len(pairs), n_bins, n_bins)
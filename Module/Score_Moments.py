@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from Module.Score_Store import ScoreStore, SCORE_SCALE
+
+
+class PairwiseMoments:
+    """Thống kê đủ (sufficient statistics) theo cặp môn cho tương quan / hiệp phương sai.
+
+    Mô tả:
+        - Với mỗi nhóm (năm, mã tỉnh) và mỗi cặp môn (i, j), chỉ tính trên các thí sinh
+          có điểm CẢ HAI môn (pairwise-complete, như DataFrame.corr/cov của pandas):
+            n[i, j]      : số thí sinh,
+            sum[i, j]    : tổng điểm môn i,
+            sum_sq[i, j] : tổng bình phương điểm môn i,
+            cross[i, j]  : tổng tích điểm môn i × môn j.
+        - Lưu bằng mã điểm nguyên (int64) → cộng dồn chính xác, không sai số thực.
+        - Các thống kê cộng được → cộng trục tỉnh ra số liệu toàn quốc mà không quét lại.
+
+    Attributes (public API):
+        subjects   (list[str]): Thứ tự môn của hai trục ma trận.
+        axis_names (list[str]): Tên các trục nhóm (mặc định ['nam_hoc', 'ma_tinh']).
+        n          (np.ndarray): Số thí sinh theo cặp, shape (*group_shape, S, S).
+    """
+
+    # ==================== INTERNAL PRIVATE MEMBERS ====================
+    __slots__ = (
+        "_subjects",      # danh sách môn (thứ tự trục ma trận)
+        "_axes",          # list[(tên trục, nhãn np.ndarray)]
+        "_n",             # số thí sinh có điểm cả 2 môn
+        "_sum",           # tổng mã điểm môn i trên các cặp đủ
+        "_sum_sq",        # tổng bình phương mã điểm môn i trên các cặp đủ
+        "_cross",         # tổng tích mã điểm i × j
+    )
+
+    # -------------------- CONSTRUCTOR --------------------
+    def __init__(self,
+                 subjects: list[str],
+                 axes: list[tuple[str, list | np.ndarray]],
+                 n: np.ndarray,
+                 sums: np.ndarray,
+                 sum_sq: np.ndarray,
+                 cross: np.ndarray) -> None:
+        shape = n.shape
+        if shape[-2:] != (len(subjects), len(subjects)) or len(shape) != len(axes) + 2:
+            raise ValueError("Các mảng thống kê phải có shape (*group_shape, S, S).")
+        if not (sums.shape == sum_sq.shape == cross.shape == shape):
+            raise ValueError("n, sums, sum_sq, cross phải cùng shape.")
+        self._subjects = list(subjects)
+        self._axes = [(name, np.asarray(labels)) for name, labels in axes]
+        self._n, self._sum, self._sum_sq, self._cross = n, sums, sum_sq, cross
+        # Chỉ đọc: bộ thống kê được cache và dùng chung giữa các lời gọi
+        for arr in (self._n, self._sum, self._sum_sq, self._cross, *(labels for _, labels in self._axes)):
+            arr.setflags(write=False)
+
+    # -------------------- GETTER (read-only) --------------------
+    @property
+    def subjects(self) -> list[str]:
+        return list(self._subjects)
+
+    @property
+    def axis_names(self) -> list[str]:
+        return [name for name, _ in self._axes]
+
+    @property
+    def n(self) -> np.ndarray:
+        return self._n
+
+    @property
+    def nbytes(self) -> int:
+        return int(self._n.nbytes + self._sum.nbytes + self._sum_sq.nbytes + self._cross.nbytes)
+
+    # ==================== INTERNAL PRIVATE METHODS ====================
+    def _axis_position(self, name: str) -> int:
+        for dim, (axis_name, _) in enumerate(self._axes):
+            if axis_name == name:
+                return dim
+        raise KeyError(f"PairwiseMoments không có trục '{name}'. Các trục: {self.axis_names}")
+
+    def _map(self, func) -> tuple[np.ndarray, ...]:
+        """Áp cùng một phép biến đổi mảng cho cả 4 thống kê."""
+        return func(self._n), func(self._sum), func(self._sum_sq), func(self._cross)
+
+    # ==================== PUBLIC METHODS (API) ====================
+    def labels(self, name: str) -> np.ndarray:
+        """Nhãn của một trục nhóm."""
+        return self._axes[self._axis_position(name)][1]
+
+    def select(self, **selection) -> "PairwiseMoments":
+        """Lấy lát cắt theo nhãn: nhãn đơn → bỏ trục, danh sách nhãn → giữ trục.
+
+        Raises:
+            KeyError: Khi trục hoặc nhãn không tồn tại.
+        """
+        result = self
+        for name, wanted in selection.items():
+            dim = result._axis_position(name)
+            labels = result._axes[dim][1]
+            single = np.ndim(wanted) == 0
+            positions = []
+            for label in ([wanted] if single else list(wanted)):
+                hits = np.flatnonzero(labels == label)
+                if len(hits) == 0:
+                    raise KeyError(f"Trục '{name}' không có nhãn {label!r}.")
+                positions.append(int(hits[0]))
+
+            axes = list(result._axes)
+            if single:
+                arrays = result._map(lambda a: np.take(a, positions[0], axis=dim))
+                axes.pop(dim)
+            else:
+                arrays = result._map(lambda a: np.take(a, positions, axis=dim))
+                axes[dim] = (name, labels[positions])
+            result = PairwiseMoments(result._subjects, axes, *arrays)
+        return result
+
+    def rollup(self, *names: str) -> "PairwiseMoments":
+        """Cộng dồn (bỏ) các trục đã cho, vd: rollup('ma_tinh') → toàn quốc theo năm."""
+        dims = tuple(sorted(self._axis_position(n) for n in names))
+        if not dims:
+            return self
+        arrays = self._map(lambda a: a.sum(axis=dims))
+        axes = [axis for dim, axis in enumerate(self._axes) if dim not in dims]
+        return PairwiseMoments(self._subjects, axes, *arrays)
+
+    def merge(self, other: "PairwiseMoments") -> "PairwiseMoments":
+        """Cộng thống kê của một partition mới (cùng thứ tự môn, cùng trục nhóm).
+
+        Nhãn mỗi trục là hợp hai bên (trục nhãn số sắp tăng dần như khi dựng từ đầu).
+
+        Raises:
+            ValueError: Khi khác danh sách môn hoặc khác tên trục.
+        """
+        if self._subjects != other._subjects or self.axis_names != other.axis_names:
+            raise ValueError("Chỉ cộng được thống kê cùng danh sách môn và cùng trục.")
+
+        axes = []
+        for (name, labels), (_, extra) in zip(self._axes, other._axes):
+            merged = np.concatenate([labels, extra[~np.isin(extra, labels)]])
+            if merged.dtype.kind in "iu":
+                merged = np.sort(merged)
+            axes.append((name, merged))
+
+        n_subjects = len(self._subjects)
+        shape = (*(len(labels) for _, labels in axes), n_subjects, n_subjects)
+        arrays = [np.zeros(shape, dtype=np.int64) for _ in range(4)]
+        for moments in (self, other):
+            positions = []
+            for (_, labels), (_, own) in zip(axes, moments._axes):
+                lookup = {label: k for k, label in enumerate(labels.tolist())}
+                positions.append([lookup[label] for label in own.tolist()])
+            index = np.ix_(*positions, np.arange(n_subjects), np.arange(n_subjects))
+            for target, source in zip(arrays, moments._map(lambda a: a)):
+                target[index] += source
+        return PairwiseMoments(self._subjects, axes, *arrays)
+
+    def covariance(self, min_periods: int = 2) -> np.ndarray:
+        """Ma trận hiệp phương sai (ddof=1, đơn vị điểm²) cho mọi nhóm.
+
+        Returns:
+            np.ndarray: shape (*group_shape, S, S); NaN khi số cặp < min_periods.
+        """
+        n = self._n.astype(np.float64)
+        sum_i = self._sum.astype(np.float64)
+        sum_j = np.swapaxes(sum_i, -1, -2)          # tổng môn j trên cùng tập cặp (i, j)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cov = (self._cross - sum_i * sum_j / n) / (n - 1)
+        cov[n < max(min_periods, 2)] = np.nan
+        return cov / SCORE_SCALE ** 2
+
+    def correlation(self, min_periods: int = 1) -> np.ndarray:
+        """Ma trận tương quan Pearson (pairwise-complete) cho mọi nhóm.
+
+        Phương sai của môn i và j được tính trên CÙNG tập thí sinh của cặp (như pandas).
+
+        Returns:
+            np.ndarray: shape (*group_shape, S, S); NaN khi không đủ dữ liệu / phương sai 0.
+        """
+        n = self._n.astype(np.float64)
+        sum_i = self._sum.astype(np.float64)
+        sum_j = np.swapaxes(sum_i, -1, -2)
+        sq_i = self._sum_sq.astype(np.float64)
+        sq_j = np.swapaxes(sq_i, -1, -2)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cov = self._cross - sum_i * sum_j / n
+            var_i = sq_i - sum_i ** 2 / n
+            var_j = sq_j - sum_j ** 2 / n
+            corr = cov / np.sqrt(var_i * var_j)
+        corr[n < max(min_periods, 1)] = np.nan
+        return np.clip(corr, -1.0, 1.0)
+
+    def to_frame(self, matrix: np.ndarray) -> pd.DataFrame:
+        """Gắn nhãn môn cho một ma trận (S, S) (vd: kết quả sau khi select hết các trục nhóm)."""
+        return pd.DataFrame(matrix, index=self._subjects, columns=self._subjects)
+
+    # ==================== REPRESENTATION / UTILITIES ====================
+    def __repr__(self) -> str:
+        shape = " × ".join(f"{n}[{len(l)}]" for n, l in self._axes)
+        return f"<PairwiseMoments {shape} × subjects[{len(self._subjects)}]>"
+
+
+def build_pairwise_moments(store: ScoreStore, chunk_size: int = 8192) -> PairwiseMoments:
+    """Một lượt duy nhất qua ScoreStore → thống kê cặp môn cho mọi (năm, mã tỉnh).
+
+    Mỗi đoạn dòng: giải nén mã điểm (X, 0 nếu vắng) và cờ có điểm (M), tính tích ngoài
+    theo dòng (M_i M_j, X_i M_j, X_i² M_j, X_i X_j) rồi cộng theo nhóm bằng np.add.reduceat.
+    Bộ nhớ tạm tỉ lệ với chunk_size × S².
+
+    Args:
+        store (ScoreStore): Dữ liệu điểm dạng nén cột.
+        chunk_size (int): Số dòng mỗi đoạn.
+
+    Returns:
+        PairwiseMoments: Trục ('nam_hoc', 'ma_tinh') × (môn × môn).
+    """
+    n_subjects = len(store.subjects)
+    years, year_idx = np.unique(store.years, return_inverse=True)
+    provinces, prov_idx = np.unique(store.province_codes, return_inverse=True)
+    group = year_idx * len(provinces) + prov_idx
+    n_groups = len(years) * len(provinces)
+
+    stats = np.zeros((4, n_groups, n_subjects, n_subjects), dtype=np.int64)
+    for start in range(0, store.n_rows, chunk_size):
+        stop = min(start + chunk_size, store.n_rows)
+        codes = store.to_dense(start=start, stop=stop).astype(np.int64)
+        present = (codes >= 0).astype(np.int64)
+        x = codes * present
+
+        # Gom dòng theo nhóm trong đoạn để cộng bằng reduceat
+        order = np.argsort(group[start:stop], kind="stable")
+        g_sorted = group[start:stop][order]
+        bounds = np.flatnonzero(np.r_[True, g_sorted[1:] != g_sorted[:-1]])
+        x, present = x[order], present[order]
+
+        for k, (left, right) in enumerate(((present, present), (x, present), (x * x, present), (x, x))):
+            outer = left[:, :, None] * right[:, None, :]
+            stats[k, g_sorted[bounds]] += np.add.reduceat(outer, bounds, axis=0)
+
+    shape = (len(years), len(provinces), n_subjects, n_subjects)
+    return PairwiseMoments(
+        store.subjects,
+        [("nam_hoc", years.astype(np.int64)), ("ma_tinh", provinces.astype(np.int64))],
+        *(stats[k].reshape(shape) for k in range(4)),
+    )
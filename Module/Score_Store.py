@@ -0,0 +1,346 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+
+# ================== CẤU HÌNH MÃ HOÁ ĐIỂM ==================
+# Danh sách môn theo Target Schema của DataProcessor.
+# Thứ tự này cố định: chỉ số môn trong store (cột CSC) dùng lại ở mọi engine phía sau.
+SCORE_SUBJECTS = [
+    "toan", "ngu_van", "ngoai_ngu", "vat_li", "hoa_hoc", "sinh_hoc",
+    "lich_su", "dia_li", "gdcd", "tin_hoc", "cn_cong_nghiep", "cn_nong_nghiep",
+]
+# Chương trình giáo dục: mã 0/1 ↔ nhãn (2018–2024 và 2025 CT cũ là CT2006)
+PROGRAMS = ["CT2006", "CT2018"]
+# Điểm thi luôn nằm trên lưới 0.01 → mã hoá thành số nguyên: code = điểm * 100
+SCORE_SCALE = 100
+# Điểm tối đa của một môn (10.0) sau khi mã hoá
+MAX_SCORE_CODE = 10 * SCORE_SCALE
+# Giá trị đánh dấu "không dự thi" khi giải nén ra ma trận dày
+MISSING_CODE = -1
+# Mã tỉnh là 2 chữ số đầu của SBD → 00..99 (-1 nếu không hợp lệ)
+N_PROVINCE_CODES = 100
+
+
+class ScoreStore:
+    """Lưu điểm thi theo dạng nén cột (CSC) thay cho ma trận float64 dày.
+
+    Mô tả:
+        - Mỗi môn chỉ lưu các thí sinh CÓ điểm: cặp (chỉ số dòng, mã điểm).
+        - Các môn gần như toàn NaN (tin_hoc, cn_*) chỉ tốn bộ nhớ cho vài dòng năm 2025.
+        - Mã điểm là int16 (điểm * 100), chỉ số dòng là int32 → 6 byte/ô có điểm,
+          thay vì 8 byte cho MỌI ô (kể cả NaN) ở dạng dày.
+        - Chỉ số dòng khớp với vị trí dòng trong combined_data của DataProcessor.
+
+    Bố cục CSC:
+        indptr[j] : indptr[j + 1]  → đoạn của môn thứ j trong `indices` / `codes`.
+        indices                    → chỉ số dòng (tăng dần trong từng môn).
+        codes                      → mã điểm tương ứng.
+
+    Attributes (public API):
+        subjects       (list[str]) : Danh sách môn (thứ tự cột CSC).
+        n_rows         (int)       : Số dòng (thí sinh) của dữ liệu gốc.
+        years          (np.ndarray): Năm học của từng dòng (int16).
+        province_codes (np.ndarray): Mã tỉnh cũ (2 ký tự đầu SBD) của từng dòng, -1 nếu không hợp lệ.
+        indptr         (np.ndarray): Con trỏ đầu/cuối đoạn của từng môn (int64).
+        indices        (np.ndarray): Chỉ số dòng có điểm (int32).
+        codes          (np.ndarray): Mã điểm (int16).
+    """
+
+    # ==================== INTERNAL PRIVATE MEMBERS ====================
+    __slots__ = (
+        "_subjects",          # danh sách môn (thứ tự cột)
+        "_n_rows",            # số dòng của dữ liệu gốc
+        "_years",             # năm học theo dòng
+        "_province_codes",    # mã tỉnh cũ theo dòng
+        "_indptr",            # con trỏ CSC
+        "_indices",           # chỉ số dòng có điểm
+        "_codes",             # mã điểm
+        "_province_order",    # hoán vị dòng sắp theo mã tỉnh (xây lười)
+        "_province_offsets",  # ranh giới đoạn của từng mã tỉnh trong _province_order
+    )
+
+    # -------------------- CONSTRUCTOR --------------------
+    def __init__(self,
+                 subjects: list[str],
+                 years: np.ndarray,
+                 province_codes: np.ndarray,
+                 indptr: np.ndarray,
+                 indices: np.ndarray,
+                 codes: np.ndarray) -> None:
+        """Khởi tạo store từ các mảng CSC đã có sẵn (không copy).
+
+        Args:
+            subjects (list[str]): Danh sách môn theo thứ tự cột.
+            years (np.ndarray): Năm học theo dòng.
+            province_codes (np.ndarray): Mã tỉnh cũ theo dòng.
+            indptr (np.ndarray): Con trỏ CSC, độ dài len(subjects) + 1.
+            indices (np.ndarray): Chỉ số dòng có điểm.
+            codes (np.ndarray): Mã điểm tương ứng với indices.
+
+        Raises:
+            ValueError: Khi kích thước các mảng không khớp nhau.
+        """
+        if len(indptr) != len(subjects) + 1:
+            raise ValueError("indptr phải có độ dài len(subjects) + 1.")
+        if len(indices) != len(codes) or int(indptr[-1]) != len(codes):
+            raise ValueError("indices/codes không khớp với indptr.")
+        if len(years) != len(province_codes):
+            raise ValueError("years và province_codes phải cùng số dòng.")
+
+        self._subjects = list(subjects)
+        self._n_rows = int(len(years))
+        self._years = years
+        self._province_codes = province_codes
+        self._indptr = indptr
+        self._indices = indices
+        self._codes = codes
+        self._province_order = None
+        self._province_offsets = None
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, subjects: list[str] | None = None) -> "ScoreStore":
+        """Nén DataFrame dạng rộng (combined_data) thành ScoreStore.
+
+        Args:
+            df (pd.DataFrame): Dữ liệu đã xử lý, có 'sbd', 'nam_hoc' và các cột điểm.
+            subjects (list[str] | None): Các môn cần nén. None → SCORE_SUBJECTS có trong df.
+
+        Returns:
+            ScoreStore: Store dạng nén cột.
+
+        Raises:
+            ValueError: Khi thiếu cột 'sbd'/'nam_hoc' hoặc có điểm không nằm trên lưới 0.01.
+        """
+        for col in ("sbd", "nam_hoc"):
+            if col not in df.columns:
+                raise ValueError(f"Thiếu cột '{col}' để xây dựng ScoreStore.")
+
+        if subjects is None:
+            subjects = [s for s in SCORE_SUBJECTS if s in df.columns]
+
+        # Năm học + mã tỉnh (2 ký tự đầu SBD sau khi zfill(8), giống Analysis/Export)
+        years = df["nam_hoc"].to_numpy(dtype=np.int16)
+        ma_tinh = pd.to_numeric(
+            df["sbd"].astype(str).str.zfill(8).str[:2], errors="coerce"
+        )
+        province_codes = ma_tinh.fillna(-1).to_numpy(dtype=np.int8)
+
+        # Nén từng môn: chỉ giữ các dòng có điểm
+        indptr = np.zeros(len(subjects) + 1, dtype=np.int64)
+        indices_parts, codes_parts = [], []
+        for j, subject in enumerate(subjects):
+            values = pd.to_numeric(df[subject], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+            rows = np.flatnonzero(~np.isnan(values))
+            scaled = values[rows] * SCORE_SCALE
+            codes = np.rint(scaled)
+
+            # Điểm lệch lưới 0.01 sẽ bị làm tròn âm thầm → báo lỗi rõ ràng
+            off_grid = np.abs(scaled - codes) > 1e-6
+            if off_grid.any():
+                raise ValueError(
+                    f"Cột '{subject}' có {int(off_grid.sum())} giá trị không nằm trên lưới "
+                    f"{1 / SCORE_SCALE}. Ví dụ: {values[rows[off_grid]][:5].tolist()}"
+                )
+
+            indices_parts.append(rows.astype(np.int32))
+            codes_parts.append(codes.astype(np.int16))
+            indptr[j + 1] = indptr[j] + len(rows)
+
+        indices = np.concatenate(indices_parts) if indices_parts else np.empty(0, dtype=np.int32)
+        codes = np.concatenate(codes_parts) if codes_parts else np.empty(0, dtype=np.int16)
+        return cls(subjects, years, province_codes, indptr, indices, codes)
+
+    # -------------------- GETTER (read-only) --------------------
+    @property
+    def subjects(self) -> list[str]:
+        """Danh sách môn theo thứ tự cột CSC."""
+        return list(self._subjects)
+
+    @property
+    def n_rows(self) -> int:
+        """Số dòng (thí sinh) của dữ liệu gốc."""
+        return self._n_rows
+
+    @property
+    def years(self) -> np.ndarray:
+        """Năm học theo dòng (int16)."""
+        return self._years
+
+    @property
+    def province_codes(self) -> np.ndarray:
+        """Mã tỉnh cũ theo dòng (int8, -1 nếu SBD không hợp lệ)."""
+        return self._province_codes
+
+    @property
+    def indptr(self) -> np.ndarray:
+        return self._indptr
+
+    @property
+    def indices(self) -> np.ndarray:
+        return self._indices
+
+    @property
+    def codes(self) -> np.ndarray:
+        return self._codes
+
+    @property
+    def nbytes(self) -> int:
+        """Tổng số byte của các mảng trong store."""
+        return int(
+            self._years.nbytes + self._province_codes.nbytes + self._indptr.nbytes
+            + self._indices.nbytes + self._codes.nbytes
+        )
+
+    @property
+    def dense_nbytes(self) -> int:
+        """Số byte nếu lưu các môn dưới dạng float64 dày (để so sánh)."""
+        return int(self._n_rows * len(self._subjects) * np.dtype(np.float64).itemsize)
+
+    # ==================== PUBLIC METHODS (API) ====================
+    def subject_index(self, subject: str) -> int:
+        """Trả về chỉ số cột của môn trong store.
+
+        Raises:
+            KeyError: Khi môn không có trong store.
+        """
+        try:
+            return self._subjects.index(subject)
+        except ValueError:
+            raise KeyError(f"Môn '{subject}' không có trong ScoreStore.") from None
+
+    def column(self, subject: str) -> tuple[np.ndarray, np.ndarray]:
+        """Trả về (chỉ số dòng, mã điểm) của một môn — view, không copy."""
+        j = self.subject_index(subject)
+        start, stop = self._indptr[j], self._indptr[j + 1]
+        return self._indices[start:stop], self._codes[start:stop]
+
+    def get_scores(self, subject: str) -> np.ndarray:
+        """Giải nén một môn ra mảng float dày (NaN cho thí sinh không dự thi)."""
+        rows, codes = self.column(subject)
+        out = np.full(self._n_rows, np.nan)
+        out[rows] = codes / SCORE_SCALE
+        return out
+
+    def column_values(self, subject: str) -> np.ndarray:
+        """Điểm dạng dày (float64, NaN cho ô trống) của một môn trên toàn bộ dòng."""
+        rows, codes = self.column(subject)
+        out = np.full(self._n_rows, np.nan)
+        out[rows] = codes / SCORE_SCALE
+        return out
+
+    def to_dense(self,
+                 subjects: list[str] | None = None,
+                 start: int = 0,
+                 stop: int | None = None) -> np.ndarray:
+        """Giải nén một đoạn dòng [start, stop) ra ma trận mã điểm int16.
+
+        Args:
+            subjects (list[str] | None): Các môn cần lấy. None → toàn bộ môn.
+            start (int): Dòng bắt đầu.
+            stop (int | None): Dòng kết thúc (không gồm). None → hết dữ liệu.
+
+        Returns:
+            np.ndarray: Ma trận (stop - start, len(subjects)), MISSING_CODE cho ô trống.
+        """
+        subjects = self._subjects if subjects is None else subjects
+        stop = self._n_rows if stop is None else min(stop, self._n_rows)
+        out = np.full((max(stop - start, 0), len(subjects)), MISSING_CODE, dtype=np.int16)
+
+        for k, subject in enumerate(subjects):
+            rows, codes = self.column(subject)
+            # indices tăng dần trong từng môn → cắt đoạn bằng searchsorted
+            lo, hi = np.searchsorted(rows, [start, stop])
+            out[rows[lo:hi] - start, k] = codes[lo:hi]
+        return out
+
+    def append(self, other: "ScoreStore") -> "ScoreStore":
+        """Store mới = các dòng của self rồi các dòng của other (cùng danh sách môn).
+
+        Chỉ nối mảng theo từng môn (dòng của other được dời thêm n_rows) → O(số ô có điểm),
+        không giải nén hay đọc lại DataFrame.
+
+        Raises:
+            ValueError: Khi hai store khác danh sách môn.
+        """
+        if other.subjects != self._subjects:
+            raise ValueError("Hai ScoreStore phải có cùng danh sách môn (cùng thứ tự).")
+
+        indptr = self._indptr + other.indptr
+        indices_parts, codes_parts = [], []
+        for subject in self._subjects:
+            rows, codes = self.column(subject)
+            new_rows, new_codes = other.column(subject)
+            indices_parts += [rows, (new_rows + self._n_rows).astype(rows.dtype)]
+            codes_parts += [codes, new_codes.astype(codes.dtype)]
+
+        return ScoreStore(
+            self._subjects,
+            np.concatenate([self._years, other.years.astype(self._years.dtype)]),
+            np.concatenate([self._province_codes, other.province_codes.astype(self._province_codes.dtype)]),
+            indptr,
+            np.concatenate(indices_parts) if indices_parts else np.empty(0, dtype=np.int32),
+            np.concatenate(codes_parts) if codes_parts else np.empty(0, dtype=np.int16),
+        )
+
+    def presence_mask(self) -> np.ndarray:
+        """Bitmask môn dự thi của từng thí sinh: bit j bật ⇔ có điểm môn thứ j.
+
+        Dùng để lọc thí sinh đủ môn của nhiều khối cùng lúc bằng một phép AND.
+
+        Returns:
+            np.ndarray: Mảng uint16 độ dài n_rows.
+
+        Raises:
+            ValueError: Khi store có nhiều hơn 16 môn (không vừa uint16).
+        """
+        if len(self._subjects) > 16:
+            raise ValueError("presence_mask chỉ hỗ trợ tối đa 16 môn.")
+        mask = np.zeros(self._n_rows, dtype=np.uint16)
+        for j in range(len(self._subjects)):
+            mask[self._indices[self._indptr[j]:self._indptr[j + 1]]] |= np.uint16(1 << j)
+        return mask
+
+    def province_index(self) -> tuple[np.ndarray, np.ndarray]:
+        """Chỉ mục tỉnh → dòng: hoán vị dòng sắp theo mã tỉnh + ranh giới từng mã.
+
+        Xây một lần (argsort ổn định) rồi giữ lại trên store; store chỉ đổi khi
+        dữ liệu đổi nên chỉ mục được xây đúng một lần mỗi phiên bản dữ liệu.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: (order, offsets) — các dòng của mã tỉnh c là
+            order[offsets[c + 1] : offsets[c + 2]] (tăng dần); đoạn đầu tiên là mã -1.
+        """
+        if self._province_order is None:
+            shifted = self._province_codes.astype(np.int64) + 1
+            self._province_order = np.argsort(shifted, kind="stable")
+            counts = np.bincount(shifted, minlength=N_PROVINCE_CODES + 1)
+            self._province_offsets = np.concatenate(([0], np.cumsum(counts)))
+        return self._province_order, self._province_offsets
+
+    def province_rows(self, codes) -> np.ndarray:
+        """Chỉ số dòng (tăng dần) của các thí sinh thuộc một hoặc nhiều mã tỉnh.
+
+        Args:
+            codes (int | Iterable[int]): Mã tỉnh (0..99).
+
+        Returns:
+            np.ndarray: Chỉ số dòng, chỉ chạm tới đoạn của các tỉnh được hỏi.
+        """
+        order, offsets = self.province_index()
+        parts = [
+            order[offsets[c + 1]:offsets[c + 2]]
+            for c in np.atleast_1d(codes).astype(np.int64)
+            if 0 <= c < N_PROVINCE_CODES
+        ]
+        if not parts:
+            return np.empty(0, dtype=np.int64)
+        return np.sort(np.concatenate(parts)) if len(parts) > 1 else parts[0]
+
+    # ==================== REPRESENTATION / UTILITIES ====================
+    def __repr__(self) -> str:
+        return (
+            f"<ScoreStore rows={self._n_rows} subjects={len(self._subjects)} "
+            f"cells={len(self._codes)} nbytes={self.nbytes} dense_nbytes={self.dense_nbytes}>"
+        )
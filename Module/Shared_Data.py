@@ -0,0 +1,305 @@
+from __future__ import annotations
+
+import atexit
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from Module.Score_Store import ScoreStore
+
+
+# Các mảng của ScoreStore được đưa lên shared memory (đủ để dựng lại store ở worker)
+_STORE_ARRAYS = ("years", "province_codes", "indptr", "indices", "codes")
+
+
+class SharedDataDescriptor:
+    """Mô tả gọn (picklable) của dữ liệu điểm đã đặt trên shared memory.
+
+    Mô tả:
+        - Chỉ chứa tên segment, dtype và shape của từng mảng → pickle vài trăm byte
+          thay vì cả DataFrame nhiều GB.
+        - Worker dùng `attach_shared(descriptor)` để gắn vào, không copy dữ liệu.
+
+    Attributes (public API):
+        subjects (list[str]): Danh sách môn theo thứ tự cột của ScoreStore.
+        arrays   (dict)     : {tên mảng: (tên segment, dtype, shape)}.
+    """
+
+    __slots__ = (
+        "_subjects",     # danh sách môn (thứ tự cột CSC)
+        "_arrays",       # {tên mảng: (tên segment, dtype, shape)}
+    )
+
+    def __init__(self, subjects: list[str], arrays: dict[str, tuple[str, str, tuple[int, ...]]]) -> None:
+        self._subjects = list(subjects)
+        self._arrays = dict(arrays)
+
+    @property
+    def subjects(self) -> list[str]:
+        return list(self._subjects)
+
+    @property
+    def arrays(self) -> dict[str, tuple[str, str, tuple[int, ...]]]:
+        return dict(self._arrays)
+
+    # Pickle tường minh cho class dùng __slots__
+    def __getstate__(self) -> tuple:
+        return self._subjects, self._arrays
+
+    def __setstate__(self, state: tuple) -> None:
+        self._subjects, self._arrays = state
+
+    def __repr__(self) -> str:
+        segments = ", ".join(f"{k}={v[0]}" for k, v in self._arrays.items())
+        return f"<SharedDataDescriptor subjects={len(self._subjects)} {segments}>"
+
+
+class SharedScoreData:
+    """Phía chủ sở hữu: đặt các mảng của ScoreStore lên shared memory.
+
+    Mô tả:
+        - Mỗi mảng (years, province_codes, indptr, indices, codes) là một segment riêng.
+        - `release()` đóng + unlink toàn bộ segment; được đăng ký với atexit nên
+          segment luôn được dọn khi tiến trình chính kết thúc, kể cả khi quên gọi.
+        - Hỗ trợ context manager: `with SharedScoreData(store) as shared: ...`.
+
+    Attributes (public API):
+        store      (ScoreStore)          : Store gốc đã publish.
+        descriptor (SharedDataDescriptor): Mô tả để gửi cho worker.
+        released   (bool)                : Đã giải phóng segment hay chưa.
+    """
+
+    __slots__ = (
+        "_store",         # ScoreStore gốc
+        "_segments",      # danh sách SharedMemory đang giữ
+        "_descriptor",    # SharedDataDescriptor tương ứng
+        "_released",      # cờ đã giải phóng
+    )
+
+    def __init__(self, store: ScoreStore) -> None:
+        """Copy các mảng của store lên shared memory (copy một lần duy nhất).
+
+        Args:
+            store (ScoreStore): Store cần publish.
+        """
+        if not isinstance(store, ScoreStore):
+            raise TypeError("store phải là instance của ScoreStore.")
+
+        self._store = store
+        self._released = False
+
+        self._segments, arrays = _publish_arrays({name: getattr(store, name) for name in _STORE_ARRAYS})
+        self._descriptor = SharedDataDescriptor(store.subjects, arrays)
+        atexit.register(self.release)
+
+    @property
+    def store(self) -> ScoreStore:
+        return self._store
+
+    @property
+    def descriptor(self) -> SharedDataDescriptor:
+        return self._descriptor
+
+    @property
+    def released(self) -> bool:
+        return self._released
+
+    def release(self) -> None:
+        """Đóng và unlink toàn bộ segment (gọi nhiều lần vẫn an toàn)."""
+        if self._released:
+            return
+        self._released = True
+        _unlink_segments(self._segments)
+        self._segments = []
+        atexit.unregister(self.release)
+
+    def __enter__(self) -> "SharedScoreData":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
+
+    def __repr__(self) -> str:
+        state = "released" if self._released else "published"
+        return f"<SharedScoreData {state} rows={self._store.n_rows} nbytes={self._store.nbytes}>"
+
+
+class SharedArrays:
+    """Phía chủ sở hữu: đặt một nhóm mảng numpy bất kỳ lên shared memory.
+
+    Mô tả:
+        - Dùng cho kết quả trung gian tính một lần ở tiến trình chính rồi chia cho
+          worker (vd tổng điểm theo dòng của so sánh tỉnh), cạnh ScoreStore đã publish.
+        - `spec` là dict thuần {tên: (tên segment, dtype, shape)} → pickle gọn theo task;
+          worker gắn vào bằng `attach_arrays(spec)`.
+        - `release()` đóng + unlink; được đăng ký với atexit như SharedScoreData.
+
+    Attributes (public API):
+        spec     (dict): {tên mảng: (tên segment, dtype, shape)}.
+        released (bool): Đã giải phóng segment hay chưa.
+    """
+
+    __slots__ = (
+        "_segments",     # danh sách SharedMemory đang giữ
+        "_spec",         # {tên mảng: (tên segment, dtype, shape)}
+        "_released",     # cờ đã giải phóng
+    )
+
+    def __init__(self, arrays: dict[str, np.ndarray]) -> None:
+        self._released = False
+        self._segments, self._spec = _publish_arrays(arrays)
+        atexit.register(self.release)
+
+    @property
+    def spec(self) -> dict[str, tuple[str, str, tuple[int, ...]]]:
+        return dict(self._spec)
+
+    @property
+    def released(self) -> bool:
+        return self._released
+
+    def release(self) -> None:
+        """Đóng và unlink toàn bộ segment (gọi nhiều lần vẫn an toàn)."""
+        if self._released:
+            return
+        self._released = True
+        _unlink_segments(self._segments)
+        self._segments = []
+        atexit.unregister(self.release)
+
+    def __enter__(self) -> "SharedArrays":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.release()
+
+    def __repr__(self) -> str:
+        state = "released" if self._released else "published"
+        return f"<SharedArrays {state} arrays={list(self._spec)}>"
+
+
+class AttachedScoreData:
+    """Phía worker: gắn vào các segment đã publish và dựng ScoreStore zero-copy.
+
+    Attributes (public API):
+        store (ScoreStore): Store có các mảng trỏ thẳng vào shared memory (chỉ đọc).
+    """
+
+    __slots__ = (
+        "_segments",     # SharedMemory đã attach (phải giữ sống cùng store)
+        "_store",        # ScoreStore dựng trên buffer chia sẻ
+    )
+
+    def __init__(self, descriptor: SharedDataDescriptor) -> None:
+        if not isinstance(descriptor, SharedDataDescriptor):
+            raise TypeError("descriptor phải là instance của SharedDataDescriptor.")
+
+        self._segments, views = _attach_arrays(descriptor.arrays)
+
+        self._store = ScoreStore(
+            descriptor.subjects,
+            views["years"],
+            views["province_codes"],
+            views["indptr"],
+            views["indices"],
+            views["codes"],
+        )
+
+    @property
+    def store(self) -> ScoreStore:
+        return self._store
+
+    def close(self) -> None:
+        """Bỏ gắn segment (không unlink — việc đó thuộc về tiến trình chủ)."""
+        self._store = None
+        _close_segments(self._segments)
+        self._segments = []
+
+    def __enter__(self) -> "AttachedScoreData":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _publish_arrays(arrays: dict[str, np.ndarray]) -> tuple[list[shared_memory.SharedMemory], dict]:
+    """Copy từng mảng lên một segment mới; lỗi giữa chừng → dọn các segment đã tạo."""
+    segments: list[shared_memory.SharedMemory] = []
+    spec = {}
+    try:
+        for name, arr in arrays.items():
+            src = np.ascontiguousarray(arr)
+            # SharedMemory không nhận size = 0 → cấp tối thiểu 1 byte
+            shm = shared_memory.SharedMemory(create=True, size=max(src.nbytes, 1))
+            segments.append(shm)
+            np.ndarray(src.shape, dtype=src.dtype, buffer=shm.buf)[...] = src
+            spec[name] = (shm.name, src.dtype.str, src.shape)
+    except Exception:
+        _unlink_segments(segments)
+        raise
+    return segments, spec
+
+
+def _attach_arrays(spec: dict) -> tuple[list[shared_memory.SharedMemory], dict[str, np.ndarray]]:
+    """Gắn vào các segment theo spec → (segment phải giữ sống, {tên: view chỉ đọc})."""
+    segments: list[shared_memory.SharedMemory] = []
+    views = {}
+    for name, (shm_name, dtype, shape) in spec.items():
+        shm = _attach_untracked(shm_name)
+        segments.append(shm)
+        view = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+        view.flags.writeable = False
+        views[name] = view
+    return segments, views
+
+
+def _close_segments(segments: list[shared_memory.SharedMemory]) -> None:
+    for shm in segments:
+        try:
+            shm.close()
+        except BufferError:
+            # Còn view numpy đang trỏ vào buffer → để GC đóng sau
+            pass
+
+
+def _unlink_segments(segments: list[shared_memory.SharedMemory]) -> None:
+    for shm in segments:
+        shm.close()
+        try:
+            shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def _attach_untracked(name: str) -> shared_memory.SharedMemory:
+    """Attach segment mà không để worker chiếm quyền dọn dẹp segment.
+
+    - Python >= 3.13: track=False → worker không đăng ký với resource_tracker.
+    - Bản cũ hơn: worker (fork/spawn từ tiến trình chủ) dùng CHUNG resource_tracker
+      với tiến trình chủ; đăng ký lại cùng tên là no-op nên chỉ cần attach bình thường.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+def attach_shared(descriptor: SharedDataDescriptor) -> AttachedScoreData:
+    """Gắn vào dữ liệu đã publish bởi DataProcessor.publish_shared().
+
+    Args:
+        descriptor (SharedDataDescriptor): Mô tả nhận từ tiến trình chủ.
+
+    Returns:
+        AttachedScoreData: Đối tượng giữ segment; dùng `.store` để phân tích.
+    """
+    return AttachedScoreData(descriptor)
+
+
+def attach_arrays(spec: dict) -> tuple[list[shared_memory.SharedMemory], dict[str, np.ndarray]]:
+    """Gắn vào các mảng đã publish bởi SharedArrays (phía worker).
+
+    Returns:
+        tuple: (segment — phải giữ sống cùng các view, {tên mảng: view chỉ đọc}).
+    """
+    return _attach_arrays(spec)
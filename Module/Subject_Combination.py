@@ -0,0 +1,251 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from Module.Score_Store import ScoreStore
+
+
+class SubjectCombinations:
+    """Tần suất tổ hợp môn thí sinh thực sự dự thi theo (năm, mã tỉnh).
+
+    Mô tả:
+        - Mỗi thí sinh ↔ một bitmask môn có điểm (bit j = store.subjects[j]).
+        - Đếm các mask khác nhau cho mọi nhóm bằng MỘT lần np.unique + bincount
+          → mảng dày (nam_hoc × ma_tinh × mask).
+        - Câu hỏi "bao nhiêu thí sinh đủ môn khối X" = cộng các mask chứa mask của X
+          (phép AND trên mảng mask nhỏ, không quét lại thí sinh).
+        - Thí sinh không có điểm môn nào (mask 0) được giữ trong số đếm nhưng không
+          tính vào mẫu số của tỉ lệ.
+
+    Attributes (public API):
+        subjects   (list[str])  : Thứ tự bit của mask.
+        masks      (np.ndarray) : Các mask xuất hiện (uint16, tăng dần).
+        axis_names (list[str])  : Trục nhóm (mặc định ['nam_hoc', 'ma_tinh']).
+        counts     (np.ndarray) : Số thí sinh, shape (*group_shape, len(masks)).
+    """
+
+    # ==================== INTERNAL PRIVATE MEMBERS ====================
+    __slots__ = (
+        "_subjects",      # tên môn theo thứ tự bit
+        "_masks",         # uint16: các mask khác nhau
+        "_axes",          # list[(tên trục, nhãn np.ndarray)]
+        "_counts",        # int64: (*group_shape, số mask)
+    )
+
+    # -------------------- CONSTRUCTOR --------------------
+    def __init__(self,
+                 subjects: list[str],
+                 masks: np.ndarray,
+                 axes: list[tuple[str, list | np.ndarray]],
+                 counts: np.ndarray) -> None:
+        if counts.shape != (*(len(labels) for _, labels in axes), len(masks)):
+            raise ValueError("counts phải có shape (*group_shape, số mask).")
+        self._subjects = list(subjects)
+        self._masks = np.asarray(masks, dtype=np.uint16)
+        self._axes = [(name, np.asarray(labels)) for name, labels in axes]
+        self._counts = counts
+        # Chỉ đọc: bảng tần suất được cache và dùng chung giữa các lời gọi
+        for arr in (self._masks, self._counts, *(labels for _, labels in self._axes)):
+            arr.setflags(write=False)
+
+    # -------------------- GETTER (read-only) --------------------
+    @property
+    def subjects(self) -> list[str]:
+        return list(self._subjects)
+
+    @property
+    def masks(self) -> np.ndarray:
+        return self._masks
+
+    @property
+    def axis_names(self) -> list[str]:
+        return [name for name, _ in self._axes]
+
+    @property
+    def counts(self) -> np.ndarray:
+        return self._counts
+
+    @property
+    def nbytes(self) -> int:
+        return int(self._counts.nbytes + self._masks.nbytes)
+
+    # ==================== INTERNAL PRIVATE METHODS ====================
+    def _axis_position(self, name: str) -> int:
+        for dim, (axis_name, _) in enumerate(self._axes):
+            if axis_name == name:
+                return dim
+        raise KeyError(f"SubjectCombinations không có trục '{name}'. Các trục: {self.axis_names}")
+
+    def _group_index(self) -> pd.Index:
+        """Index (MultiIndex nếu nhiều trục) cho các nhóm theo thứ tự C của counts."""
+        if not self._axes:
+            return pd.RangeIndex(1)
+        if len(self._axes) == 1:
+            return pd.Index(self._axes[0][1], name=self._axes[0][0])
+        return pd.MultiIndex.from_product([labels for _, labels in self._axes], names=self.axis_names)
+
+    def _mask_of(self, subjects: list[str]) -> int | None:
+        """Mask của một tập môn; None nếu có môn không nằm trong dữ liệu."""
+        if any(s not in self._subjects for s in subjects):
+            return None
+        return sum(1 << self._subjects.index(s) for s in set(subjects))
+
+    # ==================== PUBLIC METHODS (API) ====================
+    def labels(self, name: str) -> np.ndarray:
+        """Nhãn của một trục nhóm."""
+        return self._axes[self._axis_position(name)][1]
+
+    def combination_names(self, sep: str = "+") -> list[str]:
+        """Tên tổ hợp của từng mask, vd 'toan+vat_li+hoa_hoc+ngoai_ngu' (theo thứ tự subjects)."""
+        return [
+            sep.join(s for j, s in enumerate(self._subjects) if int(mask) >> j & 1)
+            for mask in self._masks
+        ]
+
+    def select(self, **selection) -> "SubjectCombinations":
+        """Lấy lát cắt theo nhãn: nhãn đơn → bỏ trục, danh sách nhãn → giữ trục.
+
+        Raises:
+            KeyError: Khi trục hoặc nhãn không tồn tại.
+        """
+        result = self
+        for name, wanted in selection.items():
+            dim = result._axis_position(name)
+            labels = result._axes[dim][1]
+            single = np.ndim(wanted) == 0
+            positions = []
+            for label in ([wanted] if single else list(wanted)):
+                hits = np.flatnonzero(labels == label)
+                if len(hits) == 0:
+                    raise KeyError(f"Trục '{name}' không có nhãn {label!r}.")
+                positions.append(int(hits[0]))
+
+            axes = list(result._axes)
+            if single:
+                counts = np.take(result._counts, positions[0], axis=dim)
+                axes.pop(dim)
+            else:
+                counts = np.take(result._counts, positions, axis=dim)
+                axes[dim] = (name, labels[positions])
+            result = SubjectCombinations(result._subjects, result._masks, axes, counts)
+        return result
+
+    def rollup(self, *names: str) -> "SubjectCombinations":
+        """Cộng dồn (bỏ) các trục đã cho, vd: rollup('ma_tinh') → toàn quốc theo năm."""
+        dims = tuple(sorted(self._axis_position(n) for n in names))
+        if not dims:
+            return self
+        axes = [axis for dim, axis in enumerate(self._axes) if dim not in dims]
+        return SubjectCombinations(self._subjects, self._masks, axes, self._counts.sum(axis=dims))
+
+    def merge(self, other: "SubjectCombinations") -> "SubjectCombinations":
+        """Cộng bảng tần suất của một partition mới (cùng thứ tự môn, cùng trục nhóm).
+
+        Nhãn mỗi trục là hợp hai bên (trục nhãn số sắp tăng dần), mask là hợp đã sắp tăng
+        → giống hệt bảng dựng lại từ đầu trên dữ liệu đã nối.
+
+        Raises:
+            ValueError: Khi khác danh sách môn hoặc khác tên trục.
+        """
+        if self._subjects != other._subjects or self.axis_names != other.axis_names:
+            raise ValueError("Chỉ cộng được bảng tổ hợp cùng danh sách môn và cùng trục.")
+
+        axes = []
+        for (name, labels), (_, extra) in zip(self._axes, other._axes):
+            merged = np.concatenate([labels, extra[~np.isin(extra, labels)]])
+            if merged.dtype.kind in "iu":
+                merged = np.sort(merged)
+            axes.append((name, merged))
+        masks = np.union1d(self._masks, other._masks)
+
+        counts = np.zeros((*(len(labels) for _, labels in axes), len(masks)), dtype=np.int64)
+        for table in (self, other):
+            positions = []
+            for (_, labels), (_, own) in zip(axes, table._axes):
+                lookup = {label: k for k, label in enumerate(labels.tolist())}
+                positions.append([lookup[label] for label in own.tolist()])
+            positions.append(np.searchsorted(masks, table._masks))
+            counts[np.ix_(*positions)] += table._counts
+        return SubjectCombinations(self._subjects, masks, axes, counts)
+
+    def count(self, subjects: list[str], exact: bool = False) -> np.ndarray:
+        """Số thí sinh mỗi nhóm thi ĐÚNG tổ hợp (exact=True) hoặc thi ĐỦ các môn đã cho.
+
+        Returns:
+            np.ndarray: shape group_shape (0 nếu có môn không nằm trong dữ liệu).
+        """
+        mask = self._mask_of(subjects)
+        if mask is None:
+            return np.zeros(self._counts.shape[:-1], dtype=np.int64)
+        hit = self._masks == mask if exact else (self._masks & mask) == mask
+        return self._counts[..., hit].sum(axis=-1)
+
+    def eligible_counts(self, blocks: dict[str, list[str]]) -> np.ndarray:
+        """Số thí sinh đủ môn của từng khối, shape (*group_shape, số khối) — một phép nhân ma trận.
+
+        Khối có môn không nằm trong dữ liệu → 0.
+        """
+        block_masks = [self._mask_of(subjects) for subjects in blocks.values()]
+        contains = np.zeros((len(self._masks), len(block_masks)), dtype=np.int64)
+        for b, mask in enumerate(block_masks):
+            if mask is not None:
+                contains[:, b] = (self._masks & mask) == mask
+        return self._counts @ contains
+
+    def n_students(self) -> np.ndarray:
+        """Số thí sinh có ít nhất một môn có điểm trong mỗi nhóm (mẫu số của tỉ lệ)."""
+        return self._counts[..., self._masks != 0].sum(axis=-1)
+
+    def eligible_share(self, blocks: dict[str, list[str]]) -> pd.DataFrame:
+        """Tỉ lệ (0..1) thí sinh đủ môn từng khối trong mỗi nhóm.
+
+        Returns:
+            pd.DataFrame: Index theo các trục nhóm, cột = tên khối; nhóm không có thí sinh → NaN.
+        """
+        eligible = self.eligible_counts(blocks).reshape(-1, len(blocks))
+        total = self.n_students().reshape(-1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            share = eligible / total[:, None]
+        return pd.DataFrame(share, index=self._group_index(), columns=list(blocks))
+
+    def to_frame(self, min_count: int = 1) -> pd.DataFrame:
+        """Dạng dài: [<các trục>..., 'to_hop', 'so_mon', 'so_hoc_sinh'] cho các ô >= min_count."""
+        positions = np.nonzero(self._counts >= max(min_count, 1))
+        data = {name: labels[pos] for (name, labels), pos in zip(self._axes, positions[:-1])}
+        names = np.asarray(self.combination_names(), dtype=object)
+        n_subjects = np.array([bin(int(m)).count("1") for m in self._masks], dtype=np.int64)
+        data["to_hop"] = names[positions[-1]]
+        data["so_mon"] = n_subjects[positions[-1]]
+        data["so_hoc_sinh"] = self._counts[positions].astype(np.int64)
+        return pd.DataFrame(data)
+
+    # ==================== REPRESENTATION / UTILITIES ====================
+    def __repr__(self) -> str:
+        shape = " × ".join(f"{n}[{len(l)}]" for n, l in self._axes)
+        return f"<SubjectCombinations {shape} × masks[{len(self._masks)}]>"
+
+
+def build_subject_combinations(store: ScoreStore) -> SubjectCombinations:
+    """Đếm tổ hợp môn (bitmask có điểm) cho mọi (năm, mã tỉnh) trong một lần bincount.
+
+    Args:
+        store (ScoreStore): Dữ liệu điểm dạng nén cột.
+
+    Returns:
+        SubjectCombinations: Trục ('nam_hoc', 'ma_tinh') × mask.
+    """
+    years, year_idx = np.unique(store.years, return_inverse=True)
+    provinces, prov_idx = np.unique(store.province_codes, return_inverse=True)
+    masks, mask_idx = np.unique(store.presence_mask(), return_inverse=True)
+
+    n_groups = len(years) * len(provinces)
+    keys = (year_idx * len(provinces) + prov_idx) * len(masks) + mask_idx
+    counts = np.bincount(keys, minlength=n_groups * len(masks))
+
+    return SubjectCombinations(
+        store.subjects,
+        masks,
+        [("nam_hoc", years.astype(np.int64)), ("ma_tinh", provinces.astype(np.int64))],
+        counts.reshape(len(years), len(provinces), len(masks)),
+    )
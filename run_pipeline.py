@@ -20,8 +20,8 @@ def main() -> None:
     processor.process_all()
 
     # Kiểm tra nhanh dữ liệu sau xử lý
-    combined = processor.get_processed_data()
-    print(f"[INFO] Combined data shape: {combined.shape}")
+    store = processor.get_score_store()
+    print(f"[INFO] Combined data shape: {(store.n_rows, len(processor.processed_columns))}")
 
     # 4. Export dữ liệu sạch
     output_root = project_root / "Clean_Data_2023-2025"
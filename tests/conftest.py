@@ -0,0 +1,121 @@
+"""Fixture dùng chung: dữ liệu thô tổng hợp (đủ 9 file 2018–2025) → DataProcessor đã xử lý.
+
+Không cần Raw_Data: DataLoader.load_data được thay bằng bộ sinh dữ liệu có seed cố định,
+giữ đúng tên cột gốc của từng năm để đi qua toàn bộ pipeline chuẩn hoá của DataProcessor.
+"""
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from Module.Load_Data import DataLoader
+from Module.Processor_Data import DataProcessor
+
+
+# Mã tỉnh trong SBD (01–64, không có 20) + một mã không thuộc tỉnh nào
+PROVINCE_CODES = [f"{i:02d}" for i in range(1, 65) if i != 20] + ["99"]
+
+# Số thí sinh mỗi năm (2025 CT2006 dùng một nửa)
+N_STUDENTS = 1500
+
+# Tên cột gốc theo từng giai đoạn (2022–2024 đã dùng tên chuẩn)
+_COLUMNS_2018 = {"sbd": "SBD", "toan": "Toan", "ngu_van": "NguVan", "ngoai_ngu": "NgoaiNgu",
+                 "vat_li": "VatLy", "hoa_hoc": "HoaHoc", "sinh_hoc": "SinhHoc", "lich_su": "LichSu",
+                 "dia_li": "DiaLy", "gdcd": "GDCD", "ma_ngoai_ngu": "MaMonNgoaiNgu"}
+_COLUMNS_2021 = {"sbd": "SBD", "toan": "Toan", "ngu_van": "Ngu_Van", "ngoai_ngu": "Ngoai_Ngu",
+                 "vat_li": "Vat_Ly", "hoa_hoc": "Hoa_Hoc", "sinh_hoc": "Sinh_Hoc", "lich_su": "Lich_Su",
+                 "dia_li": "Dia_Ly", "gdcd": "GDCD"}
+_COLUMNS_2025 = {"sbd": "SOBAODANH", "toan": "Toán", "ngu_van": "Văn", "vat_li": "Lí", "hoa_hoc": "Hóa",
+                 "sinh_hoc": "Sinh", "lich_su": "Sử", "dia_li": "Địa", "gdcd": "Giáo dục công dân",
+                 "ngoai_ngu": "Ngoại ngữ", "ma_ngoai_ngu": "Mã môn ngoại ngữ", "tin_hoc": "Tin học",
+                 "cn_cong_nghiep": "Công nghệ công nghiệp", "cn_nong_nghiep": "Công nghệ nông nghiệp"}
+
+
+def _scores(rng: np.random.Generator, n: int, step: float, present: float) -> np.ndarray:
+    """Điểm 0–10 theo bước `step`; tỉ lệ (1 - present) là NaN (không thi)."""
+    k = int(round(10 / step))
+    values = np.round(rng.binomial(k, 0.6, size=n) * step, 2)
+    values[rng.random(n) > present] = np.nan
+    return values
+
+
+def _year_frame(rng: np.random.Generator, year: int, n: int, ct2018: bool = False) -> pd.DataFrame:
+    sbd = np.array([f"{c}{i:06d}" for c, i in zip(rng.choice(PROVINCE_CODES, n), rng.permutation(n))])
+    natural = rng.random(n) < 0.4
+    data = {
+        "sbd": sbd,
+        "toan": _scores(rng, n, 0.05 if year == 2025 else 0.2, 0.97),
+        "ngu_van": _scores(rng, n, 0.25, 0.97),
+        "ngoai_ngu": _scores(rng, n, 0.2, 0.85),
+        "vat_li": np.where(natural, _scores(rng, n, 0.25, 0.95), np.nan),
+        "hoa_hoc": np.where(natural, _scores(rng, n, 0.25, 0.95), np.nan),
+        "sinh_hoc": np.where(natural, _scores(rng, n, 0.25, 0.95), np.nan),
+        "lich_su": np.where(~natural, _scores(rng, n, 0.25, 0.95), np.nan),
+        "dia_li": np.where(~natural, _scores(rng, n, 0.25, 0.95), np.nan),
+        "gdcd": np.where(~natural, _scores(rng, n, 0.25, 0.9), np.nan),
+    }
+    if ct2018:
+        data["tin_hoc"] = _scores(rng, n, 0.25, 0.1)
+        data["cn_cong_nghiep"] = _scores(rng, n, 0.25, 0.05)
+        data["cn_nong_nghiep"] = _scores(rng, n, 0.25, 0.05)
+    df = pd.DataFrame(data)
+    df["ma_ngoai_ngu"] = "N1"
+    return df
+
+
+def make_raw_frames(seed: int = 0, n: int = N_STUDENTS) -> tuple[pd.DataFrame, ...]:
+    """9 DataFrame thô theo đúng thứ tự và tên cột của DataLoader.load_data()."""
+    rng = np.random.default_rng(seed)
+    frames = []
+    for year in range(2018, 2025):
+        df = _year_frame(rng, year, n)
+        if year <= 2020:
+            df = df.rename(columns=_COLUMNS_2018)
+        elif year == 2021:
+            df = df.rename(columns=_COLUMNS_2021)
+        frames.append(df)
+
+    ct2006 = _year_frame(rng, 2025, n // 2).rename(columns=_COLUMNS_2025)
+    ct2018 = (
+        _year_frame(rng, 2025, n, ct2018=True)
+        .rename(columns=_COLUMNS_2025)
+        .rename(columns={"Giáo dục công dân": "Giáo dục kinh tế và pháp luật"})
+    )
+    for df in (ct2006, ct2018):
+        df.insert(0, "STT", range(len(df)))
+    return (*frames, ct2006, ct2018)
+
+
+def make_processor(seed: int = 0, n: int = N_STUDENTS, **process_kwargs) -> DataProcessor:
+    """DataProcessor đã process_all trên dữ liệu tổng hợp."""
+    raw = make_raw_frames(seed, n)
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(DataLoader, "load_data", lambda self: tuple(df.copy() for df in raw))
+        processor = DataProcessor(ROOT)
+    processor.process_all(**process_kwargs)
+    return processor
+
+
+@pytest.fixture(scope="session")
+def processor() -> DataProcessor:
+    """DataProcessor dùng chung (chỉ đọc) cho các test không sửa dữ liệu."""
+    return make_processor()
+
+
+@pytest.fixture(scope="session")
+def frame(processor) -> pd.DataFrame:
+    """combined_data dạng dày (mỗi dòng một thí sinh) — dữ liệu tham chiếu cho các phép so khớp."""
+    return processor.combined_data
+
+
+def score_codes(values) -> np.ndarray:
+    """Điểm → mã nguyên (×100) như ScoreStore, để so khớp tổng điểm không lệch số thực."""
+    return np.rint(np.asarray(values, dtype=float) * 100).astype(np.int64)
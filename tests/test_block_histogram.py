@@ -0,0 +1,71 @@
+"""Engine tổng điểm khối (histogram trên ScoreStore) vs groupby từng khối trên dữ liệu dày."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from Module.Analysis import Analysis, BLOCK_SUBJECTS_MAP
+from conftest import score_codes
+
+
+@pytest.fixture(scope="module")
+def analysis(processor):
+    return Analysis(processor)
+
+
+def block_totals(frame: pd.DataFrame, subjects: list[str]) -> pd.DataFrame:
+    """Tổng điểm khối theo cách cũ: chỉ thí sinh đủ mọi môn hợp lệ (môn có trong dữ liệu) của khối."""
+    valid = [s for s in subjects if s in frame.columns]
+    eligible = frame[frame[valid].notna().all(axis=1)]
+    total = sum(score_codes(eligible[s]) for s in valid)
+    return pd.DataFrame({"nam_hoc": eligible["nam_hoc"].to_numpy(), "tong_diem": total / 100})
+
+
+def test_block_engine_matches_groupby(analysis, frame):
+    expected = []
+    for block, subjects in BLOCK_SUBJECTS_MAP.items():
+        counts = block_totals(frame, subjects).groupby(["nam_hoc", "tong_diem"]).size()
+        expected.append(counts.reset_index(name="so_hoc_sinh").assign(khoi=block))
+    expected = (pd.concat(expected)[["khoi", "nam_hoc", "tong_diem", "so_hoc_sinh"]]
+                .sort_values(["khoi", "nam_hoc", "tong_diem"]).reset_index(drop=True))
+
+    out = analysis.analyze_scores_by_exam_block("All")
+    pd.testing.assert_frame_equal(out.reset_index(drop=True), expected, check_dtype=False)
+
+
+@pytest.mark.parametrize("block", ["A00", "B08", "D01"])
+def test_single_block_matches_all(analysis, frame, block):
+    out = analysis.analyze_scores_by_exam_block(block)
+    expected = block_totals(frame, BLOCK_SUBJECTS_MAP[block])
+    assert out["so_hoc_sinh"].sum() == len(expected)
+    stats = analysis.get_statistics_by_block(block)
+    for year, df_year in expected.groupby("nam_hoc"):
+        assert stats[year]["mean"] == pytest.approx(df_year["tong_diem"].mean())
+        assert stats[year]["median"] == pytest.approx(df_year["tong_diem"].median())
+    np.testing.assert_array_equal(out["khoi"].unique(), [block])
+
+
+# --------------------------------------------------------------
+# Khối tốt nhất của từng thí sinh vs max trực tiếp trên ma trận tổng điểm
+# --------------------------------------------------------------
+def test_best_block_matches_direct_max(analysis, frame):
+    blocks = {name: subjects for name, subjects in BLOCK_SUBJECTS_MAP.items()
+              if all(s in frame.columns for s in subjects)}
+    totals = np.column_stack([
+        np.where(frame[subjects].notna().all(axis=1), sum(score_codes(frame[s].fillna(0)) for s in subjects), -1)
+        for subjects in blocks.values()
+    ])
+    # Hoà điểm → khối đứng trước trong BLOCK_SUBJECTS_MAP (argmax lấy vị trí đầu tiên)
+    best = totals.argmax(axis=1)
+    best_total = totals[np.arange(len(best)), best]
+    keep = best_total >= 0
+    expected = pd.DataFrame({
+        "sbd": frame["sbd"].to_numpy()[keep],
+        "nam_hoc": frame["nam_hoc"].to_numpy()[keep],
+        "khoi": np.asarray(list(blocks), dtype=object)[best[keep]],
+        "tong_diem": best_total[keep] / 100,
+    })
+    pd.testing.assert_frame_equal(analysis.get_best_block_frame(), expected, check_dtype=False)
+
+    hist = analysis.get_best_block_histogram()
+    for year, df_year in expected.groupby("nam_hoc"):
+        assert hist.select(nam_hoc=year).describe()["median"].iloc[0] == pytest.approx(df_year["tong_diem"].median())
@@ -0,0 +1,153 @@
+"""Backend Polars / Arrow phải cho kết quả GIỐNG HỆT backend mặc định (pandas) trên mọi getter public."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from Module.Analysis import Analysis
+from Module.Compute_Backend import BACKENDS, DEFAULT_BACKEND, available_backends, get_backend
+
+# Backend thay thế → thư viện cần có (thiếu → bỏ qua test của backend đó)
+ALTERNATIVE_BACKENDS = {"polars": "polars", "arrow": "pyarrow"}
+
+QUERIES = pd.DataFrame({"nam_hoc": [2024, 2025, 2025], "khoi": ["A00", "D01", "C00"],
+                        "chi_tieu": [100, 50, 1_000_000]})
+
+# (tên case, lời gọi) — phủ mọi getter public của Analysis
+CASES = [
+    ("get_score_distribution", lambda a: a.get_score_distribution("toan")),
+    ("get_arregate_by_exam_subsections[All]", lambda a: a.get_arregate_by_exam_subsections("All")),
+    ("get_arregate_by_exam_subsections[toan]", lambda a: a.get_arregate_by_exam_subsections("toan")),
+    ("get_subject_histogram", lambda a: a.get_subject_histogram()),
+    ("get_score_cube", lambda a: a.get_score_cube()),
+    ("get_block_histogram[All]", lambda a: a.get_block_histogram("All")),
+    ("get_block_histogram[A00]", lambda a: a.get_block_histogram("A00")),
+    ("analyze_scores_by_exam_block[All]", lambda a: a.analyze_scores_by_exam_block("All")),
+    ("analyze_scores_by_exam_block[D01]", lambda a: a.analyze_scores_by_exam_block("D01")),
+    ("compare_by_region[ALL]", lambda a: a.compare_by_region("ALL")),
+    ("compare_by_region[HaNoi]", lambda a: a.compare_by_region("Hà Nội")),
+    ("get_province_histogram", lambda a: a.get_province_histogram()),
+    ("get_merged_region_histogram", lambda a: a.get_merged_region_histogram()),
+    ("compare_by_merged_region", lambda a: a.compare_by_merged_region("ALL")),
+    ("get_statistics_by_subject", lambda a: a.get_statistics_by_subject("toan")),
+    ("get_statistics_by_block", lambda a: a.get_statistics_by_block("A00")),
+    ("get_statistics_by_region", lambda a: a.get_statistics_by_region("Hà Nội")),
+    ("get_statistics_by_merged_region",
+     lambda a: a.get_statistics_by_merged_region(a.get_merged_region_histogram().labels("tinh")[0])),
+    ("get_quantiles[subject]", lambda a: a.get_quantiles("subject", [0.25, 0.5, 0.75])),
+    ("get_quantiles[block]", lambda a: a.get_quantiles("block", [0.1, 0.9])),
+    ("get_pass_rates[region]", lambda a: a.get_pass_rates("region", [10.0, 20.0])),
+    ("get_boxplot_summary[merged_region]", lambda a: a.get_boxplot_summary("merged_region")),
+    ("get_correlation_matrix", lambda a: a.get_correlation_matrix(2024)),
+    ("get_correlation_matrices", lambda a: a.get_correlation_matrices(by_region=True)),
+    ("get_percentile_table[block]", lambda a: a.get_percentile_table("block")),
+    ("get_percentile_table[subject,region]", lambda a: a.get_percentile_table("subject", by_region=True)),
+    ("percentile_rank", lambda a: a.percentile_rank([15.0, 21.5, 27.0], (2025, "A00"))),
+    ("get_best_block", lambda a: a.get_best_block()),
+    ("get_best_block_frame", lambda a: a.get_best_block_frame()),
+    ("get_best_block_histogram", lambda a: a.get_best_block_histogram()),
+    ("get_equating", lambda a: a.get_equating("block", "A00", (2025, "CT2018"), 2024)),
+    ("equate_scores", lambda a: a.equate_scores([5.0, 6.5, 8.0], "subject", "toan", 2025, 2024)),
+    ("kde", lambda a: a.kde("toan")),
+    ("get_subject_combinations", lambda a: a.get_subject_combinations(by_region=True)),
+    ("get_combination_counts", lambda a: a.get_combination_counts()),
+    ("get_block_eligibility", lambda a: a.get_block_eligibility(by_region=True)),
+    ("joint_histogram", lambda a: a.joint_histogram("toan", "ngu_van", 2024)),
+    ("joint_histograms", lambda a: a.joint_histograms(2024, province="Hà Nội")),
+    ("get_inequality_indices", lambda a: a.get_inequality_indices()),
+    ("get_cutoff_simulator", lambda a: a.get_cutoff_simulator(by_region=True)),
+    ("simulate_cutoffs", lambda a: a.simulate_cutoffs(QUERIES)),
+    ("project_cutoffs", lambda a: a.project_cutoffs(QUERIES.drop(columns="nam_hoc"), shift={"A00": 0.5})),
+]
+
+
+def _comparable(value):
+    """Đưa đối tượng kết quả về dạng so khớp được (DataFrame / histogram / mảng)."""
+    if hasattr(value, "histogram"):                                # ScoreCube
+        return value.histogram
+    if hasattr(value, "table") and hasattr(value, "group_cols"):   # CutoffSimulator
+        return value.table.to_frame()
+    if hasattr(value, "to_frame") and not hasattr(value, "axis_names"):
+        return value.to_frame()                                    # PercentileTable, EquatingFunction
+    return value
+
+
+def assert_same_result(left, right) -> None:
+    """So khớp hai kết quả của Analysis: cùng kiểu, giá trị, dtype, index và thứ tự dòng."""
+    left, right = _comparable(left), _comparable(right)
+    assert type(left) is type(right), f"Khác kiểu: {type(left).__name__} vs {type(right).__name__}"
+    if isinstance(left, pd.DataFrame):
+        pd.testing.assert_frame_equal(left, right)
+    elif isinstance(left, pd.Series):
+        pd.testing.assert_series_equal(left, right)
+    elif isinstance(left, dict):
+        assert list(left) == list(right), "Khác tập khoá của dict."
+        for key in left:
+            assert_same_result(left[key], right[key])
+    elif isinstance(left, (list, tuple)):
+        assert len(left) == len(right), "Khác độ dài."
+        for a, b in zip(left, right):
+            assert_same_result(a, b)
+    elif hasattr(left, "counts") and hasattr(left, "axis_names"):
+        # ScoreHistogram / SubjectCombinations: cùng trục, cùng nhãn, cùng số đếm
+        assert left.axis_names == right.axis_names
+        for name in left.axis_names:
+            np.testing.assert_array_equal(left.labels(name), right.labels(name))
+        np.testing.assert_array_equal(left.counts, right.counts)
+    else:
+        np.testing.assert_equal(left, right)
+
+
+@pytest.fixture(scope="module", params=list(ALTERNATIVE_BACKENDS))
+def backend_name(request):
+    pytest.importorskip(ALTERNATIVE_BACKENDS[request.param])
+    return request.param
+
+
+@pytest.fixture(scope="module")
+def reference(processor):
+    return Analysis(processor, backend=DEFAULT_BACKEND)
+
+
+@pytest.fixture(scope="module")
+def candidate(processor, backend_name):
+    return Analysis(processor, backend=backend_name)
+
+
+def test_every_backend_is_registered():
+    assert set(ALTERNATIVE_BACKENDS) | {DEFAULT_BACKEND} == set(BACKENDS)
+    assert DEFAULT_BACKEND in available_backends()
+
+
+@pytest.mark.parametrize("case", CASES, ids=[name for name, _ in CASES])
+def test_public_getter_matches_default_backend(reference, candidate, case):
+    _, call = case
+    assert_same_result(call(reference), call(candidate))
+
+
+def test_unique_counts_matches_numpy(backend_name):
+    backend = get_backend(backend_name)
+    keys = np.random.default_rng(1).integers(0, 10 ** 9, 50_000)
+    uniq, counts = backend.unique_counts(keys)
+    ref_uniq, ref_counts = np.unique(keys, return_counts=True)
+    np.testing.assert_array_equal(uniq, ref_uniq)
+    np.testing.assert_array_equal(counts, ref_counts)
+    assert counts.dtype == np.int64
+
+
+def test_count_keys_matches_bincount(backend_name):
+    keys = np.random.default_rng(2).integers(0, 5_000, 20_000)
+    counts = get_backend(backend_name).count_keys(keys, minlength=6_000)
+    np.testing.assert_array_equal(counts, np.bincount(keys, minlength=6_000))
+
+
+def test_sort_frame_handles_string_dtype_and_ties(backend_name):
+    rng = np.random.default_rng(3)
+    df = pd.DataFrame({
+        "khoi": pd.array(rng.choice(["A00", "B00", "D01", "Điểm gãy"], 5_000), dtype="string"),
+        "nam_hoc": rng.integers(2018, 2026, 5_000),
+        "tong_diem": np.round(rng.random(5_000) * 30, 1),
+        "so_hoc_sinh": np.arange(5_000),
+    })
+    by = ["khoi", "nam_hoc", "tong_diem"]
+    expected = df.sort_values(by, kind="stable")
+    pd.testing.assert_frame_equal(get_backend(backend_name).sort_frame(df, by), expected)
@@ -0,0 +1,26 @@
+"""Ma trận tương quan / hiệp phương sai cộng dồn theo cặp môn vs DataFrame.corr / cov (pairwise)."""
+import pandas as pd
+import pytest
+
+from Module.Analysis import Analysis, PRE_REGION_MAP
+
+
+@pytest.fixture(scope="module")
+def analysis(processor):
+    return Analysis(processor)
+
+
+@pytest.mark.parametrize("kind", ["corr", "cov"])
+@pytest.mark.parametrize("year", [2018, 2025])
+def test_national_matrix_matches_pandas(analysis, frame, kind, year):
+    out = analysis.get_correlation_matrix(year, kind=kind)
+    scores = frame.loc[frame["nam_hoc"] == year, list(out.columns)]
+    expected = scores.corr(min_periods=1) if kind == "corr" else scores.cov(min_periods=1)
+    pd.testing.assert_frame_equal(out, expected, check_names=False, atol=1e-9)
+
+
+def test_region_matrix_matches_pandas(analysis, frame):
+    codes = frame["sbd"].astype(str).str.zfill(8).str[:2]
+    out = analysis.get_correlation_matrix(2024, region="Hà Nội")
+    scores = frame.loc[(frame["nam_hoc"] == 2024) & codes.isin(PRE_REGION_MAP["Hà Nội"]), list(out.columns)]
+    pd.testing.assert_frame_equal(out, scores.corr(min_periods=1), check_names=False, atol=1e-9)
@@ -0,0 +1,57 @@
+"""Mô phỏng điểm chuẩn theo chỉ tiêu vs chọn trực tiếp Q thí sinh điểm cao nhất."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from Module.Analysis import Analysis, BLOCK_SUBJECTS_MAP, PRE_REGION_MAP
+from test_block_histogram import block_totals
+
+
+@pytest.fixture(scope="module")
+def analysis(processor):
+    return Analysis(processor)
+
+
+def direct_cutoff(scores: np.ndarray, quota: int) -> tuple[float, int]:
+    """Điểm của thí sinh thứ Q (xếp giảm dần) và số thí sinh >= điểm đó (đồng điểm đều đỗ)."""
+    descending = np.sort(scores)[::-1]
+    cutoff = descending[min(quota, len(descending)) - 1]
+    return cutoff, int((scores >= cutoff).sum())
+
+
+def test_simulate_matches_direct_selection(analysis, frame):
+    queries = pd.DataFrame({
+        "nam_hoc": [2025, 2025, 2024, 2023, 2025],
+        "khoi": ["A00", "D01", "D01", "C00", "A01"],
+        "chi_tieu": [10, 100, 1, 250, 100000],
+    })
+    out = analysis.simulate_cutoffs(queries)
+    for row in out.itertuples():
+        totals = block_totals(frame, BLOCK_SUBJECTS_MAP[row.khoi])
+        scores = totals.loc[totals["nam_hoc"] == row.nam_hoc, "tong_diem"].to_numpy()
+        cutoff, admitted = direct_cutoff(scores, row.chi_tieu)
+        assert row.diem_chuan == pytest.approx(cutoff)
+        assert row.so_trung_tuyen == admitted
+        assert row.du_chi_tieu == (admitted >= row.chi_tieu)
+
+
+def test_simulate_by_region(analysis, frame):
+    queries = pd.DataFrame({"nam_hoc": [2025], "khoi": ["D01"], "tinh": ["Hà Nội"], "chi_tieu": [5]})
+    out = analysis.simulate_cutoffs(queries, by_region=True).iloc[0]
+    codes = frame["sbd"].astype(str).str.zfill(8).str[:2]
+    totals = block_totals(frame[codes.isin(PRE_REGION_MAP["Hà Nội"])], BLOCK_SUBJECTS_MAP["D01"])
+    cutoff, admitted = direct_cutoff(totals.loc[totals["nam_hoc"] == 2025, "tong_diem"].to_numpy(), 5)
+    assert (out["diem_chuan"], out["so_trung_tuyen"]) == (pytest.approx(cutoff), admitted)
+
+
+def test_projection_shifts_and_scales_base_year(analysis):
+    base = analysis.simulate_cutoffs(pd.DataFrame({"nam_hoc": [2025], "khoi": ["A00"], "chi_tieu": [20]}))
+    shifted = analysis.project_cutoffs(pd.DataFrame({"khoi": ["A00"], "chi_tieu": [20]}), shift={"A00": 1.5})
+    assert shifted["diem_chuan"].iloc[0] == pytest.approx(base["diem_chuan"].iloc[0] + 1.5)
+
+    # Số thí sinh gấp đôi → chỉ tiêu gấp đôi cho cùng điểm chuẩn
+    n_2025 = analysis.analyze_scores_by_exam_block("A00").query("nam_hoc == 2025")["so_hoc_sinh"].sum()
+    doubled = analysis.project_cutoffs(pd.DataFrame({"khoi": ["A00"], "chi_tieu": [40]}),
+                                       n_students={"A00": 2 * n_2025})
+    assert doubled["diem_chuan"].iloc[0] == pytest.approx(base["diem_chuan"].iloc[0])
+    assert doubled["so_trung_tuyen"].iloc[0] == 2 * base["so_trung_tuyen"].iloc[0]
@@ -0,0 +1,89 @@
+"""Export.run_export_all: đủ file, tổng kết đúng số file, bảng phần trăm đọc lại được."""
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from Module.Csv_Writer import CsvWriterPool
+from Module.Export import Export
+from Module.Percentile_Table import PercentileTable
+from conftest import make_processor
+
+
+@pytest.fixture(scope="module")
+def exported(tmp_path_factory):
+    """(Export, tổng kết) sau một lượt run_export_all trên dữ liệu mẫu."""
+    exporter = Export(make_processor(), str(tmp_path_factory.mktemp("export")), writers=1)
+    return exporter, exporter.run_export_all()
+
+
+def test_percentile_tables_are_exported(exported):
+    exporter, _ = exported
+    base = exporter.analysis
+    for kind, name in [("subject", "Subject"), ("block", "Block")]:
+        for regional, suffix in [(False, ""), (True, "_Province")]:
+            path = f"{exporter.root_path}/Percentile_Data/Export_Percentile_{name}{suffix}.csv"
+            loaded = PercentileTable.load(path)
+            expected = base.get_percentile_table(kind, by_region=regional)
+            pd.testing.assert_frame_equal(loaded.to_frame(), expected.to_frame(), check_dtype=False)
+
+    loaded = PercentileTable.load(f"{exporter.root_path}/Percentile_Data/Export_Percentile_Block_Province.csv")
+    queries = np.arange(10, 30, 0.5)
+    np.testing.assert_allclose(loaded.percentile_rank(queries, (2025, "D01", "Hà Nội")),
+                               base.percentile_rank(queries, (2025, "D01", "Hà Nội"), by_region=True))
+
+
+# --------------------------------------------------------------
+# Ghi song song (CsvWriterPool)
+# --------------------------------------------------------------
+def exported_files(root: str) -> dict[str, bytes]:
+    return {str(p.relative_to(root)): p.read_bytes() for p in sorted(Path(root).rglob("*.csv"))}
+
+
+def test_summary_counts_every_file(exported):
+    exporter, summary = exported
+    files = exported_files(exporter.root_path)
+    assert "Export_Yearly_Total_Students.csv" in files
+    assert summary["files"] == len(files)
+    assert summary["bytes"] == sum(len(data) for data in files.values())
+
+
+def test_parallel_export_is_byte_identical(exported, tmp_path):
+    exporter, _ = exported
+    parallel = Export(exporter.processor, str(tmp_path / "parallel"), writers=4)
+    parallel.run_export_all()
+    assert exported_files(parallel.root_path) == exported_files(exporter.root_path)
+
+    # Tuần tự từng file (to_csv trực tiếp) cho cùng nội dung
+    plan = exporter._build_plan()
+    name = plan.provinces[0]
+    exporter._export_province(name, plan)
+    path = Path(exporter._build_path("province", name))
+    assert path.read_bytes() == exported_files(parallel.root_path)[str(path.relative_to(exporter.root_path))]
+
+
+def test_writer_error_fails_fast(tmp_path):
+    df = pd.DataFrame({"a": [1, 2]})
+    pool = CsvWriterPool(1, max_pending=1)
+    pool.submit(df, tmp_path / "thieu_thu_muc" / "x.csv")
+    # Hàng đợi 1 chỗ → submit kế tiếp chờ file lỗi xong rồi ném lại lỗi ngay
+    with pytest.raises(OSError):
+        pool.submit(df, tmp_path / "ok.csv")
+    assert not (tmp_path / "ok.csv").exists()
+    with pytest.raises(OSError):
+        pool.close()
+
+
+def test_exit_surfaces_writer_error(tmp_path):
+    df = pd.DataFrame({"a": [1, 2]})
+    with pytest.raises(OSError):
+        with CsvWriterPool(2) as pool:
+            pool.submit(df, tmp_path / "thieu_thu_muc" / "x.csv")
+
+    # Bên sinh DF lỗi → lỗi ghi vẫn được ném, lỗi của bên sinh giữ làm ngữ cảnh
+    with pytest.raises(OSError) as info:
+        with CsvWriterPool(2) as pool:
+            pool.submit(df, tmp_path / "thieu_thu_muc" / "y.csv")
+            raise KeyError("producer")
+    assert isinstance(info.value.__context__, KeyError)
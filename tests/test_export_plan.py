@@ -0,0 +1,54 @@
+"""ExportPlan: mỗi file là lát cắt histogram, trùng với các hàm phân tích từng nhóm của Analysis."""
+import pandas as pd
+import pytest
+
+from Module.Analysis import Analysis
+from Module.Export_Plan import ExportPlan
+
+
+@pytest.fixture(scope="module")
+def analysis(processor):
+    return Analysis(processor)
+
+
+@pytest.fixture(scope="module")
+def plan(analysis, processor):
+    return ExportPlan(analysis, sorted(processor.get_score_store().subjects))
+
+
+def stats_frame(stats: dict) -> pd.DataFrame:
+    return pd.DataFrame(stats).T.reset_index().rename(columns={"index": "nam_hoc"})
+
+
+def test_labels_are_occupied_groups(plan, analysis):
+    blocks = analysis.analyze_scores_by_exam_block("All")
+    assert plan.blocks == sorted(blocks.loc[blocks["so_hoc_sinh"] > 0, "khoi"].unique())
+    regions = analysis.compare_by_region("ALL")
+    assert plan.provinces == sorted(regions.loc[regions["so_hoc_sinh"] > 0, "tinh"].unique())
+    assert len(plan) == 2 * (len(plan.subjects) + len(plan.blocks) + len(plan.provinces))
+
+
+@pytest.mark.parametrize("subject", ["toan", "tin_hoc"])
+def test_subject_artifacts_match_analysis(plan, analysis, subject):
+    pd.testing.assert_frame_equal(plan.subject_distribution(subject).reset_index(drop=True),
+                                  analysis.get_arregate_by_exam_subsections(subject).reset_index(drop=True),
+                                  check_dtype=False)
+    pd.testing.assert_frame_equal(plan.subject_statistics(subject),
+                                  stats_frame(analysis.get_statistics_by_subject(subject)))
+
+
+def test_block_and_province_artifacts_match_analysis(plan, analysis):
+    for block in plan.blocks[:5]:
+        pd.testing.assert_frame_equal(plan.block_distribution(block).reset_index(drop=True),
+                                      analysis.analyze_scores_by_exam_block(block).reset_index(drop=True),
+                                      check_dtype=False)
+        pd.testing.assert_frame_equal(plan.block_statistics(block),
+                                      stats_frame(analysis.get_statistics_by_block(block)))
+
+    for province in plan.provinces[:5]:
+        pd.testing.assert_frame_equal(plan.province_distribution(province).reset_index(drop=True),
+                                      analysis.compare_by_region(province).reset_index(drop=True),
+                                      check_dtype=False)
+        stats = plan.province_statistics(province).set_index("nam_hoc")
+        for year, expected in analysis.get_statistics_by_region(province).items():
+            assert stats.loc[year].to_dict() == pytest.approx(expected)
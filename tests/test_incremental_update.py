@@ -0,0 +1,57 @@
+"""Analysis.update(partition) phải cho kết quả giống hệt dựng lại từ đầu trên dữ liệu đã nối."""
+import pandas as pd
+import pytest
+
+from Module.Analysis import Analysis, INCREMENTAL_AGGREGATES
+from Module.Result_Cache import method_key
+from Module.Score_Store import PROGRAMS
+from conftest import make_processor
+from test_compute_backend import CASES, assert_same_result
+
+NEW_YEAR = 2025
+
+
+@pytest.fixture(scope="module")
+def analyses():
+    """(Analysis đã update thêm năm NEW_YEAR theo từng chương trình, Analysis dựng mới, ô bẩn)."""
+    incremental = make_processor()
+    full, programs = incremental.combined_data, incremental.get_program_codes()
+    is_new = (full["nam_hoc"] == NEW_YEAR).to_numpy()
+    old = full[~is_new].reset_index(drop=True)
+    partitions = [(full[is_new & (programs == code)], program) for code, program in enumerate(PROGRAMS)]
+
+    incremental.combined_data = old
+    updated = Analysis(incremental)
+    for _, name, args in INCREMENTAL_AGGREGATES:
+        getattr(updated, name)(*args)
+    for partition, program in partitions:
+        dirty = updated.update(partition, program)
+
+    # Partition gốc đã nằm cuối và đúng thứ tự chương trình → dữ liệu dựng mới chính là full
+    # (giữ mã chương trình theo partition; gán lại qua setter sẽ suy chương trình theo năm)
+    rebuilt = make_processor()
+    pd.testing.assert_frame_equal(
+        pd.concat([old, *(partition for partition, _ in partitions)], ignore_index=True), full
+    )
+    return updated, Analysis(rebuilt), dirty
+
+
+def test_update_merges_every_aggregate(analyses):
+    updated, _, _ = analyses
+    version = updated._data_version()
+    for _, name, args in INCREMENTAL_AGGREGATES:
+        assert updated._cache.peek(method_key(name, *args), version) is not None, name
+
+
+@pytest.mark.parametrize("case", CASES, ids=[name for name, _ in CASES])
+def test_update_matches_rebuild(analyses, case):
+    updated, rebuilt, _ = analyses
+    _, call = case
+    assert_same_result(call(updated), call(rebuilt))
+
+
+def test_dirty_cells_cover_only_new_year(analyses):
+    updated, _, dirty = analyses
+    assert set(dirty["loai"]) == {"subject", "block", "region"}
+    assert set(dirty["nam_hoc"]) == {NEW_YEAR}
+    pd.testing.assert_frame_equal(updated.get_dirty_cells(), dirty)
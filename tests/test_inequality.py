@@ -0,0 +1,59 @@
+"""Gini, Theil, q3/q1 và tỉ lệ điểm liệt từ histogram vs tính trực tiếp trên điểm từng thí sinh."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from Module.Analysis import Analysis, PRE_REGION_MAP
+from Module.Score_Histogram import FAILING_SCORE, ScoreHistogram
+from conftest import score_codes
+
+
+@pytest.fixture(scope="module")
+def analysis(processor):
+    return Analysis(processor)
+
+
+def direct_indices(scores: pd.Series) -> dict:
+    x = np.sort(scores.to_numpy())
+    n, mu = len(x), x.mean()
+    ratio = x / mu
+    q1, q3 = scores.quantile([0.25, 0.75])
+    return {
+        "count": n,
+        "gini": ((2 * np.arange(1, n + 1) - n - 1) * x).sum() / (n * x.sum()),
+        "theil": np.mean(np.where(ratio > 0, ratio * np.log(np.where(ratio > 0, ratio, 1)), 0)),
+        "iqr_ratio": q3 / q1,
+        "failing_share": (x <= FAILING_SCORE).mean(),
+    }
+
+
+@pytest.mark.parametrize("year, province, subject", [
+    (2024, "Hà Nội", "toan"),
+    (2025, "An Giang", "ngoai_ngu"),
+    (2019, "Thành phố Hồ Chí Minh", "ngu_van"),
+])
+def test_region_indices_match_direct(analysis, frame, year, province, subject):
+    out = analysis.get_inequality_indices(by_region=True, subjects=subject)
+    codes = frame["sbd"].astype(str).str.zfill(8).str[:2]
+    scores = frame.loc[(frame["nam_hoc"] == year) & codes.isin(PRE_REGION_MAP[province]), subject].dropna()
+    assert out.loc[(year, province, subject)].to_dict() == pytest.approx(direct_indices(scores))
+
+
+@pytest.mark.parametrize("year, subject", [(2018, "vat_li"), (2025, "toan")])
+def test_national_indices_match_direct(analysis, frame, year, subject):
+    out = analysis.get_inequality_indices(by_region=False)
+    scores = frame.loc[frame["nam_hoc"] == year, subject].dropna()
+    assert out.loc[(year, subject)].to_dict() == pytest.approx(direct_indices(scores))
+    assert (out["count"] > 0).all()
+
+
+def test_histogram_indices_with_failing_and_zero_scores():
+    # Dữ liệu mẫu không có điểm <= 1.0 → dựng histogram có điểm 0 và điểm liệt
+    rng = np.random.default_rng(3)
+    groups = [np.concatenate([np.zeros(5), rng.uniform(0, 1, 40).round(2), rng.uniform(1, 10, 300).round(2)]),
+              rng.uniform(0.5, 9.5, 200).round(2)]
+    counts = np.stack([np.bincount(score_codes(g), minlength=1001) for g in groups])
+    hist = ScoreHistogram(counts, [("nhom", np.array(["a", "b"], dtype=object))])
+    out = hist.inequality()
+    for label, scores in zip(["a", "b"], groups):
+        assert out.loc[label].to_dict() == pytest.approx(direct_indices(pd.Series(scores)))
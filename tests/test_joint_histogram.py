@@ -0,0 +1,39 @@
+"""Histogram 2 chiều theo cặp môn vs pd.crosstab trên bin điểm của từng thí sinh."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from Module.Analysis import Analysis, PRE_REGION_MAP
+from conftest import score_codes
+
+
+@pytest.fixture(scope="module")
+def analysis(processor):
+    return Analysis(processor)
+
+
+def crosstab(df: pd.DataFrame, subject_a: str, subject_b: str, bin_width: float, n_bins: int) -> np.ndarray:
+    both = df[[subject_a, subject_b]].dropna()
+    width = int(round(bin_width * 100))
+    table = pd.crosstab(score_codes(both[subject_a]) // width, score_codes(both[subject_b]) // width)
+    return table.reindex(index=range(n_bins), columns=range(n_bins), fill_value=0).to_numpy()
+
+
+@pytest.mark.parametrize("subject_a, subject_b, bin_width", [
+    ("toan", "ngoai_ngu", 0.25),
+    ("vat_li", "toan", 0.5),          # thứ tự ngược với ScoreStore → ma trận chuyển vị
+    ("hoa_hoc", "sinh_hoc", 0.05),    # bin mịn → chỉ đếm riêng cặp này
+])
+def test_joint_histogram_matches_crosstab(analysis, frame, subject_a, subject_b, bin_width):
+    out = analysis.joint_histogram(subject_a, subject_b, 2024, bin_width=bin_width)
+    df = frame[frame["nam_hoc"] == 2024]
+    np.testing.assert_array_equal(out.to_numpy(), crosstab(df, subject_a, subject_b, bin_width, len(out)))
+    assert out.index.name == subject_a and out.columns.name == subject_b
+
+
+def test_all_pairs_by_province(analysis, frame):
+    codes = frame["sbd"].astype(str).str.zfill(8).str[:2]
+    df = frame[(frame["nam_hoc"] == 2025) & codes.isin(PRE_REGION_MAP["Hà Nội"])]
+    pairs = analysis.joint_histograms(2025, province="Hà Nội")
+    for (subject_a, subject_b), out in pairs.items():
+        np.testing.assert_array_equal(out.to_numpy(), crosstab(df, subject_a, subject_b, 0.25, len(out)))
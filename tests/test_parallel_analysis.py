@@ -0,0 +1,53 @@
+"""Chạy song song (workers > 1) phải cho kết quả giống hệt tuần tự; pool được dừng đúng lúc."""
+import gc
+
+import pytest
+
+from Module.Analysis import Analysis
+from test_compute_backend import assert_same_result
+
+
+CASES = [
+    lambda a: a.get_subject_histogram(),
+    lambda a: a.get_block_histogram("All"),
+    lambda a: a.get_province_histogram(),
+    lambda a: a.compare_by_region("ALL"),
+]
+
+
+@pytest.fixture(scope="module")
+def serial(processor):
+    return Analysis(processor)
+
+
+@pytest.fixture(scope="module")
+def parallel(processor):
+    with Analysis(processor, workers=2) as analysis:
+        yield analysis
+    processor.release_shared()
+
+
+@pytest.mark.parametrize("call", CASES, ids=["subject", "block", "province", "compare_by_region"])
+def test_parallel_matches_serial(serial, parallel, call):
+    assert_same_result(call(serial), call(parallel))
+
+
+def test_context_manager_closes_pool(processor):
+    with Analysis(processor, workers=2) as analysis:
+        analysis.get_province_histogram()
+        pool = analysis._pool
+        assert pool is not None
+    assert analysis._pool is None
+    assert pool._shared == {}
+    with pytest.raises(RuntimeError):
+        pool.map(len, [((),)])
+
+
+def test_pool_is_closed_when_analysis_is_collected(processor):
+    analysis = Analysis(processor, workers=2)
+    analysis.get_subject_histogram()
+    finalizer = analysis._pool_finalizer
+    assert finalizer.alive
+    del analysis
+    gc.collect()
+    assert not finalizer.alive
@@ -0,0 +1,63 @@
+"""Hạng phần trăm và điểm chuẩn theo chỉ tiêu vs tính trực tiếp trên điểm đã sắp xếp."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from Module.Analysis import Analysis, BLOCK_SUBJECTS_MAP
+from Module.Percentile_Table import PercentileTable
+from test_block_histogram import block_totals
+
+
+@pytest.fixture(scope="module")
+def analysis(processor):
+    return Analysis(processor)
+
+
+@pytest.fixture(scope="module")
+def d01_2025(frame) -> np.ndarray:
+    totals = block_totals(frame, BLOCK_SUBJECTS_MAP["D01"])
+    return np.sort(totals.loc[totals["nam_hoc"] == 2025, "tong_diem"].to_numpy())
+
+
+def test_percentile_rank_matches_sorted_scores(analysis, d01_2025):
+    queries = np.concatenate([d01_2025[::37], np.arange(0, 30.25, 0.25)])
+    n = len(d01_2025)
+    upto = np.searchsorted(d01_2025, queries, side="right")
+    below = np.searchsorted(d01_2025, queries, side="left")
+
+    group = (2025, "D01")
+    np.testing.assert_allclose(analysis.percentile_rank(queries, group), 100 * upto / n)
+    np.testing.assert_allclose(analysis.percentile_rank(queries, group, method="strict"), 100 * below / n)
+    np.testing.assert_allclose(analysis.percentile_rank(queries, group, method="mean"),
+                               100 * (upto + below) / 2 / n)
+    assert np.isnan(analysis.percentile_rank([np.nan], group)).all()
+    assert np.isnan(analysis.percentile_rank([20.0], (1999, "D01"))).all()
+
+
+def test_subject_rank_by_region(analysis, frame):
+    codes = frame["sbd"].astype(str).str.zfill(8).str[:2]
+    scores = np.sort(frame.loc[(frame["nam_hoc"] == 2025) & (codes == "01"), "toan"].dropna().to_numpy())
+    queries = np.arange(0, 10.25, 0.25)
+    out = analysis.percentile_rank(queries, (2025, "toan", "Hà Nội"), kind="subject", by_region=True)
+    np.testing.assert_allclose(out, 100 * np.searchsorted(scores, queries, side="right") / len(scores))
+
+
+def test_cutoff_matches_sorted_scores(analysis, d01_2025):
+    table = analysis.get_percentile_table("block")
+    quotas = np.array([1, 5, 50, len(d01_2025) // 2, len(d01_2025), len(d01_2025) + 10])
+    cutoffs, admitted = table.cutoff(quotas, (2025, "D01"))
+
+    descending = d01_2025[::-1]
+    expected = descending[np.minimum(quotas, len(d01_2025)) - 1]
+    np.testing.assert_allclose(cutoffs, expected)
+    np.testing.assert_array_equal(admitted, [(d01_2025 >= t).sum() for t in expected])
+    assert np.isnan(table.cutoff([0], (2025, "D01"))[0]).all()
+
+
+def test_save_load_round_trip(analysis, tmp_path):
+    table = analysis.get_percentile_table("subject", by_region=True)
+    loaded = PercentileTable.load(table.save(tmp_path / "percentile.csv"))
+    pd.testing.assert_frame_equal(loaded.to_frame(), table.to_frame(), check_dtype=False)
+    queries = np.arange(0, 10.25, 0.5)
+    np.testing.assert_allclose(loaded.percentile_rank(queries, (2024, "toan", "Hà Nội")),
+                               table.percentile_rank(queries, (2024, "toan", "Hà Nội")))
@@ -0,0 +1,50 @@
+"""DataProcessor: ScoreStore là nguồn duy nhất của điểm; combined_data dựng lại đúng dữ liệu dày."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import make_processor
+
+
+@pytest.fixture(scope="module")
+def dense():
+    return make_processor(sparse=False)
+
+
+def test_compact_keeps_only_key_columns(processor, dense):
+    store = processor.get_score_store()
+    frame = processor._combined_data
+    assert not set(store.subjects) & set(frame.columns)
+    assert processor.processed_columns == dense.processed_columns
+    assert frame.memory_usage(deep=False).sum() + store.nbytes < dense.combined_data.memory_usage(deep=False).sum()
+
+
+def test_materialized_frame_matches_dense(processor, dense):
+    pd.testing.assert_frame_equal(processor.combined_data, dense.combined_data)
+    pd.testing.assert_frame_equal(processor.get_processed_data(columns=["nam_hoc", "toan"]),
+                                  dense.get_processed_data(columns=["nam_hoc", "toan"]))
+    with pytest.raises(KeyError):
+        processor.get_processed_data(columns=["khong_co"])
+
+
+def test_append_partition_keeps_compact_layout():
+    processor = make_processor()
+    full = processor.combined_data
+    is_new = (full["nam_hoc"] == 2025).to_numpy()
+    processor.combined_data = full[~is_new].reset_index(drop=True)
+    processor.get_score_store()
+    processor.append_partition(full[is_new])
+
+    assert processor._columns is not None
+    pd.testing.assert_frame_equal(processor.combined_data, full)
+
+
+def test_reassigned_frame_resets_program_codes():
+    processor = make_processor()
+    full = processor.combined_data
+    assert (processor.get_program_codes()[full["nam_hoc"].to_numpy() == 2025] == 0).any()
+
+    # Cùng số dòng nhưng đổi thứ tự → mã chương trình theo partition cũ không còn đúng dòng
+    processor.combined_data = full.iloc[::-1].reset_index(drop=True)
+    years = processor.combined_data["nam_hoc"].to_numpy()
+    np.testing.assert_array_equal(processor.get_program_codes(), (years >= 2025).astype(np.int8))
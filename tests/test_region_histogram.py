@@ -0,0 +1,98 @@
+"""So sánh tỉnh (tỉnh cũ và tỉnh gộp) vs groupby trực tiếp trên tổng điểm từng thí sinh."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from Module.Analysis import Analysis, PRE_REGION_MAP, REGION_MAP_RAW
+from conftest import score_codes
+
+REGION_SUBJECTS = ["toan", "ngu_van", "ngoai_ngu", "vat_li", "hoa_hoc", "sinh_hoc",
+                   "lich_su", "dia_li", "gdcd", "cn_cong_nghiep", "cn_nong_nghiep"]
+CODE_TO_REGION = {code: name for name, codes in PRE_REGION_MAP.items() for code in codes}
+
+
+@pytest.fixture(scope="module")
+def analysis(processor):
+    return Analysis(processor)
+
+
+@pytest.fixture(scope="module")
+def region_totals(frame) -> pd.DataFrame:
+    """Mỗi thí sinh có ít nhất một môn: (nam_hoc, ma_tinh, tinh, tong_diem) — tổng các môn có điểm."""
+    scores = frame[REGION_SUBJECTS]
+    keep = scores.notna().any(axis=1).to_numpy()
+    total = sum(score_codes(scores[s].fillna(0)) for s in REGION_SUBJECTS)
+    codes = frame["sbd"].astype(str).str.zfill(8).str[:2]
+    out = pd.DataFrame({
+        "nam_hoc": frame["nam_hoc"].to_numpy(),
+        "ma_tinh": codes.to_numpy(),
+        "tinh": codes.map(CODE_TO_REGION).to_numpy(),
+        "tong_diem": total / 100,
+    })[keep]
+    return out[out["tinh"].notna()]
+
+
+def expected_counts(totals: pd.DataFrame) -> pd.DataFrame:
+    counts = totals.groupby(["nam_hoc", "tinh", "tong_diem"]).size().reset_index(name="so_hoc_sinh")
+    return counts.sort_values(["nam_hoc", "tinh", "tong_diem"]).reset_index(drop=True)
+
+
+def sort_counts(df: pd.DataFrame) -> pd.DataFrame:
+    return df.sort_values(["nam_hoc", "tinh", "tong_diem"]).reset_index(drop=True)
+
+
+def test_province_rows_match_mask(processor):
+    store = processor.get_score_store()
+    for code in (1, 2, 34, 64, 99):
+        np.testing.assert_array_equal(store.province_rows(code), np.flatnonzero(store.province_codes == code))
+    np.testing.assert_array_equal(store.province_rows([3, 1]),
+                                  np.flatnonzero(np.isin(store.province_codes, [1, 3])))
+
+
+def test_compare_all_regions_matches_groupby(analysis, region_totals):
+    out = analysis.compare_by_region("ALL")
+    out = out[out["so_hoc_sinh"] > 0]
+    pd.testing.assert_frame_equal(sort_counts(out), expected_counts(region_totals), check_dtype=False)
+
+
+@pytest.mark.parametrize("region", ["Hà Nội", "Thành phố Hồ Chí Minh", "An Giang"])
+def test_compare_one_region_matches_groupby(analysis, region_totals, region):
+    out = sort_counts(analysis.compare_by_region(region))
+    expected = expected_counts(region_totals[region_totals["tinh"] == region])
+    pd.testing.assert_frame_equal(out, expected, check_dtype=False)
+
+    stats = analysis.get_statistics_by_region(region)
+    for year, df_year in region_totals[region_totals["tinh"] == region].groupby("nam_hoc"):
+        assert stats[year]["mean"] == pytest.approx(df_year["tong_diem"].mean())
+        assert stats[year]["std"] == pytest.approx(df_year["tong_diem"].std(), nan_ok=True)
+
+
+# --------------------------------------------------------------
+# Tỉnh gộp: cộng các tỉnh cũ thành viên
+# --------------------------------------------------------------
+def merged_counts(region_totals: pd.DataFrame, groups: dict[str, list[str]]) -> pd.DataFrame:
+    parts = [region_totals[region_totals["ma_tinh"].isin(codes)].assign(tinh=name)
+             for name, codes in groups.items()]
+    return expected_counts(pd.concat(parts))
+
+
+def test_merged_regions_match_member_sums(analysis, region_totals):
+    out = analysis.compare_by_merged_region("ALL")
+    out = out[out["so_hoc_sinh"] > 0]
+    pd.testing.assert_frame_equal(sort_counts(out), merged_counts(region_totals, REGION_MAP_RAW),
+                                  check_dtype=False)
+
+
+def test_custom_region_groups(analysis, region_totals):
+    groups = {"Bắc": ["01", "03", "05"], "Nam": ["02", 44]}
+    out = analysis.compare_by_merged_region("ALL", groups)
+    out = out[out["so_hoc_sinh"] > 0]
+    expected = merged_counts(region_totals, {"Bắc": ["01", "03", "05"], "Nam": ["02", "44"]})
+    pd.testing.assert_frame_equal(sort_counts(out), expected, check_dtype=False)
+
+    stats = analysis.get_statistics_by_merged_region("Nam", groups)
+    for year, df_year in expected[expected["tinh"] == "Nam"].groupby("nam_hoc"):
+        scores = df_year["tong_diem"].repeat(df_year["so_hoc_sinh"])
+        assert stats[year]["median"] == pytest.approx(scores.median())
+    with pytest.raises(ValueError):
+        analysis.compare_by_merged_region("ALL", {"X": ["00"]})
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from Module.Analysis import Analysis
+from Module.Result_Cache import ResultCache
+
+
+@pytest.fixture
+def analysis(processor):
+    return Analysis(processor)
+
+
+def test_cached_histogram_is_read_only(analysis):
+    hist = analysis.get_subject_histogram()
+    total = hist.counts.sum()
+
+    with pytest.raises(ValueError):
+        hist.counts[...] = 0
+    with pytest.raises(ValueError):
+        hist.select(mon_hoc="toan").counts[...] = 0
+    with pytest.raises(ValueError):
+        hist.labels("mon_hoc")[0] = "x"
+
+    assert analysis.get_subject_histogram().counts.sum() == total
+
+
+@pytest.mark.parametrize("getter", [
+    lambda a: a.get_score_cube().histogram.counts,
+    lambda a: a.get_block_histogram("All").counts,
+    lambda a: a.get_best_block()[0],
+    lambda a: a.get_subject_combinations().counts,
+])
+def test_cached_arrays_are_read_only(analysis, getter):
+    with pytest.raises(ValueError):
+        getter(analysis)[...] = 0
+
+
+def test_frames_and_dicts_are_copied(analysis):
+    df = analysis.get_arregate_by_exam_subsections("toan")
+    df["so_hoc_sinh"] = 0
+    assert analysis.get_arregate_by_exam_subsections("toan")["so_hoc_sinh"].sum() > 0
+
+    stats = analysis.get_statistics_by_subject("toan")
+    stats.clear()
+    assert analysis.get_statistics_by_subject("toan")
+
+
+def test_put_freezes_arrays():
+    cache = ResultCache()
+    cache.put("k", 1, (np.arange(3), np.zeros(2)))
+    first, second = cache.peek("k", 1)
+    assert not first.flags.writeable and not second.flags.writeable
+
+
+def test_version_change_drops_entries():
+    cache = ResultCache()
+    assert cache.get_or_compute("k", 1, lambda: pd.DataFrame({"a": [1]}))["a"].sum() == 1
+    assert cache.peek("k", 2) is None
+    assert cache.get_or_compute("k", 2, lambda: pd.DataFrame({"a": [2]}))["a"].sum() == 2
+    assert len(cache) == 1
@@ -0,0 +1,47 @@
+"""ScoreCube (năm × chương trình × tỉnh × môn) vs groupby trực tiếp trên điểm từng thí sinh."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from Module.Analysis import Analysis
+from Module.Score_Store import PROGRAMS
+
+SUBJECTS = ["toan", "ngoai_ngu", "tin_hoc"]
+
+
+@pytest.fixture(scope="module")
+def cube(processor):
+    return Analysis(processor).get_score_cube()
+
+
+@pytest.fixture(scope="module")
+def long_scores(processor, frame) -> pd.DataFrame:
+    """Điểm dạng dài (nam_hoc, chuong_trinh, ma_tinh, mon_hoc, diem) của các môn trong SUBJECTS."""
+    keys = pd.DataFrame({
+        "nam_hoc": frame["nam_hoc"].to_numpy(),
+        "chuong_trinh": np.asarray(PROGRAMS, dtype=object)[processor.get_program_codes()],
+        "ma_tinh": frame["sbd"].astype(str).str.zfill(8).str[:2].astype(int).to_numpy(),
+    })
+    long = pd.concat([keys, frame[SUBJECTS].reset_index(drop=True)], axis=1).melt(
+        id_vars=list(keys.columns), var_name="mon_hoc", value_name="diem")
+    return long.dropna(subset=["diem"])
+
+
+def test_cube_matches_groupby(cube, long_scores):
+    out = cube.histogram.select(mon_hoc=SUBJECTS).to_frame()
+    keys = ["nam_hoc", "chuong_trinh", "ma_tinh", "mon_hoc", "diem"]
+    expected = long_scores.groupby(keys).size().reset_index(name="so_hoc_sinh")
+    pd.testing.assert_frame_equal(out.sort_values(keys).reset_index(drop=True),
+                                  expected.sort_values(keys).reset_index(drop=True), check_dtype=False)
+
+
+def test_cube_rollup_and_stats(cube, long_scores):
+    toan = long_scores[long_scores["mon_hoc"] == "toan"]
+    stats = cube.stats("ma_tinh", "chuong_trinh", mon_hoc="toan")
+    for year, df_year in toan.groupby("nam_hoc"):
+        assert stats.loc[year, "count"] == len(df_year)
+        assert stats.loc[year, "mean"] == pytest.approx(df_year["diem"].mean())
+        assert stats.loc[year, "median"] == pytest.approx(df_year["diem"].median())
+
+    hanoi = cube.rollup("nam_hoc", "chuong_trinh", ma_tinh=1, mon_hoc="ngoai_ngu")
+    assert hanoi.counts.sum() == ((long_scores["ma_tinh"] == 1) & (long_scores["mon_hoc"] == "ngoai_ngu")).sum()
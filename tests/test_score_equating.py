@@ -0,0 +1,63 @@
+"""Quy đổi equipercentile: giữ nguyên hạng phần trăm giữa hai cohort (tính trực tiếp trên điểm)."""
+import numpy as np
+import pytest
+
+from Module.Analysis import Analysis
+from Module.Score_Equating import equipercentile_equate
+from conftest import score_codes
+
+
+@pytest.fixture(scope="module")
+def analysis(processor):
+    return Analysis(processor)
+
+
+def mid_rank(codes: np.ndarray, x: np.ndarray) -> np.ndarray:
+    """Hạng phần trăm liên tục hoá của mã điểm x: (số < x + nửa số = x) / n."""
+    codes = np.sort(codes)
+    below = np.searchsorted(codes, x, side="left")
+    upto = np.searchsorted(codes, x, side="right")
+    return (below + upto) / 2 / len(codes)
+
+
+def continuous_cdf(codes: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """CDF liên tục hoá tại điểm (đơn vị mã) y: mỗi mã k trải đều trên [k - 0.5, k + 0.5]."""
+    codes = np.sort(codes)
+    k = np.floor(y + 0.5).astype(np.int64)
+    below = np.searchsorted(codes, k, side="left")
+    at = np.searchsorted(codes, k, side="right") - below
+    return (below + (y + 0.5 - k) * at) / len(codes)
+
+
+def test_shifted_distribution_equates_to_shift():
+    counts = np.zeros(1001)
+    counts[200:600] = np.random.default_rng(0).integers(1, 50, size=400)
+    shifted = np.roll(counts, 150)
+    equating = equipercentile_equate(counts, shifted, bandwidth=0)
+    np.testing.assert_allclose(equating.equate(np.arange(2.0, 6.0, 0.01)), np.arange(3.5, 7.5, 0.01), atol=1e-3)
+
+
+def test_same_cohort_is_identity(analysis):
+    equating = analysis.get_equating("subject", "toan", 2024, 2024, bandwidth=0)
+    scores = np.arange(2, 9, 0.2)
+    np.testing.assert_allclose(equating.equate(scores), scores, atol=1e-3)
+
+
+@pytest.mark.parametrize("kind, name, source, target", [
+    ("subject", "toan", 2024, 2025),
+    ("subject", "ngoai_ngu", (2025, "CT2006"), (2025, "CT2018")),
+])
+def test_equating_preserves_percentile_rank(analysis, processor, frame, kind, name, source, target):
+    programs = np.asarray(["CT2006", "CT2018"], dtype=object)[processor.get_program_codes()]
+
+    def cohort(key) -> np.ndarray:
+        year, program = key if isinstance(key, tuple) else (key, None)
+        mask = (frame["nam_hoc"] == year).to_numpy()
+        if program is not None:
+            mask = mask & (programs == program)
+        return score_codes(frame.loc[mask, name].dropna())
+
+    source_codes, target_codes = cohort(source), cohort(target)
+    x = np.unique(source_codes)
+    equated = analysis.equate_scores(x / 100, kind, name, source, target, bandwidth=0)
+    np.testing.assert_allclose(continuous_cdf(target_codes, equated * 100), mid_rank(source_codes, x), atol=1e-4)
@@ -0,0 +1,149 @@
+"""Histogram dựng từ ScoreStore phải khớp đếm trực tiếp trên dữ liệu từng thí sinh."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from Module.Analysis import Analysis, BLOCK_SUBJECTS_MAP
+from Module.Score_Histogram import build_subject_histogram, describe_weighted, weighted_quantile
+from conftest import score_codes
+from test_block_histogram import block_totals
+
+
+@pytest.fixture(scope="module")
+def analysis(processor):
+    return Analysis(processor)
+
+
+def test_subject_histogram_matches_value_counts(processor, frame):
+    hist = build_subject_histogram(processor.get_score_store())
+    assert hist.labels("nam_hoc").tolist() == sorted(frame["nam_hoc"].unique())
+
+    for year, df_year in frame.groupby("nam_hoc"):
+        for subject in hist.labels("mon_hoc"):
+            expected = np.bincount(score_codes(df_year[subject].dropna()), minlength=hist.n_bins)
+            np.testing.assert_array_equal(hist.select(nam_hoc=year, mon_hoc=subject).counts, expected)
+
+
+def test_subject_frame_matches_groupby(analysis, frame):
+    long = frame.melt(id_vars="nam_hoc", value_vars=["toan", "ngoai_ngu"],
+                      var_name="mon_hoc", value_name="diem").dropna()
+    expected = (long.groupby(["nam_hoc", "mon_hoc", "diem"]).size()
+                .reset_index(name="so_hoc_sinh"))
+    out = pd.concat([analysis.get_arregate_by_exam_subsections(s) for s in ["ngoai_ngu", "toan"]])
+    out = out.sort_values(["nam_hoc", "mon_hoc", "diem"]).reset_index(drop=True)
+    pd.testing.assert_frame_equal(out, expected, check_dtype=False)
+
+
+# --------------------------------------------------------------
+# Thống kê mô tả từ histogram vs pandas trên dữ liệu nhân bản
+# --------------------------------------------------------------
+def pandas_describe(scores: pd.Series) -> dict:
+    """Thống kê tham chiếu (cùng định nghĩa với describe_weighted) trên điểm từng thí sinh."""
+    return {
+        "mean": scores.mean(),
+        "median": scores.median(),
+        "mode": scores.mode().iloc[0],
+        "std": scores.std(),
+        "min": scores.min(),
+        "max": scores.max(),
+    }
+
+
+def test_describe_weighted_matches_repeated_values():
+    rng = np.random.default_rng(1)
+    values = rng.choice(np.arange(0, 1001) / 100, size=60, replace=False)
+    weights = rng.integers(0, 20, size=60)
+    weights[:3] = 25   # nhiều mode → lấy điểm nhỏ nhất
+    expanded = pd.Series(values).repeat(weights)
+
+    out = describe_weighted(values, weights)
+    assert out == pytest.approx(pandas_describe(expanded))
+    q = [0, 0.1, 0.25, 0.5, 0.9, 1]
+    np.testing.assert_allclose(weighted_quantile(values, weights, q), expanded.quantile(q).to_numpy())
+    assert describe_weighted(values, np.zeros_like(weights)) is None
+
+
+def test_histogram_describe_matches_pandas(processor, frame):
+    hist = build_subject_histogram(processor.get_score_store())
+    described = hist.describe()
+    for (year, subject), row in described.iterrows():
+        scores = frame.loc[frame["nam_hoc"] == year, subject].dropna()
+        assert row["count"] == len(scores)
+        if scores.empty:
+            assert np.isnan(row["mean"])
+            continue
+        expected = pandas_describe(scores)
+        for key, value in expected.items():
+            assert row[key] == pytest.approx(value, abs=1e-9), (year, subject, key)
+
+
+def test_statistics_by_subject_matches_pandas(analysis, frame):
+    stats = analysis.get_statistics_by_subject("toan")
+    for year, df_year in frame.groupby("nam_hoc"):
+        assert stats[year] == pytest.approx(pandas_describe(df_year["toan"].dropna()))
+
+
+# --------------------------------------------------------------
+# Phân vị, tỉ lệ đạt ngưỡng, boxplot vs pandas
+# --------------------------------------------------------------
+def reference_boxplot(scores: pd.Series, whisker: float = 1.5) -> dict:
+    q1, median, q3 = scores.quantile([0.25, 0.5, 0.75])
+    low, high = q1 - whisker * (q3 - q1), q3 + whisker * (q3 - q1)
+    inside = scores[(scores >= low) & (scores <= high)]
+    return {"count": len(scores), "min": scores.min(), "q1": q1, "median": median, "q3": q3,
+            "max": scores.max(), "whisker_low": inside.min(), "whisker_high": inside.max(),
+            "n_outliers": len(scores) - len(inside)}
+
+
+@pytest.mark.parametrize("subject", ["toan", "ngoai_ngu"])
+def test_subject_summaries_match_pandas(analysis, frame, subject):
+    q = [0.1, 0.25, 0.5, 0.9]
+    quantiles = analysis.get_quantiles("subject", q, subject)
+    rates = analysis.get_pass_rates("subject", [5, 8], subject)
+    box = analysis.get_boxplot_summary("subject", subject)
+    for year, df_year in frame.groupby("nam_hoc"):
+        scores = df_year[subject].dropna()
+        np.testing.assert_allclose(quantiles.loc[(year, subject)].to_numpy(), scores.quantile(q).to_numpy())
+        np.testing.assert_allclose(rates.loc[(year, subject)].to_numpy(),
+                                   [(scores >= 5).mean(), (scores >= 8).mean()])
+        assert box.loc[(year, subject)].to_dict() == pytest.approx(reference_boxplot(scores))
+
+
+def test_block_summaries_match_pandas(analysis, frame):
+    totals = block_totals(frame, BLOCK_SUBJECTS_MAP["A01"])
+    quantiles = analysis.get_quantiles("block", [0.5, 0.75], "A01")
+    rates = analysis.get_pass_rates("block", [15, 24], "A01")
+    for year, df_year in totals.groupby("nam_hoc"):
+        scores = df_year["tong_diem"]
+        np.testing.assert_allclose(quantiles.loc[("A01", year)].to_numpy(), scores.quantile([0.5, 0.75]))
+        np.testing.assert_allclose(rates.loc[("A01", year)].to_numpy(),
+                                   [(scores >= 15).mean(), (scores >= 24).mean()])
+
+
+# --------------------------------------------------------------
+# KDE (FFT trên histogram) vs tổng Gauss trực tiếp trên điểm từng thí sinh
+# --------------------------------------------------------------
+def gaussian_sum(scores: np.ndarray, grid: np.ndarray, sigma: float) -> np.ndarray:
+    z = (grid[:, None] - scores[None, :]) / sigma
+    return np.exp(-0.5 * z ** 2).sum(axis=1) / (len(scores) * sigma * np.sqrt(2 * np.pi))
+
+
+def test_subject_kde_matches_gaussian_sum(analysis, frame):
+    out = analysis.kde("toan")
+    for year, df_year in frame.groupby("nam_hoc"):
+        scores = df_year["toan"].dropna()
+        sigma = scores.std() * len(scores) ** (-0.2)     # quy tắc Scott
+        curve = out[out["nam_hoc"] == year]
+        expected = gaussian_sum(scores.to_numpy(), curve["diem"].to_numpy(), sigma)
+        np.testing.assert_allclose(curve["mat_do"].to_numpy(), expected, atol=1e-4 * expected.max())
+
+
+def test_block_kde_with_fixed_bandwidth(analysis, frame):
+    totals = block_totals(frame, BLOCK_SUBJECTS_MAP["A00"])
+    out = analysis.kde("A00", bandwidth=0.5, bw_adjust=1.2)
+    for year, df_year in totals.groupby("nam_hoc"):
+        curve = out[out["nam_hoc"] == year]
+        expected = gaussian_sum(df_year["tong_diem"].to_numpy(), curve["tong_diem"].to_numpy(), 0.6)
+        np.testing.assert_allclose(curve["mat_do"].to_numpy(), expected, atol=1e-4 * expected.max())
+    with pytest.raises(ValueError):
+        analysis.kde("khong_co")
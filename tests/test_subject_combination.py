@@ -0,0 +1,52 @@
+"""Đếm tổ hợp môn bằng bitmask vs groupby trực tiếp trên mặt nạ có điểm của từng thí sinh."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from Module.Analysis import Analysis, BLOCK_SUBJECTS_MAP, PRE_REGION_MAP
+
+
+@pytest.fixture(scope="module")
+def analysis(processor):
+    return Analysis(processor)
+
+
+@pytest.fixture(scope="module")
+def present(processor, frame) -> pd.DataFrame:
+    """Mặt nạ có điểm theo thứ tự môn của ScoreStore."""
+    return frame[list(processor.get_score_store().subjects)].notna()
+
+
+def test_combination_counts_match_groupby(analysis, frame, present):
+    subjects = np.asarray(present.columns, dtype=object)
+    to_hop = ["+".join(subjects[row]) for row in present.to_numpy()]
+    n_mon = present.sum(axis=1).to_numpy()
+    expected = (pd.DataFrame({"nam_hoc": frame["nam_hoc"].to_numpy(), "to_hop": to_hop, "so_mon": n_mon})
+                .groupby(["nam_hoc", "to_hop", "so_mon"]).size().reset_index(name="so_hoc_sinh"))
+
+    out = analysis.get_combination_counts()
+    keys = ["nam_hoc", "to_hop"]
+    pd.testing.assert_frame_equal(out.sort_values(keys).reset_index(drop=True),
+                                  expected.sort_values(keys).reset_index(drop=True), check_dtype=False)
+    assert analysis.get_combination_counts(min_count=5)["so_hoc_sinh"].min() >= 5
+
+
+def test_block_eligibility_matches_masks(analysis, frame, present):
+    blocks = ["A00", "D01", "B08"]
+    out = analysis.get_block_eligibility(blocks)
+    any_score = present.any(axis=1)
+    for year in out.index:
+        in_year = (frame["nam_hoc"] == year) & any_score
+        for block in blocks:
+            # Môn không có trong dữ liệu (B08: 'sinh') bị bỏ như khi tính tổng điểm khối
+            subjects = [s for s in BLOCK_SUBJECTS_MAP[block] if s in present.columns]
+            eligible = in_year & present[subjects].all(axis=1)
+            assert out.loc[year, block] == pytest.approx(eligible.sum() / in_year.sum())
+
+
+def test_region_eligibility_matches_masks(analysis, frame, present):
+    out = analysis.get_block_eligibility("A01", by_region=True)
+    codes = frame["sbd"].astype(str).str.zfill(8).str[:2]
+    in_group = (frame["nam_hoc"] == 2023) & codes.isin(PRE_REGION_MAP["Hà Nội"]) & present.any(axis=1)
+    eligible = in_group & present[BLOCK_SUBJECTS_MAP["A01"]].all(axis=1)
+    assert out.loc[(2023, "Hà Nội"), "A01"] == pytest.approx(eligible.sum() / in_group.sum())